@@ -3,6 +3,7 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from .routes.upload_phase2 import upload_phase2
 from .routes.upload_phase1 import upload_phase1
+from .routes.upload_phase1_batch import upload_phase1_batch
 from .routes.home import home
 from .routes.login import login
 from .routes.logout import logout
@@ -33,6 +34,7 @@ def create_app():
     # Register routes
     app.add_url_rule('/', view_func=home)
     app.add_url_rule('/upload-phase1', view_func=upload_phase1, methods=['POST'])
+    app.add_url_rule('/upload-phase1-batch', view_func=upload_phase1_batch, methods=['POST'])
     app.add_url_rule('/upload-phase2', view_func=upload_phase2, methods=['POST'])
     app.add_url_rule('/login', view_func=login, methods=['GET', 'POST'])
     app.add_url_rule('/logout', view_func=logout)
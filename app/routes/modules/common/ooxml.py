@@ -0,0 +1,127 @@
+"""
+Low-level WordprocessingML helpers shared by Phase 1 and Phase 2.
+
+These read `lxml` elements directly and reproduce the text python-docx would
+return for the same elements, so code that skips the python-docx object model
+still produces identical output.
+"""
+import posixpath
+import zipfile
+
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+
+
+def qn(tag):
+    """Expand a `w:`-prefixed tag name to its Clark notation."""
+    prefix, local = tag.split(":")
+    if prefix != "w":
+        raise ValueError(f"Unsupported namespace prefix: {prefix}")
+    return f"{{{W_NS}}}{local}"
+
+
+W_BODY = qn("w:body")
+W_P = qn("w:p")
+W_R = qn("w:r")
+W_T = qn("w:t")
+W_TAB = qn("w:tab")
+W_BR = qn("w:br")
+W_CR = qn("w:cr")
+W_PTAB = qn("w:ptab")
+W_NO_BREAK_HYPHEN = qn("w:noBreakHyphen")
+W_HYPERLINK = qn("w:hyperlink")
+W_TBL = qn("w:tbl")
+W_TR = qn("w:tr")
+W_TC = qn("w:tc")
+W_TR_PR = qn("w:trPr")
+W_TC_PR = qn("w:tcPr")
+W_GRID_BEFORE = qn("w:gridBefore")
+W_GRID_SPAN = qn("w:gridSpan")
+W_V_MERGE = qn("w:vMerge")
+W_VAL = qn("w:val")
+W_TYPE = qn("w:type")
+
+
+def run_text(r):
+    """Text of a `w:r` element, matching python-docx `Run.text`."""
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == W_TAB or tag == W_PTAB:
+            parts.append("\t")
+        elif tag == W_BR:
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == W_CR:
+            parts.append("\n")
+        elif tag == W_NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(p):
+    """Text of a `w:p` element, matching python-docx `Paragraph.text`."""
+    parts = []
+    for child in p:
+        if child.tag == W_R:
+            parts.append(run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(run_text(r) for r in child if r.tag == W_R)
+    return "".join(parts)
+
+
+def cell_text(tc):
+    """Text of a `w:tc` element, matching python-docx `_Cell.text`."""
+    return "\n".join(paragraph_text(p) for p in tc if p.tag == W_P)
+
+
+def _int_val(parent, tag, default):
+    if parent is None:
+        return default
+    el = parent.find(tag)
+    if el is None:
+        return default
+    try:
+        return int(el.get(W_VAL))
+    except (TypeError, ValueError):
+        return default
+
+
+def grid_before(tr):
+    """Number of empty layout-grid columns before the first cell of a row."""
+    return _int_val(tr.find(W_TR_PR), W_GRID_BEFORE, 0)
+
+
+def grid_span(tc):
+    """Number of layout-grid columns a `w:tc` covers."""
+    return _int_val(tc.find(W_TC_PR), W_GRID_SPAN, 1)
+
+
+def v_merge(tc):
+    """Value of `w:tcPr/w:vMerge/@w:val`; a bare `w:vMerge` means "continue"."""
+    tc_pr = tc.find(W_TC_PR)
+    if tc_pr is None:
+        return None
+    el = tc_pr.find(W_V_MERGE)
+    if el is None:
+        return None
+    return el.get(W_VAL, "continue")
+
+
+def main_document_part(zf: zipfile.ZipFile) -> str:
+    """Name of the main document part, resolved from the package relationships."""
+    try:
+        rels = etree.fromstring(zf.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(f"{{{REL_NS}}}Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    return "word/document.xml"
@@ -0,0 +1,124 @@
+"""
+Batch Phase 1 processing.
+
+Pairs every Word document in an upload with its workbook and runs
+`process_phase1` for the pairs on a bounded thread pool. Model calls from all
+pairs share `llm_slots`, so the batch never has more than
+PHASE1_LLM_CONCURRENCY requests in flight (a cap on concurrency, not a rate
+limit). A pair whose extraction fails, including a single failed model
+call, is reported as failed with no workbook; the others still produce
+theirs.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .config import BATCH_WORKERS
+from .fingerprints import document_key
+from .pipeline import process_phase1
+
+WORD_EXTENSIONS = ('.docx',)
+EXCEL_EXTENSIONS = ('.xlsx',)
+
+
+def _stem(name):
+    return os.path.splitext(os.path.basename(name))[0].strip().lower()
+
+
+def pair_documents(names):
+    """
+    Pair each Word document in `names` with a workbook.
+
+    A workbook with the same file name stem as the document wins
+    ("Schedule 3.docx" ↔ "Schedule 3.xlsx"). Documents without one use the
+    shared template: the only workbook in the upload, or the only one not
+    claimed by name. Returns `(word_name, excel_name or None)` tuples in
+    upload order; None means no workbook could be chosen.
+    """
+    word_names = [name for name in names if name.lower().endswith(WORD_EXTENSIONS)
+                  and not os.path.basename(name).startswith('~$')]
+    excel_names = [name for name in names if name.lower().endswith(EXCEL_EXTENSIONS)
+                   and not os.path.basename(name).startswith('~$')]
+
+    by_stem = {_stem(name): name for name in excel_names}
+    claimed = {by_stem[_stem(name)] for name in word_names if _stem(name) in by_stem}
+    unclaimed = [name for name in excel_names if name not in claimed]
+    template = None
+    if len(excel_names) == 1:
+        template = excel_names[0]
+    elif len(unclaimed) == 1:
+        template = unclaimed[0]
+
+    return [(name, by_stem.get(_stem(name), template)) for name in word_names]
+
+
+def _output_name(word_name, used):
+    """Unique `<document stem>.xlsx` entry name for the result zip."""
+    base = os.path.splitext(os.path.basename(word_name))[0]
+    name = f"{base}.xlsx"
+    counter = 2
+    while name in used:
+        name = f"{base} ({counter}).xlsx"
+        counter += 1
+    used.add(name)
+    return name
+
+
+def process_phase1_batch(files, progress=None, owner=None):
+    """
+    Process every Word/Excel pair in `files` (`{name: bytes}`) concurrently.
+
+    `progress(msg, done, total)` is called as each document finishes, and
+    `owner` (the uploading user) scopes the incremental fingerprint keys.
+    Returns `(outputs, report)`: `outputs` maps result workbook names to
+    their bytes, and `report` has one entry per document with its workbook,
+    output name, status and error or incremental extraction report.
+    """
+    pairs = pair_documents(list(files))
+    used_names = set()
+    jobs = []
+    report = []
+    for word_name, excel_name in pairs:
+        entry = {"document": word_name, "workbook": excel_name, "output": None,
+                 "status": "pending", "error": None, "extraction": None}
+        report.append(entry)
+        if excel_name is None:
+            entry["status"] = "failed"
+            entry["error"] = "No matching workbook and no single shared template workbook"
+            continue
+        entry["output"] = _output_name(word_name, used_names)
+        jobs.append(entry)
+
+    def run(entry):
+        target = io.BytesIO()
+        _, extraction = process_phase1(
+            io.BytesIO(files[entry["document"]]),
+            io.BytesIO(files[entry["workbook"]]),
+            target,
+            document_key=document_key(entry["document"], owner),
+            strict=True)
+        return target.getvalue(), extraction
+
+    outputs = {}
+    total = len(report)
+    done = total - len(jobs)
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_WORKERS, len(jobs)))) as pool:
+            futures = {pool.submit(run, entry): entry for entry in jobs}
+            for future in as_completed(futures):
+                entry = futures[future]
+                done += 1
+                try:
+                    outputs[entry["output"]], entry["extraction"] = future.result()
+                    entry["status"] = "ok"
+                    msg = f"Processed {entry['document']}"
+                except Exception as e:
+                    print(f"❌ Error processing {entry['document']}:", str(e))
+                    entry["status"] = "failed"
+                    entry["error"] = str(e)
+                    entry["output"] = None
+                    msg = f"Failed {entry['document']}: {e}"
+                if progress:
+                    progress(msg, done, total)
+
+    return outputs, report
@@ -0,0 +1,149 @@
+"""
+Header-aware chunking for Phase 1 section extraction.
+
+Large tender documents are split on top-level header boundaries ("Returnable
+Schedule", "Schedule", "Appendix" lines or `Heading 1` paragraphs) so the
+chunks can be sent to the model concurrently, and the per-chunk
+`header/subheader/requirements/page_limit` records are merged back in
+document order.
+"""
+import re
+
+HEADER_PATTERN = re.compile(r"^\s*(?:Returnable\s+Schedule|Schedule|Appendix)\b", re.IGNORECASE)
+SUBHEADER_PATTERN = re.compile(r"^\s*\d+\.\d+(?:\.\d+)*\s+")
+HEADER_STYLES = {"Heading 1", "Title"}
+
+
+def is_header_line(text, style=None):
+    return style in HEADER_STYLES or bool(HEADER_PATTERN.match(text))
+
+
+def is_subheader_line(text):
+    return bool(SUBHEADER_PATTERN.match(text))
+
+
+def split_into_header_blocks(lines):
+    """
+    Group `(text, style)` lines into blocks that each start at a top-level header.
+
+    Lines before the first header form a block of their own. Returns a list of
+    `{"header": str, "lines": [str, ...]}` dicts in document order; the header
+    line itself is the first entry of `lines`.
+    """
+    blocks = []
+    current = None
+    for text, style in lines:
+        header = is_header_line(text, style)
+        if header or current is None:
+            current = {"header": text if header else "", "lines": []}
+            blocks.append(current)
+        current["lines"].append(text)
+    return blocks
+
+
+def _split_block(block, max_chars):
+    """Split an oversized block at subheader lines, then at line boundaries."""
+    pieces = []
+    current = []
+    size = 0
+    for line in block["lines"]:
+        starts_subsection = is_subheader_line(line)
+        if current and (size + len(line) > max_chars or (starts_subsection and size > max_chars // 2)):
+            pieces.append(current)
+            current = []
+            size = 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def build_chunks(blocks, max_chars, overlap_lines=3):
+    """
+    Pack header blocks into chunks of roughly `max_chars` characters.
+
+    Whole blocks are packed together while they fit. A block that is too big
+    on its own is split; every piece after the first is prefixed with the
+    block's header line, the last subheader seen and the final
+    `overlap_lines` lines of the previous piece, so a subsection spanning the
+    cut keeps its context. Returns a list of chunk texts in document order.
+    """
+    chunks = []
+    pending = []
+    pending_size = 0
+
+    def flush():
+        nonlocal pending, pending_size
+        if pending:
+            chunks.append("\n".join(pending))
+        pending = []
+        pending_size = 0
+
+    for block in blocks:
+        block_size = sum(len(line) + 1 for line in block["lines"])
+        if block_size > max_chars:
+            flush()
+            previous = []
+            subheader = None
+            for piece in _split_block(block, max_chars):
+                overlap = previous[-overlap_lines:] if previous and overlap_lines else []
+                context = []
+                if previous:
+                    if block["header"] and block["header"] not in overlap:
+                        context.append(block["header"])
+                    if subheader and subheader not in overlap and piece[0] != subheader:
+                        context.append(subheader)
+                chunks.append("\n".join(context + overlap + piece))
+                for line in piece:
+                    if is_subheader_line(line):
+                        subheader = line
+                previous = piece
+            continue
+
+        if pending and pending_size + block_size > max_chars:
+            flush()
+        pending.extend(block["lines"])
+        pending_size += block_size
+    flush()
+    return chunks
+
+
+def _normalise(text):
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+def _record_key(record):
+    return _normalise(record.get("header")), _normalise(record.get("subheader"))
+
+
+def _page_limit_value(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return 0
+
+
+def merge_chunk_sections(chunk_results):
+    """
+    Concatenate per-chunk records in chunk order.
+
+    Where the last record of one chunk and the first record of the next have
+    the same header/subheader, they are the same subsection cut in two (or
+    repeated through the overlap), so they are merged: requirement lines are
+    combined without the repeated ones and the highest page limit wins.
+    """
+    merged = []
+    for records in chunk_results:
+        for position, record in enumerate(records):
+            record = dict(record, requirements=list(record.get("requirements", [])))
+            if position == 0 and merged and _record_key(merged[-1]) == _record_key(record):
+                previous = merged[-1]
+                seen = set(previous["requirements"])
+                previous["requirements"].extend(
+                    line for line in record["requirements"] if line not in seen)
+                if _page_limit_value(record.get("page_limit")) > _page_limit_value(previous.get("page_limit")):
+                    previous["page_limit"] = record.get("page_limit")
+                continue
+            merged.append(record)
+    return merged
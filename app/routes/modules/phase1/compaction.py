@@ -0,0 +1,201 @@
+"""
+Token-budget compaction of Phase 1 document text.
+
+Tender documents repeat a lot of text the section extractor does not need:
+running headers pasted into the body, cover-page boilerplate, the same
+paragraph pasted twice into one schedule. `compact_lines` drops exact and
+near-duplicate paragraphs within each header block, and known boilerplate
+anywhere, before the text goes to the model, and keeps a mapping from every
+removed line back to the line that still stands for it. A paragraph that
+repeats under another header is kept, since it is a requirement of that
+section too. Header, subheader, page-limit and list item lines
+("(c) ...", "2. ...", "- ...") are never removed, boilerplate only matches
+whole-line notices, and the result depends only on the input lines, so cached
+extractions stay valid.
+"""
+import math
+import re
+
+from .chunking import is_header_line, is_subheader_line, split_into_header_blocks
+from .rule_parser import PAGE_LIMIT_LINE
+
+try:
+    import tiktoken
+except ImportError:  # optional; token counts fall back to an estimate
+    tiktoken = None
+
+# Exact duplicates shorter than this are kept: short lines such as "Yes",
+# "N/A" or "(a) Not applicable" legitimately repeat as requirements
+MIN_DUPLICATE_CHARS = 40
+# Near-duplicate detection only for paragraphs at least this long
+MIN_NEAR_DUPLICATE_CHARS = 120
+SHINGLE_SIZE = 3
+# A short line repeated in this many header blocks is a running header/footer
+RUNNING_HEADER_MIN_BLOCKS = 3
+RUNNING_HEADER_MIN_CHARS = 10
+RUNNING_HEADER_MAX_CHARS = 100
+
+LIST_MARKER = re.compile(r"^\s*(?:\(?[0-9ivxlcIVXLC]{1,4}[).]|\(?[a-zA-Z][).]|[-•▪●◦*])\s+")
+
+# (label, pattern, action): "drop" removes every match, "once" keeps the first.
+# Each pattern matches a whole line holding only the notice, so a sentence
+# that merely starts with "Copyright" or "Confidential" is left alone
+BOILERPLATE_PATTERNS = [
+    ("blank page", re.compile(r"^\W*(?:this\s+page\s+(?:has\s+been\s+|is\s+)?(?:intentionally\s+)?left\s+blank)\W*$", re.I), "drop"),
+    ("page number", re.compile(r"^\W*page\s+\d+(?:\s+of\s+\d+)?\W*$", re.I), "drop"),
+    ("copyright", re.compile(
+        r"^\W*(?:(?:©|copyright\s*(?:©|\(c\))?)\s*(?:\d{4}(?:\s*[-–]\s*\d{4})?)[^.;:]{0,80}"
+        r"(?:\.\s*all\s+rights\s+reserved)?|all\s+rights\s+reserved)\W*$", re.I), "once"),
+    ("confidentiality notice", re.compile(r"^\W*(?:commercial[\s-]+in[\s-]+confidence|confidential(?:ity)?(?:\s+notice)?)\W*$", re.I), "once"),
+    ("disclaimer", re.compile(r"^\W*disclaimer\W*$", re.I), "once"),
+]
+
+_encoding = None
+
+
+def count_tokens(text):
+    """Token count for gpt-4o-mini via tiktoken, or a 4-characters-per-token estimate."""
+    global _encoding
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _normalise(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _shingles(normalised):
+    words = normalised.split()
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)}
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _is_protected(text, style):
+    return (is_header_line(text, style) or is_subheader_line(text)
+            or bool(PAGE_LIMIT_LINE.search(text)) or bool(LIST_MARKER.match(text)))
+
+
+def _running_headers(lines):
+    """Normalised short lines that recur in RUNNING_HEADER_MIN_BLOCKS header blocks or more."""
+    blocks_seen = {}
+    for block_number, block in enumerate(split_into_header_blocks(lines)):
+        for text in block["lines"][1 if block["header"] else 0:]:
+            if (RUNNING_HEADER_MIN_CHARS <= len(text) <= RUNNING_HEADER_MAX_CHARS
+                    and not LIST_MARKER.match(text)):
+                blocks_seen.setdefault(_normalise(text), set()).add(block_number)
+    return {text for text, blocks in blocks_seen.items() if len(blocks) >= RUNNING_HEADER_MIN_BLOCKS}
+
+
+def compact_lines(lines, near_duplicate_threshold=0.9):
+    """
+    Compact `(text, style)` paragraph lines for the section extractor.
+
+    Returns a dict with:
+      - "lines": the kept `(text, style)` lines, in order
+      - "keep": one bool per input line
+      - "removed": `{"index", "text", "reason", "kept_as"}` for every dropped
+        line, where `kept_as` is the index of the kept line it duplicates
+        (None for dropped boilerplate)
+      - "tokens_before" / "tokens_after" and per header block "blocks" stats
+    """
+    running = _running_headers(lines)
+    keep = [True] * len(lines)
+    removed = []
+    first_boilerplate = {}
+    # Duplicates are only looked for inside the current header block
+    first_exact = {}
+    kept_shingles = []      # (index, shingle set) of long kept paragraphs
+    shingle_index = {}      # shingle -> positions in kept_shingles
+
+    def remove(index, reason, kept_as=None):
+        keep[index] = False
+        removed.append({"index": index, "text": lines[index][0], "reason": reason, "kept_as": kept_as})
+
+    for index, (text, style) in enumerate(lines):
+        if is_header_line(text, style):
+            first_exact = {}
+            kept_shingles = []
+            shingle_index = {}
+        if _is_protected(text, style):
+            continue
+        normalised = _normalise(text)
+
+        boilerplate = next(((label, action) for label, pattern, action in BOILERPLATE_PATTERNS
+                            if pattern.search(text)), None)
+        if boilerplate:
+            label, action = boilerplate
+            if action == "drop":
+                remove(index, label)
+                continue
+            if label in first_boilerplate:
+                remove(index, label, first_boilerplate[label])
+                continue
+            first_boilerplate[label] = index
+
+        if normalised in first_exact and (len(normalised) >= MIN_DUPLICATE_CHARS or normalised in running):
+            remove(index, "running header" if normalised in running else "duplicate",
+                   first_exact[normalised])
+            continue
+        first_exact.setdefault(normalised, index)
+
+        if len(normalised) < MIN_NEAR_DUPLICATE_CHARS:
+            continue
+        shingles = _shingles(normalised)
+        # Count shared shingles through the index instead of intersecting
+        # against every kept paragraph; Jaccard follows from the counts
+        shared = {}
+        for shingle in shingles:
+            for position in shingle_index.get(shingle, ()):
+                shared[position] = shared.get(position, 0) + 1
+        match = None
+        for position in sorted(shared):
+            other_index, other = kept_shingles[position]
+            common = shared[position]
+            if common / (len(shingles) + len(other) - common) >= near_duplicate_threshold:
+                match = other_index
+                break
+        if match is not None:
+            remove(index, "near duplicate", match)
+            continue
+        for shingle in shingles:
+            shingle_index.setdefault(shingle, []).append(len(kept_shingles))
+        kept_shingles.append((index, shingles))
+
+    compacted = [line for line, kept in zip(lines, keep) if kept]
+
+    blocks = []
+    offset = 0
+    for block in split_into_header_blocks(lines):
+        size = len(block["lines"])
+        before = count_tokens("\n".join(block["lines"]))
+        after = count_tokens("\n".join(
+            text for (text, _), kept in zip(lines[offset:offset + size], keep[offset:offset + size]) if kept))
+        blocks.append({"header": block["header"], "tokens_before": before, "tokens_after": after})
+        offset += size
+
+    return {
+        "lines": compacted,
+        "keep": keep,
+        "removed": removed,
+        "tokens_before": sum(block["tokens_before"] for block in blocks),
+        "tokens_after": sum(block["tokens_after"] for block in blocks),
+        "blocks": blocks,
+    }
+
+
+def log_compaction(result):
+    # Without tiktoken the counts are a characters/4 estimate
+    unit = "tokens" if tiktoken is not None else "tokens (estimated, tiktoken not installed)"
+    print(f"🗜️ Compaction: {result['tokens_before']} → {result['tokens_after']} {unit}, "
+          f"{len(result['removed'])} of {len(result['keep'])} paragraphs removed")
+    for block in result["blocks"]:
+        if block["tokens_after"] < block["tokens_before"]:
+            print(f"   {block['header'] or '(before first header)'}: "
+                  f"{block['tokens_before']} → {block['tokens_after']} tokens")
@@ -0,0 +1,43 @@
+# app/routes/modules/phase1/config.py
+"""
+Configuration settings for Phase 1 writing plan processing
+"""
+import os
+from pathlib import Path
+
+# Table extraction backend: "stream" walks word/document.xml with lxml,
+# "docx" uses the python-docx object model
+TABLE_EXTRACTOR = os.getenv("PHASE1_TABLE_EXTRACTOR", "stream")
+
+# Section extraction: "single" sends the whole document in one call,
+# "chunked" splits it on top-level headers and extracts chunks concurrently,
+# "auto" chunks only documents longer than PHASE1_CHUNK_MAX_CHARS, and
+# "rules" parses locally, sending only low-confidence header blocks to the model
+EXTRACTION_MODE = os.getenv("PHASE1_EXTRACTION_MODE", "auto")
+CHUNK_MAX_CHARS = int(os.getenv("PHASE1_CHUNK_MAX_CHARS", "40000"))
+CHUNK_OVERLAP_LINES = int(os.getenv("PHASE1_CHUNK_OVERLAP_LINES", "3"))
+
+# Maximum number of concurrent model calls
+LLM_CONCURRENCY = int(os.getenv("PHASE1_LLM_CONCURRENCY", "4"))
+
+# Rule-based parsing: header blocks scoring below this go to the model
+RULES_MIN_CONFIDENCE = float(os.getenv("PHASE1_RULES_MIN_CONFIDENCE", "0.8"))
+
+# Incremental re-processing (off by default): header blocks of a re-uploaded
+# document whose paragraph/table fingerprints are unchanged reuse their
+# stored records. Blocks are extracted with PHASE1_EXTRACTION_MODE, and
+# records from another prompt, model or mode are never reused
+INCREMENTAL = os.getenv("PHASE1_INCREMENTAL", "false").lower() in ("1", "true", "yes")
+FINGERPRINT_DIR = Path(os.getenv(
+    "PHASE1_FINGERPRINT_DIR",
+    Path(__file__).resolve().parents[4] / "outputs" / "phase1" / "fingerprints"))
+# Documents kept in the fingerprint store; the least recently used go first
+FINGERPRINT_MAX_DOCUMENTS = int(os.getenv("PHASE1_FINGERPRINT_MAX_DOCUMENTS", "500"))
+
+# Batch uploads: number of Word/Excel pairs processed at the same time
+BATCH_WORKERS = int(os.getenv("PHASE1_BATCH_WORKERS", "4"))
+
+# Compaction: drop duplicate paragraphs and known boilerplate before the
+# section text is sent to the model
+COMPACTION = os.getenv("PHASE1_COMPACTION", "true").lower() in ("1", "true", "yes")
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("PHASE1_NEAR_DUPLICATE_THRESHOLD", "0.9"))
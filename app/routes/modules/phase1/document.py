@@ -0,0 +1,73 @@
+import io
+
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+
+def iter_block_items(parent):
+    """Yield the body paragraphs and tables of a document in document order."""
+    for child in parent.element.body.iterchildren():
+        if child.tag.endswith('}p'):
+            yield Paragraph(child, parent)
+        elif child.tag.endswith('}tbl'):
+            yield Table(child, parent)
+
+
+class ParsedDocument:
+    """
+    A tender DOCX parsed once per request.
+
+    python-docx reads straight from the uploaded file-like object, so no temp
+    file is needed. The body blocks are materialised once, in the order
+    `iter_block_items` yields them, and shared by the section-text builder and
+    the table extractor. The raw package bytes are kept as well so the
+    streaming table extractor can read `word/document.xml` without the
+    python-docx object model.
+    """
+
+    def __init__(self, docx_file):
+        if hasattr(docx_file, 'read'):
+            docx_file.seek(0)
+            self.data = docx_file.read()
+            self.path = None
+            self.document = Document(io.BytesIO(self.data))
+        else:
+            self.data = None
+            self.path = docx_file
+            self.document = Document(docx_file)
+        self.blocks = list(iter_block_items(self.document))
+
+    def open_package(self):
+        """Return something `zipfile.ZipFile` can open for the raw DOCX."""
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        return self.path
+
+    @property
+    def paragraphs(self):
+        return [block for block in self.blocks if isinstance(block, Paragraph)]
+
+    @property
+    def tables(self):
+        return [block for block in self.blocks if isinstance(block, Table)]
+
+    def lines(self):
+        """`(text, style name)` for every non-empty body paragraph, stripped."""
+        lines = []
+        for para in self.paragraphs:
+            text = para.text.strip()
+            if text:
+                lines.append((text, para.style.name if para.style else ''))
+        return lines
+
+    def full_text(self):
+        """Join every non-empty body paragraph, as sent to the section extractor."""
+        return "\n".join(text for text, _ in self.lines())
+
+
+def load_parsed_document(docx_file):
+    """Return `docx_file` as a ParsedDocument, parsing it only if needed."""
+    if isinstance(docx_file, ParsedDocument):
+        return docx_file
+    return ParsedDocument(docx_file)
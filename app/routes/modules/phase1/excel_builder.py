@@ -0,0 +1,160 @@
+"""
+Single-pass Excel builder for Phase 1 output.
+
+Loads the user's workbook once, writes the extracted sections and every
+table sheet, and saves exactly once to whatever target the caller hands
+over (a path or a writable stream, such as an entry of the response zip).
+Section cells only gain wrapping, so the template's own header formatting
+is kept; table header cells share one named style.
+"""
+import re
+
+from openpyxl import load_workbook
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.merge import MergedCellRange
+
+WRAP_ALIGNMENT = Alignment(wrap_text=True)
+TABLE_HEADER_STYLE = "Phase1 Table Header"
+
+# openpyxl's default column width; table columns never shrink below it
+DEFAULT_COLUMN_WIDTH = 13
+
+
+def sanitize_sheet_title(title: str) -> str:
+    # Excel sheet titles: max 31 chars, cannot contain : \ / ? * [ ]
+    safe = re.sub(r'[:\\\/\?\*\[\]]', '_', title)
+    return safe[:31]
+
+
+def break_text_into_lines(text, max_characters=50):
+    words = text.split(' ')
+    lines = []
+    current_line = []
+    for word in words:
+        if len(' '.join(current_line + [word])) > max_characters:
+            lines.append(' '.join(current_line))
+            current_line = [word]
+        else:
+            current_line.append(word)
+    if current_line:
+        lines.append(' '.join(current_line))
+    return '\n'.join(lines)
+
+
+class Phase1WorkbookBuilder:
+    """Collects the sections and tables for one workbook and saves it once."""
+
+    def __init__(self, excel_file):
+        if hasattr(excel_file, 'seek'):
+            excel_file.seek(0)
+        self.wb = load_workbook(excel_file)
+        self._register_styles()
+
+    def _register_styles(self):
+        if TABLE_HEADER_STYLE not in self.wb.named_styles:
+            self.wb.add_named_style(NamedStyle(
+                name=TABLE_HEADER_STYLE,
+                font=Font(bold=True),
+                fill=PatternFill("lightUp", fgColor="FFC400")))
+
+    @staticmethod
+    def _merge(ws, merged, start_row, start_column, end_row, end_column):
+        """
+        Register a merged range without `ws.merge_cells` side work.
+
+        The covered cells are never written and the anchor cell has no border
+        to propagate, so the MergedCell placeholders and border formatting that
+        `merge_cells` creates are not needed. Excel rejects a workbook with
+        overlapping merges, so `merged` (the grid cells already inside a merge
+        on this sheet) is checked first and an overlapping span is left
+        unmerged. Returns whether the range was merged.
+        """
+        covered = {(row, column) for row in range(start_row, end_row + 1)
+                   for column in range(start_column, end_column + 1)}
+        if not covered.isdisjoint(merged):
+            print(f"⚠️ Skipping merge of overlapping span at row {start_row}, column {start_column} "
+                  f"in sheet '{ws.title}'")
+            return False
+        merged.update(covered)
+        coord = CellRange(min_col=start_column, min_row=start_row,
+                          max_col=end_column, max_row=end_row).coord
+        ws.merged_cells.ranges.add(MergedCellRange(ws, coord))
+        return True
+
+    def add_sections(self, sections):
+        """Write the section rows to the active sheet."""
+        ws = self.wb.active
+
+        for column, label in enumerate(("Header", "Subheader", "Requirements", "Page Limit"), start=1):
+            ws.cell(row=1, column=column, value=label).alignment = WRAP_ALIGNMENT
+
+        for row_num, item in enumerate(sections, start=2):
+            requirements = "\n".join(item.get("requirements", []))
+            values = (
+                break_text_into_lines(item.get("header", "")),
+                break_text_into_lines(item.get("subheader", "") or "N/A"),
+                break_text_into_lines(requirements),
+                item.get("page_limit", "0"),
+            )
+            for column, value in enumerate(values, start=1):
+                ws.cell(row=row_num, column=column, value=value).alignment = WRAP_ALIGNMENT
+
+    def add_tables(self, tables):
+        """Add one sheet per extracted table."""
+        for tbl in tables:
+            ws = self.wb.create_sheet(title=sanitize_sheet_title(tbl["heading"]))
+            if "cells" in tbl:
+                widths = self._write_grid(ws, tbl["cells"])
+            else:
+                widths = self._write_rows(ws, tbl["table"])
+
+            for column, width in widths.items():
+                ws.column_dimensions[get_column_letter(column)].width = max(
+                    width, DEFAULT_COLUMN_WIDTH)
+
+    def _write_grid(self, ws, cells):
+        """Write `TableGrid` cells once each, merging the ones that span."""
+        widths = {}
+        merged = set()
+        for cell in cells:
+            r = cell["row"] + 1
+            c = cell["col"] + 1
+            text = cell["text"]
+            excel_cell = ws.cell(row=r, column=c, value=text)
+            if cell["column_header"] or cell["row_header"]:
+                excel_cell.style = TABLE_HEADER_STYLE
+
+            if cell["row_span"] > 1 or cell["col_span"] > 1:
+                self._merge(ws, merged, r, c, r + cell["row_span"] - 1, c + cell["col_span"] - 1)
+
+            # Spanning cells already get the width of every column they cover
+            if cell["col_span"] == 1:
+                widths[c] = max(widths.get(c, 0), len(str(text)) + 2)
+        return widths
+
+    def _write_rows(self, ws, rows):
+        """Write a plain row-by-row table (no span information)."""
+        widths = {}
+        for r, row in enumerate(rows, start=1):
+            for c, cell in enumerate(row, start=1):
+                text = cell["text"]
+                excel_cell = ws.cell(row=r, column=c, value=text)
+                if cell["column_header"] or cell["row_header"]:
+                    excel_cell.style = TABLE_HEADER_STYLE
+                widths[c] = max(widths.get(c, 0), len(str(text)) + 2)
+        return widths
+
+    def save(self, target):
+        """Save the workbook to a path or a writable binary stream."""
+        self.wb.save(target)
+        return target
+
+
+def build_phase1_workbook(excel_file, sections, tables, target):
+    """Load `excel_file` once, add sections and tables, and save once to `target`."""
+    builder = Phase1WorkbookBuilder(excel_file)
+    builder.add_sections(sections)
+    builder.add_tables(tables)
+    return builder.save(target)
@@ -0,0 +1,176 @@
+"""
+Fingerprint store for incremental Phase 1 re-processing.
+
+Tender documents are reissued with small addenda. Each upload is split into
+header blocks (see `split_into_header_blocks`), and every block gets a hash of
+its paragraphs and tables. The store keeps, per document, the hash and the
+extracted section records of every block, so a revised version only needs
+the blocks whose hash changed to go back to the model. Keys are scoped to
+the uploading user, and the least recently used documents are evicted once
+the store holds more than its limit.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+from docx.table import Table
+from lxml import etree
+
+from .chunking import is_header_line
+
+REVISION_SUFFIX = re.compile(
+    r"[\s_\-]*(?:rev(?:ision)?|v(?:ersion)?|addendum|amendment|issue)[\s_\-]*\d+\s*$",
+    re.IGNORECASE)
+# Slugs never contain "--", so it separates the owner from the document
+STORE_KEY = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*(?:--[a-z0-9]+(?:-[a-z0-9]+)*)?$")
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")
+
+
+def document_key(file_name, owner=None):
+    """
+    Store key for an uploaded document name, stable across reissues.
+
+    Directory, extension and trailing revision markers ("_rev2", " v3",
+    "Addendum 1") are dropped, so revised uploads share a key. A "(1)" copy
+    suffix is kept: "Schedule (1)" and "Schedule (2)" are usually different
+    documents of one tender, not revisions. With
+    an `owner` (the uploading user) the key is prefixed with it, so two
+    users uploading the same file name never share stored records.
+    """
+    stem = os.path.splitext(os.path.basename(file_name or ""))[0]
+    previous = None
+    while stem != previous:
+        previous = stem
+        stem = REVISION_SUFFIX.sub("", stem)
+    slug = _slug(stem) or "document"
+    if owner is None:
+        return slug
+    return f"{_slug(owner) or 'anonymous'}--{slug}"
+
+
+def fingerprint_blocks(parsed_doc, version=""):
+    """
+    Split a ParsedDocument into header blocks and hash each one.
+
+    Returns `{"key", "header", "hash", "lines"}` dicts in document order.
+    `key` is the header text plus its occurrence number (headers can repeat),
+    `lines` are the block's `(text, style)` paragraph lines, and `hash`
+    covers those lines and the raw XML of the block's tables, seeded with
+    `version` (see `extraction_version`) so records extracted with another
+    prompt, model or mode are never reused.
+    """
+    blocks = []
+    current = None
+    occurrences = {}
+
+    def start_block(header):
+        occurrences[header] = occurrences.get(header, 0) + 1
+        block = {
+            "key": f"{header}#{occurrences[header]}",
+            "header": header,
+            "lines": [],
+            "_hash": hashlib.sha256(version.encode("utf-8")),
+        }
+        blocks.append(block)
+        return block
+
+    for element in parsed_doc.blocks:
+        if isinstance(element, Table):
+            if current is None:
+                current = start_block("")
+            current["_hash"].update(b"\x00tbl\x00")
+            current["_hash"].update(etree.tostring(element._tbl))
+            continue
+
+        text = element.text.strip()
+        if not text:
+            continue
+        style = element.style.name if element.style else ''
+        if is_header_line(text, style) or current is None:
+            current = start_block(text if is_header_line(text, style) else "")
+        current["lines"].append((text, style))
+        current["_hash"].update(b"\x00p\x00")
+        current["_hash"].update(f"{style}\x00{text}".encode("utf-8"))
+
+    for block in blocks:
+        block["hash"] = block.pop("_hash").hexdigest()
+    return blocks
+
+
+class FingerprintStore:
+    """
+    One JSON file per document key under `root`, written atomically.
+
+    Keys must come from `document_key`; anything else (path separators,
+    "..") is rejected. Loading a document marks it as recently used, and
+    saving evicts the least recently used files beyond `max_documents`.
+    Callers hold `lock(key)` across load and save, so two uploads sharing a
+    key never read and write the same document at the same time.
+    """
+
+    def __init__(self, root, max_documents=None):
+        self.root = Path(root)
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _path(self, key):
+        if not STORE_KEY.match(key or ""):
+            raise ValueError(f"Invalid fingerprint store key: {key!r}")
+        return self.root / f"{key}.json"
+
+    def lock(self, key):
+        """The lock serialising load/modify/save of one document key."""
+        self._path(key)
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def load(self, key):
+        """`{block key: {"hash", "header", "records"}}` for a document, or {}."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                blocks = json.load(f).get("blocks", {})
+        except (FileNotFoundError, ValueError):
+            return {}
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return blocks
+
+    def save(self, key, blocks):
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"blocks": blocks}, f)
+                os.replace(tmp_path, self._path(key))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._evict()
+
+    def _evict(self):
+        if not self.max_documents:
+            return
+        entries = []
+        for path in self.root.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_documents)]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
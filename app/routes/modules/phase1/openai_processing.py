@@ -1,21 +1,32 @@
 
 from docx.text.paragraph import Paragraph
 from docx.table import Table
+import hashlib
 import json
 import io
 import os
 import openai
 from docx import Document
-from openpyxl import load_workbook
 # from google.colab import files
 from openpyxl.styles import Alignment
 from dotenv import load_dotenv
-from openpyxl.styles import Font, PatternFill
 import re
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
 from .models import SectionEntries
+from .document import load_parsed_document
+from .table_stream import stream_tables_with_headings_and_context
+from .table_grid import TableGrid
+from .excel_builder import Phase1WorkbookBuilder
+from .chunking import build_chunks, merge_chunk_sections, split_into_header_blocks
+from .rule_parser import parse_block, parse_sections_locally
+from .compaction import compact_lines, log_compaction
+from .config import (
+    TABLE_EXTRACTOR, EXTRACTION_MODE, CHUNK_MAX_CHARS, CHUNK_OVERLAP_LINES, LLM_CONCURRENCY,
+    RULES_MIN_CONFIDENCE, COMPACTION, NEAR_DUPLICATE_THRESHOLD
+)
 
 # Load environment variables from .env file
 load_dotenv(override=True)
@@ -35,51 +46,259 @@ def get_openai_client():
     return client
 
 
-def extract_content_with_openai2(docx_file):
-    doc = Document(docx_file)
-    full_text = "\n".join([para.text.strip()
-                          for para in doc.paragraphs if para.text.strip()])
-    # full_text = read_docx_with_mammoth(docx_file)
+# Shared cap on in-flight model calls, across chunks and concurrent requests
+llm_slots = threading.BoundedSemaphore(LLM_CONCURRENCY)
 
-    print("🧠 Processing document with OpenAI...")
+SECTION_MODEL = "gpt-4o-mini"
+
+
+def load_section_instructions():
     prompt_path = os.path.join(os.path.dirname(
         __file__), "./prompt.txt")
 
     with open(prompt_path, "r", encoding="utf-8") as f:
-        instructions = f.read()
+        return f.read()
 
-    try:
-        client = get_openai_client()
+
+def extraction_version():
+    """
+    Hash of everything besides the document that shapes a block's records:
+    the prompt, the model, the extraction mode and the compaction settings.
+    """
+    settings = json.dumps([SECTION_MODEL, EXTRACTION_MODE, RULES_MIN_CONFIDENCE,
+                           COMPACTION, NEAR_DUPLICATE_THRESHOLD])
+    return hashlib.sha256((settings + load_section_instructions()).encode("utf-8")).hexdigest()
+
+
+def parse_sections_with_openai(text, instructions=None):
+    """Send one block of document text to the model and return section records."""
+    if instructions is None:
+        instructions = load_section_instructions()
+
+    client = get_openai_client()
+    with llm_slots:
         response = client.responses.parse(
-            model="gpt-4o-mini",
+            model=SECTION_MODEL,
             instructions=instructions,
             input=[
-                {"role": "user", "content": full_text},
+                {"role": "user", "content": text},
             ],
             text_format=SectionEntries,
         )
 
-        response_content = response.output_parsed.Sections
+    response_content = response.output_parsed.Sections
 
-        print(response_content)
+    return [
+        {
+            "header": section.Header,
+            "subheader": subsection.Subheader,
+            "requirements": subsection.Requirements,
+            "page_limit": subsection.PageLimit
+        }
+        for section in response_content
+        for subsection in section.Subheaders
+    ]
 
-        # Truncate for display
-        final_output = [
-            {
-                "header": section.Header,
-                "subheader": subsection.Subheader,
-                "requirements": subsection.Requirements,
-                "page_limit": subsection.PageLimit
-            }
-            for section in response_content
-            for subsection in section.Subheaders
-        ]
+
+def _extract_chunks(chunks, instructions, strict=False):
+    """
+    Extract `chunks` concurrently; a failed chunk contributes no records,
+    or with `strict` its error is raised.
+    """
+    def extract_chunk(chunk):
+        try:
+            return parse_sections_with_openai(chunk, instructions)
+        except Exception as e:
+            print("❌ Error extracting chunk:", str(e))
+            if strict:
+                raise
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(LLM_CONCURRENCY, len(chunks)))) as pool:
+        return list(pool.map(extract_chunk, chunks))
+
+
+def extract_sections_chunked(lines, strict=False):
+    """
+    Split the document on top-level headers and extract the chunks concurrently.
+
+    Wall-clock time follows the largest chunk rather than the whole document;
+    the records are merged back in document order.
+    """
+    chunks = build_chunks(split_into_header_blocks(lines),
+                          CHUNK_MAX_CHARS, CHUNK_OVERLAP_LINES)
+    print(f"🧩 Split document into {len(chunks)} chunks")
+    chunk_results = _extract_chunks(chunks, load_section_instructions(), strict)
+    return merge_chunk_sections(chunk_results)
+
+
+def extract_sections_with_rules(lines, strict=False):
+    """
+    Parse header blocks with the local rules and send only uncertain ones to the model.
+
+    Blocks whose confidence is below PHASE1_RULES_MIN_CONFIDENCE are chunked
+    and extracted by the model; if that fails the rule-based records are
+    kept, or with `strict` the error is raised.
+    """
+    parsed = parse_sections_locally(lines)
+    uncertain = [item for item in parsed if item["confidence"] < RULES_MIN_CONFIDENCE]
+    print(f"📐 Rules parsed {len(parsed) - len(uncertain)} of {len(parsed)} header blocks, "
+          f"{len(uncertain)} sent to OpenAI")
+
+    if uncertain:
+        chunks = []
+        owners = []
+        for item in uncertain:
+            for chunk in build_chunks([item["block"]], CHUNK_MAX_CHARS, CHUNK_OVERLAP_LINES):
+                chunks.append(chunk)
+                owners.append(id(item))
+        chunk_results = _extract_chunks(chunks, load_section_instructions(), strict)
+
+        for item in uncertain:
+            results = [result for owner, result in zip(owners, chunk_results) if owner == id(item)]
+            records = merge_chunk_sections(results)
+            if records:
+                item["records"] = records
+
+    return [record for item in parsed for record in item["records"]]
+
+
+def _extract_header_block(block, instructions):
+    """
+    Records for one fingerprinted header block, using the configured mode.
+
+    Unlike `extract_sections_from_lines`, model errors are raised so a failed
+    block is never stored as if it had no sections.
+    """
+    header_block = {"header": block["header"], "lines": [text for text, _ in block["lines"]]}
+    if not header_block["lines"]:
+        return []
+    if EXTRACTION_MODE == "rules":
+        records, confidence = parse_block(header_block)
+        if confidence >= RULES_MIN_CONFIDENCE:
+            return records
+    chunks = build_chunks([header_block], CHUNK_MAX_CHARS, CHUNK_OVERLAP_LINES)
+    return merge_chunk_sections(
+        [parse_sections_with_openai(chunk, instructions) for chunk in chunks])
+
+
+def extract_sections_incremental(blocks, store, key):
+    """
+    Re-extract only the header blocks that changed since `key` was last processed.
+
+    `blocks` come from `fingerprint_blocks`. Blocks whose hash matches the
+    store reuse their stored records; the rest are extracted concurrently.
+    The store is updated with the new hashes and records, except for blocks
+    whose extraction failed, which are retried on the next upload.
+    Returns `(sections, report)`, where the report lists the headers that were
+    re-extracted, reused, failed or removed. Uploads sharing `key` run one
+    at a time, so each sees the records the previous one saved.
+    """
+    with store.lock(key):
+        return _extract_sections_incremental(blocks, store, key)
+
+
+def _extract_sections_incremental(blocks, store, key):
+    cached = store.load(key)
+    changed = [block for block in blocks
+               if cached.get(block["key"], {}).get("hash") != block["hash"]]
+    print(f"🔁 {len(changed)} of {len(blocks)} header blocks changed for '{key}'")
+
+    if changed and COMPACTION:
+        # Compact the whole document so duplicates across blocks are found,
+        # then hand each changed block only its kept lines
+        compaction = compact_lines([line for block in blocks for line in block["lines"]],
+                                   NEAR_DUPLICATE_THRESHOLD)
+        log_compaction(compaction)
+        keep = iter(compaction["keep"])
+        compacted = {block["key"]: [line for line in block["lines"] if next(keep)] for block in blocks}
+        changed_blocks = [dict(block, lines=compacted[block["key"]]) for block in changed]
+    else:
+        changed_blocks = changed
+
+    def extract(block):
+        try:
+            return _extract_header_block(block, instructions), None
+        except Exception as e:
+            print(f"❌ Error extracting block '{block['header']}':", str(e))
+            return [], e
+
+    results = {}
+    if changed:
+        instructions = load_section_instructions()
+        with ThreadPoolExecutor(max_workers=max(1, min(LLM_CONCURRENCY, len(changed)))) as pool:
+            for block, result in zip(changed_blocks, pool.map(extract, changed_blocks)):
+                results[block["key"]] = result
+
+    sections = []
+    stored = {}
+    report = {"document_key": key, "reextracted": [], "reused": [], "failed": [], "removed": []}
+    for block in blocks:
+        label = block["header"] or "(before first header)"
+        if block["key"] not in results:
+            stored[block["key"]] = cached[block["key"]]
+            sections.extend(cached[block["key"]]["records"])
+            report["reused"].append(label)
+            continue
+
+        records, error = results[block["key"]]
+        sections.extend(records)
+        if error is None:
+            stored[block["key"]] = {"hash": block["hash"], "header": block["header"], "records": records}
+            report["reextracted"].append(label)
+        else:
+            report["failed"].append(label)
+
+    current_keys = {block["key"] for block in blocks}
+    report["removed"] = [entry["header"] or "(before first header)"
+                         for block_key, entry in cached.items() if block_key not in current_keys]
+
+    store.save(key, stored)
+    print_sections_as_table(sections)
+    return sections, report
+
+
+def extract_content_with_openai2(docx_file):
+    doc = load_parsed_document(docx_file)
+    return extract_sections_from_lines(doc.lines())
+
+
+def extract_sections_from_lines(lines, strict=False):
+    """
+    Section records for `(text, style)` paragraph lines.
+
+    Works on plain strings only, so it can run on a worker thread while the
+    parsed document is read elsewhere. A model error gives no records (or
+    only those of the chunks that succeeded); with `strict` it is raised
+    instead, so batch processing can report the document as failed.
+    """
+    if COMPACTION:
+        compaction = compact_lines(lines, NEAR_DUPLICATE_THRESHOLD)
+        log_compaction(compaction)
+        lines = compaction["lines"]
+
+    full_text = "\n".join(text for text, _ in lines)
+    # full_text = read_docx_with_mammoth(docx_file)
+
+    print("🧠 Processing document with OpenAI...")
+
+    try:
+        chunked = EXTRACTION_MODE == "chunked" or (
+            EXTRACTION_MODE == "auto" and len(full_text) > CHUNK_MAX_CHARS)
+        if EXTRACTION_MODE == "rules":
+            final_output = extract_sections_with_rules(lines, strict)
+        elif chunked:
+            final_output = extract_sections_chunked(lines, strict)
+        else:
+            final_output = parse_sections_with_openai(full_text)
 
         print_sections_as_table(final_output)
         return final_output
 
     except Exception as e:
         print("❌ Error in extract_content_with_openai2:", str(e))
+        if strict:
+            raise
         return []
 
 
@@ -211,188 +430,92 @@ def apply_wrap_text(cell):
     cell.alignment = Alignment(wrap_text=True)
 
 
-def break_text_into_lines(text, max_characters=50):
-    words = text.split(' ')
-    lines = []
-    current_line = []
-    for word in words:
-        if len(' '.join(current_line + [word])) > max_characters:
-            lines.append(' '.join(current_line))
-            current_line = [word]
-        else:
-            current_line.append(word)
-    if current_line:
-        lines.append(' '.join(current_line))
-    return '\n'.join(lines)
-
-
 def add_excel_with_sections(sections, excel_file):
-    # Load the Excel file
-    wb = load_workbook(excel_file)
-    ws = wb.active
-
-    # Headers
-    ws["A1"] = "Header"
-    ws["B1"] = "Subheader"
-    ws["C1"] = "Requirements"
-    ws["D1"] = "Page Limit"
-    for cell in ["A1", "B1", "C1", "D1"]:
-        apply_wrap_text(ws[cell])
-
-    row_num = 2
-
-    for item in sections:
-        header = item.get("header", "")
-        subheader = item.get("subheader", "")
-        requirements = "\n".join(item.get("requirements", []))
-        page_limit = item.get("page_limit", "0")
-
-        # Column A - Header
-        cell = ws[f"A{row_num}"]
-        cell.value = break_text_into_lines(header)
-        apply_wrap_text(cell)
-
-        # Column B - Subheader
-        cell = ws[f"B{row_num}"]
-        cell.value = break_text_into_lines(subheader or "N/A")
-        apply_wrap_text(cell)
-
-        # Column C - Requirements
-        cell = ws[f"C{row_num}"]
-        cell.value = break_text_into_lines(requirements)
-        apply_wrap_text(cell)
-
-        # Column D - Page Limit
-        cell = ws[f"D{row_num}"]
-        cell.value = page_limit
-        apply_wrap_text(cell)
-        row_num += 1
-
-    wb.save(excel_file)
-    return excel_file
+    # Load the Excel file, add the section rows and save it back in place
+    builder = Phase1WorkbookBuilder(excel_file)
+    builder.add_sections(sections)
+    return builder.save(excel_file)
 
 
 def extract_tables_from_docx_usingpydocx(word_file):
-    tmp_path = None
-    word_file.seek(0)
-    print("are you here !")
+    doc = load_parsed_document(word_file)
+    tables_data = []
+    print("number of tables in document is", len(doc.tables))
+
+    for index, table in enumerate(doc.tables, start=1):
+        table_content = []
+        for row in table.rows:
+            wrapped_row = []
+            for cell in row.cells:
+                text = cell.text.strip()
+                wrapped_row.append({
+                    "text": text,
+                    "column_header": bool(text),  # naïve header logic
+                    "row_header": bool(text),     # naïve header logic
+                })
+            table_content.append(wrapped_row)
+
+        tables_data.append({
+            "heading": f"Table {index}",
+            "table": table_content
+        })
+
+    print("table data is:")
+    print(tables_data)
+    return tables_data
 
-    try:
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
-            tmp.write(word_file.read())
-            tmp_path = tmp.name
-            print("you are inside the tempfile")
-
-        print('you are inside the try:')
-        doc = Document(tmp_path)
-        tables_data = []
-        print("number of tables in document is", len(doc.tables))
-
-        for index, table in enumerate(doc.tables, start=1):
-            table_content = []
-            for row in table.rows:
-                wrapped_row = []
-                for cell in row.cells:
-                    text = cell.text.strip()
-                    wrapped_row.append({
-                        "text": text,
-                        "column_header": bool(text),  # naïve header logic
-                        "row_header": bool(text),     # naïve header logic
-                    })
-                table_content.append(wrapped_row)
-
-            tables_data.append({
-                "heading": f"Table {index}",
-                "table": table_content
-            })
 
-        print("table data is:")
-        print(tables_data)
-        return tables_data
+def extract_tables_with_headings_and_context(word_file):
+    # Reuse the document parsed for section extraction when the caller has one
+    doc = load_parsed_document(word_file)
+    tables_data = []
+
+    unknown_idx = 1
+    all_elements = doc.blocks
+    current_heading = None
+
+    for idx, element in enumerate(all_elements):
+        if isinstance(element, Paragraph):
+            style = element.style.name if element.style else ''
+            if style.startswith('Heading'):
+                current_heading = element.text.strip()
+
+        elif isinstance(element, Table):
+            # One pass over the w:tc elements; merged cells are read once
+            grid = TableGrid.from_tbl(element._tbl)
+
+            # Capture up to 2 paragraphs before and after the table for context
+            before_context = []
+
+            # Look back for up to 2 paragraphs
+            i = idx - 1
+            while i >= 0 and len(before_context) < 4:
+                prev_elem = all_elements[i]
+                if isinstance(prev_elem, Paragraph):
+                    before_context.insert(0, prev_elem.text.strip())
+                i -= 1
+
+            pred_heading = all_elements[idx-1].text.strip()
+            if (len(pred_heading) > 45 or len(pred_heading) == 0):
+                curr_heading = f"Unknown {unknown_idx}"
+                unknown_idx += 1
+            else:
+                curr_heading = pred_heading
 
-    finally:
-        # Clean up: Delete the temporary file
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
+            tables_data.append({
+                "heading": curr_heading,
+                "table": grid.rows,
+                "cells": grid.cells,
+                "before_context": before_context})
 
+    return tables_data
 
-def extract_tables_with_headings_and_context(word_file):
-    tmp_path = None
-    word_file.seek(0)
-    print("are you here !")
 
-    try:
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
-            tmp.write(word_file.read())
-            tmp_path = tmp.name
-            print("you are inside the tempfile")
-
-        print('you are inside the try:')
-        doc = Document(tmp_path)
-        tables_data = []
-
-        unknown_idx = 1
-        # Helper function to iterate through paragraphs and tables in order
-
-        def iter_block_items(parent):
-            for child in parent.element.body.iterchildren():
-                if child.tag.endswith('}p'):
-                    yield Paragraph(child, parent)
-                elif child.tag.endswith('}tbl'):
-                    yield Table(child, parent)
-
-        all_elements = list(iter_block_items(doc))
-        current_heading = None
-
-        for idx, element in enumerate(all_elements):
-            if isinstance(element, Paragraph):
-                style = element.style.name if element.style else ''
-                if style.startswith('Heading'):
-                    current_heading = element.text.strip()
-
-            elif isinstance(element, Table):
-                table_content = []
-                for row in element.rows:
-                    row_data = []
-                    for cell in row.cells:
-                        text = cell.text.strip()
-                        row_data.append({
-                            "text": text,
-                            "column_header": bool(text),
-                            "row_header": bool(text)
-                        })
-                    table_content.append(row_data)
-
-                # Capture up to 2 paragraphs before and after the table for context
-                before_context = []
-
-                # Look back for up to 2 paragraphs
-                i = idx - 1
-                while i >= 0 and len(before_context) < 4:
-                    prev_elem = all_elements[i]
-                    if isinstance(prev_elem, Paragraph):
-                        before_context.insert(0, prev_elem.text.strip())
-                    i -= 1
-
-                pred_heading = all_elements[idx-1].text.strip()
-                if (len(pred_heading) > 45 or len(pred_heading) == 0):
-                    curr_heading = f"Unknown {unknown_idx}"
-                    unknown_idx += 1
-                else:
-                    curr_heading = pred_heading
-
-                tables_data.append({
-                    "heading": curr_heading,
-                    "table": table_content,
-                    "before_context": before_context})
-
-        return tables_data
-    finally:
-        # Clean up: Delete the temporary file
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
+def extract_tables(word_file):
+    """Extract tables with the backend selected by PHASE1_TABLE_EXTRACTOR."""
+    if TABLE_EXTRACTOR == "docx":
+        return extract_tables_with_headings_and_context(word_file)
+    return stream_tables_with_headings_and_context(word_file)
 
 # def extract_tables_from_docx(word_file):
 #     tmp_path = None
@@ -443,47 +566,11 @@ def extract_tables_with_headings_and_context(word_file):
 #             os.remove(tmp_path)
 
 
-def sanitize_sheet_title(title: str) -> str:
-    # Excel sheet titles: max 31 chars, cannot contain : \ / ? * [ ]
-    safe = re.sub(r'[:\\\/\?\*\[\]]', '_', title)
-    return safe[:31]
-
-
 def add_excel_with_tables(tables, excel_file):
-
-    # Load the Excel file
-    wb = load_workbook(excel_file)
-    ws = wb.active
-
-    header_font = Font(bold=True)
-
-    for tbl in tables:
-        title = sanitize_sheet_title(tbl["heading"])
-        ws = wb.create_sheet(title=title)
-
-        for r, row in enumerate(tbl["table"], start=1):
-            for c, cell in enumerate(row,   start=1):
-                # should print something like {'text': '...', ...}
-                text = cell["text"]
-                # write the TEXT only, not the whole dict
-                excel_cell = ws.cell(row=r, column=c, value=text)
-                if cell["column_header"] or cell["row_header"]:
-                    excel_cell.font = header_font
-                    excel_cell.fill = PatternFill("lightUp", fgColor="FFC400")
-                # Extend the width of the excel cell to fit the text fully
-                from openpyxl.utils import get_column_letter
-                ws.column_dimensions[get_column_letter(c)].width = max(
-                    len(str(text)) + 2, ws.column_dimensions[get_column_letter(c)].width)
-
-    # # Create an in-memory buffer to store the modified Excel file
-    # excel_output = io.BytesIO()
-    wb.save(excel_file)
-    # # Reset the pointer to the start of the buffer
-    # excel_output.seek(0)
-    return excel_file
-
-    # wb.save(output_path)
-    # print(f"✅ Excel file saved to: {output_path}")
+    # Load the Excel file, add one sheet per table and save it back in place
+    builder = Phase1WorkbookBuilder(excel_file)
+    builder.add_tables(tables)
+    return builder.save(excel_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""
+Phase 1 processing pipeline.
+
+Section extraction waits on the model while table extraction is pure local
+CPU work that does not depend on it, so the two run as independent stages on
+a small thread pool. End-to-end latency becomes roughly max(LLM, local work)
+instead of their sum. The workbook is loaded once and saved once.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .config import FINGERPRINT_DIR, FINGERPRINT_MAX_DOCUMENTS, INCREMENTAL
+from .document import ParsedDocument
+from .excel_builder import Phase1WorkbookBuilder
+from .fingerprints import FingerprintStore, fingerprint_blocks
+from .openai_processing import (
+    extract_sections_from_lines, extract_sections_incremental, extract_tables, extraction_version
+)
+
+fingerprint_store = FingerprintStore(FINGERPRINT_DIR, FINGERPRINT_MAX_DOCUMENTS)
+
+
+def process_phase1(word_file, excel_file, target, progress=None, document_key=None, strict=False):
+    """
+    Build the Phase 1 workbook for one Word/Excel pair and save it to `target`.
+
+    `progress(msg, percent)` is called as each stage finishes, in whatever
+    order they complete. With a `document_key` from `document_key()` (and
+    PHASE1_INCREMENTAL on), only header blocks that changed since that
+    document was last processed are sent to the model. With `strict`, a
+    failed model call raises instead of leaving the workbook without (some
+    of) its sections. Returns `(sections, report)`; the report is the
+    incremental extraction report, or None for a full extraction.
+    """
+    def report(msg, percent):
+        print(msg)
+        if progress:
+            progress(msg, percent)
+
+    # Parse the Word document once; the section stage only gets plain text
+    # lines (or fingerprinted blocks of them) so the two stages never share
+    # python-docx objects across threads
+    parsed_doc = ParsedDocument(word_file)
+    incremental = INCREMENTAL and bool(document_key)
+    if incremental:
+        blocks = fingerprint_blocks(parsed_doc, extraction_version())
+    else:
+        lines = parsed_doc.lines()
+    builder = Phase1WorkbookBuilder(excel_file)
+    report('Word document and Excel workbook loaded..', '20%')
+
+    def section_stage():
+        if incremental:
+            sections, extraction_report = extract_sections_incremental(blocks, fingerprint_store, document_key)
+            if strict and extraction_report["failed"]:
+                raise RuntimeError(f"Section extraction failed for: {', '.join(extraction_report['failed'])}")
+            return sections, extraction_report
+        return extract_sections_from_lines(lines, strict), None
+
+    def table_stage():
+        tables = extract_tables(parsed_doc)
+        builder.add_tables(tables)
+        return tables
+
+    stage_messages = {
+        "sections": 'Extract Content from the word Document..',
+        "tables": 'Extracted Tables and added them to the Excel file..',
+    }
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = {
+            pool.submit(section_stage): "sections",
+            pool.submit(table_stage): "tables",
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            stage = futures[future]
+            results[stage] = future.result()
+            report(stage_messages[stage], f"{20 + done * 30}%")
+
+    sections, extraction_report = results["sections"]
+    builder.add_sections(sections)
+    builder.save(target)
+    report('Add Fetched details to the Excel Sheet..', '90%')
+    return sections, extraction_report
@@ -0,0 +1,146 @@
+"""
+Rule-based section parser for Phase 1.
+
+Applies the deterministic rules the extraction prompt describes — headers
+start with "Returnable Schedule/Schedule/Appendix", subheaders match
+`^\\s*\\d+\\.\\d+(?:\\.\\d+)*\\s+`, page limits come from "Page limit: … (N)" —
+and produces the same `header/subheader/requirements/page_limit` records as
+`extract_content_with_openai2`, each with a `confidence` score. Only header
+blocks that score below the threshold need to go to the model.
+"""
+import re
+
+from .chunking import is_subheader_line, split_into_header_blocks
+
+PAGE_LIMIT_LINE = re.compile(r"\bpage\s*limit\b|\bmaximum\b.*\bpages?\b", re.IGNORECASE)
+# "(5)" only counts with a page unit after it ("five (5) A4 pages") or a
+# limit before it ("Maximum (5)"), so list markers such as "(2)" don't
+PAGE_LIMIT_BRACKETED = re.compile(
+    r"\((\d+)\)\s*(?:x\s*)?(?:A[34]\s*)?(?:sides?|pages?|pp)\b(?!\s*limit)"
+    r"|\b(?:max(?:imum)?|limit)\b[^()\d]{0,20}\((\d+)\)",
+    re.IGNORECASE)
+PAGE_LIMIT_DIGITS = re.compile(r"\b(\d+)\s*(?:x\s*)?(?:A[34]\s*)?(?:sides?|pages?)\b", re.IGNORECASE)
+PAGE_LIMIT_WORDS = re.compile(r"\b([a-z]+)\s*(?:A[34]\s*)?(?:sides?|pages?)\b", re.IGNORECASE)
+HEADER_NUMBER = re.compile(r"^\s*(?:Returnable\s+Schedule|Schedule|Appendix)\s+([0-9]+|[A-Z])\b", re.IGNORECASE)
+SHOUTED_LINE = re.compile(r"^[^a-z]*[A-Z]{4,}[^a-z]*$")
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+}
+
+# Subheader titles are short; a long "1.2 ..." line is usually a numbered requirement
+MAX_SUBHEADER_LENGTH = 120
+
+
+def parse_page_limit(line):
+    """
+    Numeric page limit stated on `line`, or None when it has no usable number.
+
+    "(5)" wins over bare digits, which win over number words, so "five (5)
+    A4 pages" reads as 5.
+    """
+    numbers = [int(unit or limit) for unit, limit in PAGE_LIMIT_BRACKETED.findall(line)]
+    if not numbers:
+        numbers = [int(n) for n in PAGE_LIMIT_DIGITS.findall(line)]
+    if not numbers:
+        numbers = [NUMBER_WORDS[w.lower()] for w in PAGE_LIMIT_WORDS.findall(line)
+                   if w.lower() in NUMBER_WORDS]
+    return max(numbers) if numbers else None
+
+
+def _new_record(header, subheader):
+    return {
+        "header": header,
+        "subheader": subheader,
+        "requirements": [],
+        "page_limit": "0",
+        "confidence": 1.0,
+    }
+
+
+def _penalise(record, amount):
+    record["confidence"] = round(max(0.0, record["confidence"] - amount), 2)
+
+
+def parse_block(block):
+    """
+    Parse one header block into records and return `(records, confidence)`.
+
+    The block confidence is the lowest record confidence. Things the rules
+    cannot settle on their own lower it: a "page limit" line without a
+    number, subheader numbering that does not follow the schedule number,
+    subheader-looking lines too long to be titles, all-caps lines that may be
+    unrecognised headers, and text with no header or subheader to hang on.
+    """
+    header = block["header"]
+    lines = block["lines"][1:] if header else block["lines"]
+    header_number = HEADER_NUMBER.match(header)
+    header_number = header_number.group(1) if header_number else None
+
+    records = []
+    current = None
+    page_limits = {}
+
+    for line in lines:
+        if is_subheader_line(line):
+            current = _new_record(header, line)
+            records.append(current)
+            if len(line) > MAX_SUBHEADER_LENGTH:
+                _penalise(current, 0.3)
+            if header_number and header_number.isdigit() and not line.lstrip().startswith(header_number + "."):
+                _penalise(current, 0.1)
+            continue
+
+        if current is None:
+            current = _new_record(header, "N/A")
+            records.append(current)
+        current["requirements"].append(line)
+
+        if PAGE_LIMIT_LINE.search(line):
+            limit = parse_page_limit(line)
+            if limit is None:
+                _penalise(current, 0.5)
+            else:
+                page_limits[id(current)] = max(limit, page_limits.get(id(current), 0))
+        elif SHOUTED_LINE.match(line) and len(line) < 80:
+            _penalise(current, 0.2)
+
+    for record in records:
+        if id(record) in page_limits:
+            record["page_limit"] = str(page_limits[id(record)])
+
+    if not header:
+        # Text before the first header: harmless front matter unless it holds
+        # numbered sections or page limits, which means a header was missed
+        if any(record["subheader"] != "N/A" for record in records) or page_limits:
+            for record in records:
+                _penalise(record, 0.7)
+        else:
+            return [], 1.0
+
+    if header and not records:
+        records.append(_new_record(header, "N/A"))
+    if header and len(records) == 1 and records[0]["subheader"] == "N/A" and len(lines) > 30:
+        # A long schedule with no numbered subsections is often structured
+        # some other way (lettered parts, tables) the rules do not see
+        _penalise(records[0], 0.3)
+
+    confidence = min(record["confidence"] for record in records)
+    return records, confidence
+
+
+def parse_sections_locally(lines):
+    """
+    Apply the rules to `(text, style)` lines, one header block at a time.
+
+    Returns a list of `{"block", "records", "confidence"}` dicts in document
+    order, where `block` is the `split_into_header_blocks` block.
+    """
+    parsed = []
+    for block in split_into_header_blocks(lines):
+        records, confidence = parse_block(block)
+        parsed.append({"block": block, "records": records, "confidence": confidence})
+    return parsed
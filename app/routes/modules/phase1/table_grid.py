@@ -0,0 +1,68 @@
+"""
+Merged-cell-aware table grid for Phase 1.
+
+python-docx's `row.cells` hands back the same `_Cell` once for every grid
+column a `gridSpan`/`vMerge` cell covers, so its text ends up being read and
+stripped again for every copy. `TableGrid` walks the `w:tc` elements once,
+reads each cell's text once and records where the cell sits and how many rows
+and columns it spans, so the Excel writer can merge instead of duplicating.
+"""
+from ..common.ooxml import W_TC, W_TR, cell_text, grid_before, grid_span, v_merge
+
+
+class TableGrid:
+    """
+    Table cells built in one linear pass over the rows of a `w:tbl`.
+
+    `cells` holds each cell record once, with its 0-based `row`/`col` grid
+    position and its `row_span`/`col_span`. `rows` holds the same records laid
+    out the way python-docx `row.cells` does (a spanning cell is repeated per
+    grid column it covers), for callers that want a row-by-row view.
+    """
+
+    def __init__(self):
+        self.cells = []
+        self.rows = []
+        self._open = {}  # grid column -> cell record the next row may continue
+
+    @classmethod
+    def from_tbl(cls, tbl):
+        grid = cls()
+        for tr in tbl:
+            if tr.tag == W_TR:
+                grid.add_row(tr)
+        return grid
+
+    def add_row(self, tr):
+        """Add one `w:tr`; the element can be cleared as soon as this returns."""
+        row_idx = len(self.rows)
+        row = []
+        still_open = {}
+        col = grid_before(tr)
+        for tc in tr:
+            if tc.tag != W_TC:
+                continue
+            span = grid_span(tc)
+            record = None
+            if v_merge(tc) == "continue":
+                record = self._open.get(col)
+                if record is not None:
+                    record["row_span"] = row_idx - record["row"] + 1
+            if record is None:
+                text = cell_text(tc).strip()
+                record = {
+                    "text": text,
+                    "column_header": bool(text),
+                    "row_header": bool(text),
+                    "row": row_idx,
+                    "col": col,
+                    "row_span": 1,
+                    "col_span": span
+                }
+                self.cells.append(record)
+            still_open[col] = record
+            row.extend([record] * record["col_span"])
+            col += span
+        self._open = still_open
+        self.rows.append(row)
+        return row
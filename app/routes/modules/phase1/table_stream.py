@@ -0,0 +1,93 @@
+"""
+Streaming table extractor for Phase 1.
+
+Walks `word/document.xml` straight out of the DOCX zip with `lxml.iterparse`
+instead of building python-docx `Paragraph`/`Table` wrappers. Body paragraphs
+and table rows are processed as soon as they are complete and then cleared,
+so peak memory stays flat no matter how large the tables get.
+"""
+import zipfile
+from collections import deque
+
+from lxml import etree
+
+from .document import ParsedDocument
+from ..common.ooxml import W_BODY, W_P, W_TBL, W_TR, main_document_part, paragraph_text
+from .table_grid import TableGrid
+
+
+def _open_package(word_file):
+    if isinstance(word_file, ParsedDocument):
+        return word_file.open_package()
+    if hasattr(word_file, 'seek'):
+        word_file.seek(0)
+    return word_file
+
+
+def _clear(elem):
+    """Free a processed element and the already-processed siblings before it."""
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def stream_tables_with_headings_and_context(word_file):
+    """
+    Same records as `extract_tables_with_headings_and_context`, without python-docx.
+
+    Each table yields `{"heading", "table", "cells", "before_context"}` (see
+    `TableGrid` for `table` and `cells`): the heading is the paragraph directly
+    above the table when it is short enough, otherwise "Unknown n", and the
+    context is the last four body paragraphs before it.
+    A table with no paragraph directly above it (first block, or right after
+    another table) gets an "Unknown n" heading.
+    """
+    tables_data = []
+    unknown_idx = 1
+
+    recent_paragraphs = deque(maxlen=4)
+    previous_text = None  # text of the previous body block, None for a table
+    grid = None
+
+    with zipfile.ZipFile(_open_package(word_file)) as zf:
+        with zf.open(main_document_part(zf)) as xml:
+            for _, elem in etree.iterparse(xml, events=("end",), tag=(W_P, W_TR, W_TBL), huge_tree=True):
+                parent = elem.getparent()
+
+                if elem.tag == W_P:
+                    if parent is None or parent.tag != W_BODY:
+                        continue  # paragraph inside a table cell
+                    previous_text = paragraph_text(elem).strip()
+                    recent_paragraphs.append(previous_text)
+                    _clear(elem)
+
+                elif elem.tag == W_TR:
+                    if parent is None or parent.getparent() is None or parent.getparent().tag != W_BODY:
+                        continue  # row of a nested table
+                    if grid is None:
+                        grid = TableGrid()
+                    grid.add_row(elem)
+                    _clear(elem)
+
+                elif parent is not None and parent.tag == W_BODY:
+                    pred_heading = previous_text or ""
+                    if (len(pred_heading) > 45 or len(pred_heading) == 0):
+                        curr_heading = f"Unknown {unknown_idx}"
+                        unknown_idx += 1
+                    else:
+                        curr_heading = pred_heading
+
+                    grid = grid or TableGrid()
+                    tables_data.append({
+                        "heading": curr_heading,
+                        "table": grid.rows,
+                        "cells": grid.cells,
+                        "before_context": list(recent_paragraphs)})
+
+                    grid = None
+                    previous_text = None
+                    _clear(elem)
+
+    return tables_data
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+
+def sha256_of_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """
+    On-disk cache of phase 2 artifacts, keyed by the SHA-256 of the DOCX bytes.
+
+    Each key gets a directory holding whichever of these have been stored:
+    the converted `document.pdf`, the per-page text (`pages.json`), the
+    detected TOC (`toc.json`) and the page-to-block anchors
+    (`anchors.json`). Re-submitting the same document, for example
+    with a different .dotx template or after a failed run, reuses them.
+    Entries are evicted least recently used first once the cache grows past
+    `max_bytes`; a `max_bytes` of 0 disables the cache.
+    """
+
+    PDF = "document.pdf"
+    PAGES = "pages.json"
+    TOC = "toc.json"
+    ANCHORS = "anchors.json"
+    LAST_USED = ".last_used"
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key_for(self, docx_path):
+        return sha256_of_file(docx_path)
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def _touch(self, key):
+        marker = os.path.join(self._entry(key), self.LAST_USED)
+        with open(marker, "a"):
+            pass
+        now = time.time()
+        os.utime(marker, (now, now))
+
+    def _path_if_cached(self, key, name):
+        if not self.enabled:
+            return None
+        path = os.path.join(self._entry(key), name)
+        if not os.path.exists(path):
+            return None
+        with self._lock:
+            self._touch(key)
+        return path
+
+    def get_pdf(self, key):
+        """Path of the cached PDF for `key`, or None."""
+        return self._path_if_cached(key, self.PDF)
+
+    def get_pages(self, key):
+        return self._load_json(key, self.PAGES)
+
+    def get_toc(self, key):
+        return self._load_json(key, self.TOC)
+
+    def get_anchors(self, key):
+        return self._load_json(key, self.ANCHORS)
+
+    def _load_json(self, key, name):
+        path = self._path_if_cached(key, name)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put_pdf(self, key, pdf_path):
+        """Copy `pdf_path` into the cache and return the cached path."""
+        if not self.enabled:
+            return pdf_path
+        return self._store(key, self.PDF, lambda tmp: shutil.copyfile(pdf_path, tmp)) or pdf_path
+
+    def put_pages(self, key, page_contents):
+        self._store_json(key, self.PAGES, [{"page": pg["page"], "text": pg["text"]} for pg in page_contents])
+
+    def put_toc(self, key, toc):
+        self._store_json(key, self.TOC, toc)
+
+    def put_anchors(self, key, pages):
+        self._store_json(key, self.ANCHORS, pages)
+
+    def _store_json(self, key, name, value):
+        if not self.enabled:
+            return
+
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+
+        self._store(key, name, write)
+
+    def _store(self, key, name, write):
+        """Write an artifact through a temp file and rename, then evict if needed."""
+        entry = self._entry(key)
+        try:
+            with self._lock:
+                os.makedirs(entry, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=entry, suffix=".tmp")
+                os.close(fd)
+                try:
+                    write(tmp)
+                    os.replace(tmp, os.path.join(entry, name))
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                self._touch(key)
+                self._evict(keep=key)
+            return os.path.join(entry, name)
+        except OSError as e:
+            print(f"⚠️ Could not write {name} to the artifact cache: {e}")
+            return None
+
+    def _evict(self, keep):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for key in os.listdir(self.root):
+            entry = self._entry(key)
+            if not os.path.isdir(entry):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+            marker = os.path.join(entry, self.LAST_USED)
+            last_used = os.path.getmtime(marker) if os.path.exists(marker) else 0
+            entries.append((last_used, key, size))
+            total += size
+
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            print(f"🧹 Evicted {key[:12]} from the artifact cache")
@@ -1,11 +1,20 @@
 
 
-from openai_client import get_openai_client
-from normalize import format_content_for_toc_check
+from .openai_client import cached_chat
+from .normalize import format_content_for_toc_check
+from .toc_heuristics import detect_toc
+from .config import TOC_HEURISTIC_MIN_CONFIDENCE
 
 
 def check_toc_in_pdf(pdf_content):
 
+    # Headings, dot leaders and page numbers settle most documents locally
+    detection = detect_toc(pdf_content)
+    if detection["confidence"] >= TOC_HEURISTIC_MIN_CONFIDENCE:
+        print(f"📑 TOC {'found' if detection['has_toc'] else 'not found'} by heuristics "
+              f"(confidence {detection['confidence']})")
+        return detection["has_toc"]
+
     pdf_content = format_content_for_toc_check(pdf_content)
     if not pdf_content:
         return False
@@ -19,17 +28,15 @@ def check_toc_in_pdf(pdf_content):
     )
 
     try:
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
+        result = cached_chat(
+            prompt,
             model="gpt-4o-mini",
             max_tokens=10,
             temperature=0
         )
 
         # Extract the response text
-        result = response.choices[0].message.content.strip().lower()
-        return result == "true"
+        return result.lower() == "true"
     except Exception as e:
         raise Exception(
             f"Error checking TOC in PDF: {e}. Please check the PDF content and try again."
@@ -0,0 +1,68 @@
+# app/routes/modules/phase2/helper/config.py
+"""
+Configuration settings for Phase 2 document splitting
+"""
+import os
+
+# Section start pages: "aligned" matches all TOC entries together with
+# non-decreasing pages, "independent" searches every entry on its own
+PAGE_MATCHER = os.getenv("PHASE2_PAGE_MATCHER", "aligned")
+
+# Worker threads for batched fuzzy scoring (rapidfuzz cdist); -1 uses all cores
+FUZZY_WORKERS = int(os.getenv("PHASE2_FUZZY_WORKERS", "-1"))
+
+# PDF text extraction: worker processes (0 = one per core) and the page
+# count from which extraction is spread across them. Serial extraction runs
+# at roughly 300-400 pages/s (bench_phase2_read_pdf.py), so below ~200 pages
+# it takes well under a second, while each shard re-parses the PDF and a
+# spawned pool needs ~0.2s per worker to start
+PDF_READ_WORKERS = int(os.getenv("PHASE2_PDF_READ_WORKERS", "0"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PHASE2_PDF_PARALLEL_MIN_PAGES", "200"))
+
+# Artifact cache (converted PDF, page text, detected TOC) keyed by the
+# SHA-256 of the uploaded DOCX; PHASE2_CACHE_MAX_BYTES=0 disables it
+CACHE_DIR = os.path.normpath(os.getenv(
+    "PHASE2_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "..", "..", "..", "..", "..", "outputs", "phase2", "cache")))
+CACHE_MAX_BYTES = int(os.getenv("PHASE2_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+# Number of model responses kept in memory for identical repeat requests
+LLM_MEMO_SIZE = int(os.getenv("PHASE2_LLM_MEMO_SIZE", "256"))
+
+# Local TOC detection and parsing: the model is only asked when the
+# heuristics are less confident than this (0 to 1; above 1 always asks)
+TOC_HEURISTIC_MIN_CONFIDENCE = float(os.getenv("PHASE2_TOC_HEURISTIC_MIN_CONFIDENCE", "0.8"))
+
+# Where the TOC comes from: "auto" reads the DOCX heading styles and only
+# falls back to the PDF text and the model when the document has none,
+# "pdf" always works from the PDF
+TOC_SOURCE = os.getenv("PHASE2_TOC_SOURCE", "auto")
+
+# Model calls in flight at once, and an optional cap on calls started per
+# minute (0 = no cap) to stay under the account's rate limits
+LLM_CONCURRENCY = int(os.getenv("PHASE2_LLM_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("PHASE2_LLM_REQUESTS_PER_MINUTE", "0"))
+
+# Section splitter: "com" drives Word (Windows only), "ooxml" cuts the DOCX
+# XML directly, "auto" uses Word when it is available
+SPLITTER = os.getenv("PHASE2_SPLITTER", "auto")
+# Threads writing the OOXML splitter's sections at once
+SPLIT_WORKERS = int(os.getenv("PHASE2_SPLIT_WORKERS", "4"))
+
+# Output of phase 2: "docx" splits the Word document, "pdf" copies each
+# section's pages out of the converted PDF (the upload's output_format
+# field overrides this); PDFs get bookmarks from the section TOCs
+OUTPUT_FORMAT = os.getenv("PHASE2_OUTPUT_FORMAT", "docx")
+PDF_BOOKMARKS = os.getenv("PHASE2_PDF_BOOKMARKS", "true").lower() == "true"
+
+# DOCX -> PDF conversion: "word" (COM, Windows), "libreoffice" (a pool of
+# headless soffice workers) or "auto" (Word when available, else LibreOffice)
+PDF_CONVERTER = os.getenv("PHASE2_PDF_CONVERTER", "auto")
+SOFFICE_PATH = os.getenv("PHASE2_SOFFICE_PATH", "")
+SOFFICE_WORKERS = int(os.getenv("PHASE2_SOFFICE_WORKERS", "2"))
+# Seconds one conversion may take, and to wait for a worker to come up
+SOFFICE_TIMEOUT = float(os.getenv("PHASE2_SOFFICE_TIMEOUT", "180"))
+SOFFICE_START_TIMEOUT = float(os.getenv("PHASE2_SOFFICE_START_TIMEOUT", "30"))
+# Conversions after which a worker is restarted
+SOFFICE_MAX_CONVERSIONS = int(os.getenv("PHASE2_SOFFICE_MAX_CONVERSIONS", "100"))
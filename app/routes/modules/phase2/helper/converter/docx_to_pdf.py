@@ -1,8 +1,17 @@
 
+import abc
+import atexit
 import os
+import threading
 import urllib.parse
 import time
 
+from ..config import (
+    PDF_CONVERTER, SOFFICE_PATH, SOFFICE_WORKERS, SOFFICE_TIMEOUT, SOFFICE_START_TIMEOUT,
+    SOFFICE_MAX_CONVERSIONS
+)
+from .libreoffice import LibreOfficePool, find_soffice
+
 try:
     import pythoncom
     import win32com.client
@@ -11,16 +20,103 @@ except ImportError:
     WINDOWS_AVAILABLE = False
 
 
+class ConverterUnavailableError(RuntimeError):
+    """No DOCX -> PDF backend can run here."""
+
+
+class PdfConverter(abc.ABC):
+    """A DOCX -> PDF backend: `convert` writes the PDF next to the DOCX and returns its path."""
+
+    name = ""
+
+    @abc.abstractmethod
+    def available(self) -> bool:
+        """Whether this backend can run on this machine."""
+
+    @abc.abstractmethod
+    def convert(self, docx_file: str) -> str:
+        """Convert `docx_file` and return the PDF path."""
+
+
+class WordConverter(PdfConverter):
+    """
+    Converts with Microsoft Word over COM, in a new Word instance per call.
+
+    That is deliberate: conversions arrive on different request threads and
+    a COM object belongs to the thread that created it, and a Word that
+    hangs or crashes on one document takes no later conversion with it.
+    Starting Word costs a few seconds per document; use the LibreOffice
+    pool when that matters.
+    """
+
+    name = "word"
+
+    def available(self):
+        return WINDOWS_AVAILABLE
+
+    def convert(self, docx_file):
+        return convert_with_word(docx_file)
+
+
+class LibreOfficeConverter(PdfConverter):
+    """Converts through a process-wide pool of headless LibreOffice workers."""
+
+    name = "libreoffice"
+
+    def __init__(self):
+        self.soffice = find_soffice(SOFFICE_PATH)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        return self.soffice is not None
+
+    def convert(self, docx_file):
+        with self._lock:
+            if self._pool is None:
+                self._pool = LibreOfficePool(self.soffice, SOFFICE_WORKERS, SOFFICE_TIMEOUT,
+                                             SOFFICE_MAX_CONVERSIONS, SOFFICE_START_TIMEOUT)
+                atexit.register(self._pool.close)
+        pdf_file = os.path.splitext(docx_file)[0] + ".pdf"
+        try:
+            self._pool.convert(docx_file, pdf_file)
+        except Exception as e:
+            raise Exception(
+                f"Error converting DOCX to PDF: {e}. Please check the DOCX file and try again.")
+        print(f"✅ Converted DOCX to PDF: {pdf_file}")
+        return pdf_file
+
+
+CONVERTERS = {converter.name: converter for converter in (WordConverter(), LibreOfficeConverter())}
+
+
+def get_converter(name=None):
+    """The configured backend; "auto" prefers Word, then LibreOffice."""
+    name = (name or PDF_CONVERTER).lower()
+    if name == "auto":
+        converter = next((c for c in CONVERTERS.values() if c.available()), None)
+        if converter is None:
+            raise ConverterUnavailableError(
+                "No DOCX to PDF converter available: install Microsoft Word (Windows) or LibreOffice "
+                "(set PHASE2_SOFFICE_PATH if soffice is not on PATH)")
+        return converter
+    if name not in CONVERTERS:
+        raise ConverterUnavailableError(f"Unknown PDF converter: {name}")
+    if not CONVERTERS[name].available():
+        raise ConverterUnavailableError(f"The {name} PDF converter is not available on this machine")
+    return CONVERTERS[name]
+
+
 def convert_docx_to_pdf(docx_file: str) -> str:
+    """Converts a DOCX file to PDF with the configured backend and returns the PDF path."""
+    return get_converter().convert(docx_file)
+
+
+def convert_with_word(docx_file: str) -> str:
     """
     Converts a DOCX file to PDF using late-binding (DispatchEx) and numeric constants only.
     This code never imports 'constants' or touches 'gen_py'; it will not trigger COM wrapper generation.
     """
-    if not WINDOWS_AVAILABLE:
-        # Return the original docx file if Windows COM is not available
-        print("⚠️ Windows COM not available, skipping PDF conversion")
-        return docx_file
-    
     # 1) Initialize COM on this thread
     # Ensure COM is set up                    :contentReference[oaicite:3]{index=3}
     pythoncom.CoInitialize()
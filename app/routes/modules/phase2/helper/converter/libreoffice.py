@@ -0,0 +1,248 @@
+"""
+DOCX → PDF with a pool of long-lived headless LibreOffice processes.
+
+Each worker owns one `soffice --headless` process listening on a local
+socket, with its own user profile so workers never share state, and
+documents are sent to it over UNO. That needs the `uno` bindings
+(LibreOffice's Python package, shipped with LibreOffice and not installable
+from PyPI). Without them, or when a worker's instance does not come up,
+every conversion is a cold `soffice --convert-to pdf` run on the worker's
+profile, and that is logged. A conversion that runs past its timeout kills
+the process doing it (the worker's instance, or the cold run), and workers
+are restarted after a number of conversions so LibreOffice's memory does
+not grow without bound.
+"""
+import os
+import queue
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    UNO_AVAILABLE = True
+except ImportError:
+    UNO_AVAILABLE = False
+
+
+def find_soffice(path=None):
+    """Path of the soffice binary, or None when LibreOffice is not installed."""
+    if path:
+        return path if os.path.exists(path) else shutil.which(path)
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _property(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+class SofficeWorker:
+    """One headless LibreOffice process with its own profile and port."""
+
+    def __init__(self, soffice, index, start_timeout):
+        self.soffice = soffice
+        self.index = index
+        self.start_timeout = start_timeout
+        self.profile = tempfile.mkdtemp(prefix=f"soffice-worker-{index}-")
+        self.profile_url = "file://" + os.path.abspath(self.profile).replace(os.sep, "/")
+        self.process = None
+        self.port = None
+        self.desktop = None
+        self.conversions = 0
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.port = _free_port()
+        self.process = subprocess.Popen(
+            [self.soffice, f"-env:UserInstallation={self.profile_url}",
+             "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+             f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.conversions = 0
+
+        # The listener takes a few seconds to come up on a cold profile; it
+        # accepts connections once the instance is ready for documents
+        deadline = time.monotonic() + self.start_timeout
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if time.monotonic() > deadline or not self.running:
+                    self.stop()
+                    raise RuntimeError(f"LibreOffice worker {self.index} did not start")
+                time.sleep(0.25)
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+        print(f"🖨️ Started LibreOffice worker {self.index} on port {self.port}")
+
+    def stop(self):
+        self.desktop = None
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+            self.process = None
+
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.profile, ignore_errors=True)
+
+    def convert(self, docx_file, pdf_file, timeout):
+        if not UNO_AVAILABLE:
+            self._convert_with_command(docx_file, pdf_file, timeout)
+            return
+        if not self.running or self.desktop is None:
+            try:
+                self.start()
+            except RuntimeError as e:
+                print(f"⚠️ {e}; converting {os.path.basename(docx_file)} with a cold soffice run")
+                self._convert_with_command(docx_file, pdf_file, timeout)
+                return
+        self._convert_with_listener(docx_file, pdf_file, timeout)
+        self.conversions += 1
+
+    def _convert_with_listener(self, docx_file, pdf_file, timeout):
+        result = {}
+
+        def run():
+            try:
+                document = self.desktop.loadComponentFromURL(
+                    uno.systemPathToFileUrl(os.path.abspath(docx_file)), "_blank", 0,
+                    (_property("Hidden", True),))
+                try:
+                    document.storeToURL(
+                        uno.systemPathToFileUrl(os.path.abspath(pdf_file)),
+                        (_property("FilterName", "writer_pdf_Export"),))
+                finally:
+                    document.close(True)
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            # Killing the process is the only way to abandon a UNO call
+            self.stop()
+            raise TimeoutError(f"conversion took longer than {timeout}s")
+        if "error" in result:
+            raise result["error"]
+
+    def _convert_with_command(self, docx_file, pdf_file, timeout):
+        """
+        A cold `soffice --convert-to pdf` run on the worker's profile.
+
+        The worker's own instance is never running here (no uno, or it did
+        not start), so the run converts the document itself rather than
+        handing it to another process, and killing it on a timeout stops
+        the conversion.
+        """
+        outdir = tempfile.mkdtemp(prefix="soffice-out-")
+        # soffice starts soffice.bin as a child; its own session lets a
+        # timeout kill both
+        process = subprocess.Popen(
+            [self.soffice, f"-env:UserInstallation={self.profile_url}",
+             "--headless", "--norestore", "--convert-to", "pdf", "--outdir", outdir,
+             os.path.abspath(docx_file)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, start_new_session=os.name == "posix")
+        try:
+            try:
+                _, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                if os.name == "posix":
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+                process.communicate()
+                raise TimeoutError(f"conversion took longer than {timeout}s")
+            if process.returncode != 0:
+                raise RuntimeError(f"soffice exited with {process.returncode}: "
+                                   f"{stderr.decode(errors='replace').strip()}")
+            produced = os.path.join(outdir, os.path.splitext(os.path.basename(docx_file))[0] + ".pdf")
+            if not os.path.exists(produced):
+                raise RuntimeError("LibreOffice did not produce a PDF")
+            shutil.move(produced, pdf_file)
+        finally:
+            shutil.rmtree(outdir, ignore_errors=True)
+
+
+class LibreOfficePool:
+    """
+    `size` LibreOffice workers shared by every conversion in the process.
+
+    Workers are started on first use and reused across documents; a
+    conversion waits for a free worker. Without uno the pool only caps how
+    many cold runs go at once. A worker that fails or times out is
+    stopped and restarts on its next conversion, and one that has done
+    `max_conversions` is recycled the same way.
+    """
+
+    def __init__(self, soffice, size, timeout, max_conversions, start_timeout):
+        self.soffice = soffice
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_conversions = max_conversions
+        self.start_timeout = start_timeout
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        if not UNO_AVAILABLE:
+            print("⚠️ LibreOffice's Python uno bindings are not importable; no instances are kept "
+                  "running and every conversion is a cold soffice --convert-to run")
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._workers) < self.size:
+                worker = SofficeWorker(self.soffice, len(self._workers), self.start_timeout)
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+    def convert(self, docx_file, pdf_file):
+        self._ensure_workers()
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no LibreOffice worker free within {self.timeout}s")
+        try:
+            worker.convert(docx_file, pdf_file, self.timeout)
+        except Exception:
+            worker.stop()
+            raise
+        finally:
+            if worker.conversions >= self.max_conversions:
+                print(f"♻️ Recycling LibreOffice worker {worker.index}")
+                worker.stop()
+                worker.conversions = 0
+            self._idle.put(worker)
+        return pdf_file
+
+    def close(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers = []
+            self._idle = queue.Queue()
@@ -0,0 +1,171 @@
+"""
+Heading outline of a DOCX, read straight from its XML.
+
+Word gives a paragraph an outline level through `w:outlineLvl` in its own
+properties or in its style (following `w:basedOn`), and the built-in
+"heading 1".."heading 9" styles carry one. Reading those levels recovers
+the document's structure without converting it to PDF or asking a model.
+"""
+import re
+import zipfile
+
+from lxml import etree
+
+from ...common.ooxml import W_BODY, W_P, W_TBL, W_VAL, main_document_part, paragraph_text, qn
+
+W_PPR = qn("w:pPr")
+W_PSTYLE = qn("w:pStyle")
+W_OUTLINE_LVL = qn("w:outlineLvl")
+W_STYLE = qn("w:style")
+W_STYLE_ID = qn("w:styleId")
+W_TYPE = qn("w:type")
+W_NAME = qn("w:name")
+W_BASED_ON = qn("w:basedOn")
+W_SDT = qn("w:sdt")
+W_SDT_CONTENT = qn("w:sdtContent")
+
+HEADING_STYLE = re.compile(r"^heading\s*([1-9])$", re.I)
+# TOC entries, the TOC's own heading and captions repeat headings or sit
+# outside the outline
+SKIPPED_STYLE = re.compile(r"^(?:toc\b|toc heading$|table of figures$|caption$)", re.I)
+# outlineLvl 9 means body text
+BODY_TEXT_LEVEL = 9
+
+
+def _outline_value(outline):
+    """Value (0..9) of a `w:outlineLvl`, or None when it is missing or invalid."""
+    if outline is None:
+        return None
+    try:
+        value = int(outline.get(W_VAL))
+    except (TypeError, ValueError):
+        return None
+    return value if 0 <= value <= BODY_TEXT_LEVEL else None
+
+
+def _style_levels(zf):
+    """styleId -> outline level (1-based) or None, and the set of skipped styleIds."""
+    try:
+        root = etree.fromstring(zf.read("word/styles.xml"))
+    except KeyError:
+        return {}, set()
+
+    styles = {}
+    for style in root.iter(W_STYLE):
+        if style.get(W_TYPE) != "paragraph":
+            continue
+        name = style.find(W_NAME)
+        based_on = style.find(W_BASED_ON)
+        ppr = style.find(W_PPR)
+        outline = ppr.find(W_OUTLINE_LVL) if ppr is not None else None
+        styles[style.get(W_STYLE_ID)] = {
+            "name": name.get(W_VAL, "") if name is not None else "",
+            "based_on": based_on.get(W_VAL) if based_on is not None else None,
+            "outline": _outline_value(outline),
+        }
+
+    def level(style_id, seen=()):
+        style = styles.get(style_id)
+        if style is None or style_id in seen:
+            return None
+        if style["outline"] is not None:
+            return style["outline"] + 1 if style["outline"] < BODY_TEXT_LEVEL else None
+        match = HEADING_STYLE.match(style["name"])
+        if match:
+            return int(match.group(1))
+        return level(style["based_on"], seen + (style_id,))
+
+    levels = {style_id: level(style_id) for style_id in styles}
+    skipped = {style_id for style_id, style in styles.items() if SKIPPED_STYLE.match(style["name"])}
+    return levels, skipped
+
+
+def _paragraph_level(p, levels, skipped):
+    ppr = p.find(W_PPR)
+    style_id = None
+    if ppr is not None:
+        pstyle = ppr.find(W_PSTYLE)
+        style_id = pstyle.get(W_VAL) if pstyle is not None else None
+        value = _outline_value(ppr.find(W_OUTLINE_LVL))
+        if value is not None and style_id not in skipped:
+            return value + 1 if value < BODY_TEXT_LEVEL else None
+    if style_id is None or style_id in skipped:
+        return None
+    return levels.get(style_id)
+
+
+def _add_heading(outline, p, block, levels, skipped):
+    level = _paragraph_level(p, levels, skipped)
+    text = re.sub(r"\s+", " ", paragraph_text(p)).strip() if level else ""
+    if text:
+        outline.append({"level": level, "text": text, "block": block})
+
+
+def read_docx_outline(docx_path):
+    """
+    Headings of the document body in order, as `[{"level", "text", "block"}]`.
+
+    `level` is 1 for the top outline level, `block` the index of the
+    paragraph, table or content control among the body's children.
+    Headings inside tables, TOC entries and empty headings are left out.
+    `document.xml` is streamed, so large documents are read in one pass
+    with flat memory.
+    """
+    outline = []
+    with zipfile.ZipFile(docx_path) as zf:
+        levels, skipped = _style_levels(zf)
+        with zf.open(main_document_part(zf)) as xml:
+            block = -1
+            for _, elem in etree.iterparse(xml, events=("end",), tag=(W_P, W_TBL, W_SDT), huge_tree=True):
+                parent = elem.getparent()
+                if parent is None:
+                    continue
+                if parent.tag == W_BODY:
+                    # A content control is one block, like a paragraph or table
+                    block += 1
+                    if elem.tag == W_P:
+                        _add_heading(outline, elem, block, levels, skipped)
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+                elif (elem.tag == W_P and parent.tag == W_SDT_CONTENT
+                      and parent.getparent().getparent().tag == W_BODY):
+                    # Paragraph of a content control that becomes the next block
+                    _add_heading(outline, elem, block + 1, levels, skipped)
+    return outline
+
+
+def outline_toc(outline, min_entries=2):
+    """
+    Split the outline into a top-level TOC and one TOC per top-level section.
+
+    The top level is the shallowest level with at least `min_entries`
+    headings, so a lone document title above the sections is ignored. Each
+    section's TOC holds its headings at the next level present below it.
+    Returns `(toc_entries, section_tocs)` as `{"section", "start_page",
+    "block"}` dicts with `start_page` None (pages come from matching against
+    the PDF), or `([], [])` when the document has too few headings.
+    """
+    counts = {}
+    for heading in outline:
+        counts[heading["level"]] = counts.get(heading["level"], 0) + 1
+    top = next((level for level in sorted(counts) if counts[level] >= min_entries), None)
+    if top is None:
+        return [], []
+
+    toc_entries = []
+    section_tocs = []
+    children = None
+    for heading in outline:
+        if heading["level"] == top:
+            toc_entries.append({"section": heading["text"], "start_page": None, "block": heading["block"]})
+            children = []
+            section_tocs.append(children)
+        elif heading["level"] > top and children is not None:
+            children.append(heading)
+
+    for i, children in enumerate(section_tocs):
+        sub_level = min((heading["level"] for heading in children), default=None)
+        section_tocs[i] = [{"section": heading["text"], "start_page": None, "block": heading["block"]}
+                           for heading in children if heading["level"] == sub_level]
+    return toc_entries, section_tocs
@@ -1,6 +1,6 @@
 import re
 from ..models import TocEntries
-from ..openai_client import get_openai_client
+from ..openai_client import cached_parse
 import os
 from ..normalize import format_toccontent_for_tocpage
 
@@ -27,16 +27,13 @@ def extract_page_from_content(page_contents, sections,toc_end_page=None):
     doc_block = "- Document Text given as:\n" + document_text
 
     try:
-        client = get_openai_client()
-        response = client.responses.parse(
+        response_content = cached_parse(
             instructions=instructions,
-            input=[{"role": "user", "content": f"{toc_block}\n\n{doc_block}"}],
+            content=f"{toc_block}\n\n{doc_block}",
             model="gpt-4o-mini",
             temperature=0,
             text_format=TocEntries,
         )
-
-        response_content = response.output_parsed
         return [
             {"section": entry.name, "start_page": int(entry.page_number)}
             for entry in response_content.entries
@@ -50,7 +47,7 @@ def extract_page_from_content(page_contents, sections,toc_end_page=None):
         )
 
 
-def find_section_start_pages(document_pages, toc_entries, threshold=90):
+def find_section_start_pages(document_pages, toc_entries, threshold=90, page_index=None):
     """
     For each entry in toc_entries (which must have a "section" key),
     find the page where that section title most likely begins by:
@@ -67,6 +64,10 @@ def find_section_start_pages(document_pages, toc_entries, threshold=90):
             e.g. [ {"section": "Returnable Schedule 1: Overall capability and experience"}, … ]
         threshold (int):
             The minimum fuzzy ratio (0100) to accept a match.
+        page_index (PageIndex, optional):
+            Index of the whole document, built once. When given, only the pages
+            whose trigrams allow a match are scanned, with all windows of a page
+            scored in one batch; the results are the same.
 
     Returns:
         List[Dict]:  The same toc_entries list, but each dict now has "start_page": <int> or None.
@@ -76,6 +77,24 @@ def find_section_start_pages(document_pages, toc_entries, threshold=90):
         # Remove newlines, collapse multiple whitespace into a single space, lowercase
         return re.sub(r"\s+", " ", s.replace("\n", " ")).strip().lower()
 
+    if page_index is None and hasattr(document_pages, "page_index"):
+        page_index = document_pages.page_index
+    positions = page_index.view(document_pages) if page_index is not None else None
+    if positions is not None:
+        # Indexed search: candidate pages per title, windows scored in batches
+        titles = []
+        owners = []
+        for entry in toc_entries:
+            norm_title = normalize_whitespace(entry.get("section", ""))
+            n_words = len(re.findall(r"\w+", norm_title))
+            if n_words:
+                titles.append((norm_title, n_words))
+                owners.append(entry)
+        for entry, (matched, page) in zip(owners, page_index.find_start_pages(titles, positions, threshold)):
+            if matched:
+                entry["start_page"] = page
+        return toc_entries
+
     for entry in toc_entries:
         raw_title = entry.get("section", "")
 
@@ -1,7 +1,9 @@
 # Add the parent directory to sys.path
 import os
 import sys
-from ..openai_client import get_openai_client
+from ..openai_client import cached_parse
+from ..toc_heuristics import detect_toc
+from ..config import TOC_HEURISTIC_MIN_CONFIDENCE
 from pydantic import BaseModel, Field
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -22,6 +24,11 @@ class TocEndPageModel(BaseModel):
 
 
 def extract_toc_endpage(page_contents):
+    detection = detect_toc(page_contents)
+    if detection["has_toc"] and detection["confidence"] >= TOC_HEURISTIC_MIN_CONFIDENCE:
+        print(f"📑 TOC end page {detection['end_page']} found by heuristics")
+        return detection["end_page"]
+
     # First, format the page contents in whatever way your helper expects.
     page_contents = format_content_for_toc_endpage_extraction(page_contents)
 
@@ -29,15 +36,12 @@ def extract_toc_endpage(page_contents):
         instructions = f.read()
 
     try:
-        client = get_openai_client()
-        response = client.responses.parse(
+        end_page = cached_parse(
             model="gpt-4o-mini",
             instructions=instructions,
-            input=[{"role": "user", "content": page_contents}],
+            content=page_contents,
             text_format=TocEndPageModel,
-        )
-
-        end_page = response.output_parsed.toc_end_page
+        ).toc_end_page
 
         # Ensure the raw_value is an integer
         if not isinstance(end_page, int):
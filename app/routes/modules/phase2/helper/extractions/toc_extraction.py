@@ -1,43 +1,29 @@
-
-import re
 import os
-import sys
 from .extract_toc_endpage import extract_toc_endpage
-from models import TocEntries
-
-# Add the parent directory to sys.path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-
-def import_custom():
-    from openai_client import get_openai_client
-    from normalize import (
-        format_content_for_toc_endpage_extraction,
-        read_pdf,
-        
-        format_toc_page_for_extraction,
-        format_non_toc_page_for_extraction
-    )
-    return (
-        get_openai_client,
-        format_content_for_toc_endpage_extraction,
-        read_pdf,
-        format_toc_page_for_extraction,
-        format_non_toc_page_for_extraction
-    )
-
-
-get_openai_client, \
-    format_content_for_toc_endpage_extraction, \
-    read_pdf, \
-    format_toc_page_for_extraction, \
-    format_non_toc_page_for_extraction = import_custom()
+from ..models import TocEntries
+from ..openai_client import cached_parse
+from ..toc_heuristics import toc_pages, parse_toc_lines
+from ..config import TOC_HEURISTIC_MIN_CONFIDENCE
+from ..normalize import (
+    read_pdf,
+    format_toc_page_for_extraction,
+    format_non_toc_page_for_extraction
+)
+
+
+def extract_toc_from_toc_page(page_contents, toc_end_page=None):
+    # Callers that already know where the TOC ends pass it in, saving a call
+    if toc_end_page is None:
+        toc_end_page = extract_toc_endpage(page_contents)
 
+    print(f"TOC ends on page: {toc_end_page}")
 
-def extract_toc_from_toc_page(page_contents):
-    toc_end_page = extract_toc_endpage(page_contents)
+    # Well-formed "Title ....... 12" lines don't need the model
+    entries, confidence = parse_toc_lines(toc_pages(page_contents, toc_end_page))
+    if len(entries) >= 2 and confidence >= TOC_HEURISTIC_MIN_CONFIDENCE:
+        print(f"📑 Parsed {len(entries)} TOC entries by heuristics (confidence {confidence})")
+        return entries
 
-    print(f"TOC ends on page: {toc_end_page}")
     toc_text = format_toc_page_for_extraction(
         page_contents, toc_end_page)
 
@@ -48,17 +34,12 @@ def extract_toc_from_toc_page(page_contents):
         instructions = f.read()
 
     try:
-        client = get_openai_client()
-        response = client.responses.parse(
+        response_content = cached_parse(
             model="gpt-4o-mini",
             instructions=instructions,
-            input=[
-                {"role": "user", "content": toc_text},
-            ],
+            content=toc_text,
             text_format=TocEntries,
         )
-
-        response_content = response.output_parsed
         return [
             {"section": entry.name, "start_page": int(entry.page_number)}
             for entry in response_content.entries
@@ -82,16 +63,13 @@ def extract_toc_from_nontoc_content(page_contents):
         instructions = f.read()
 
     try:
-        client = get_openai_client()
-        response = client.responses.parse(
+        response_content = cached_parse(
             instructions=instructions,
-            input=[{"role": "user", "content": document_text}],
+            content=document_text,
             model="gpt-4o-mini",
             temperature=0,
             text_format=TocEntries,
         )
-
-        response_content = response.output_parsed
         return [
             {"section": entry.name, "start_page": int(entry.page_number)}
             for entry in response_content.entries
@@ -1,13 +1,109 @@
+import atexit
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 import PyPDF2
 
-
-
-
-def read_pdf(pdf_file):
-
+from .config import PDF_READ_WORKERS, PDF_PARALLEL_MIN_PAGES
+from .pdf_text_worker import extract_page_range
+
+# One pool for the whole process, started on first use and reused by every
+# document; it is only rebuilt when a different worker count is asked for
+# or after a worker dies.
+# Workers are always spawned, never forked: the pool is started from a
+# request thread of the threaded Socket.IO server, and a forked child would
+# inherit whatever locks the other threads held at that moment. Spawned
+# workers import the app package once, when the pool starts.
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def shutdown_pdf_pool():
+    """Stop the PDF read pool's worker processes."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_pdf_pool)
+
+
+def _page_ranges(total_pages, shards):
+    """Split [0, total_pages) into `shards` contiguous ranges of near-equal size."""
+    size, extra = divmod(total_pages, shards)
+    ranges = []
+    start = 0
+    for shard in range(shards):
+        stop = start + size + (1 if shard < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def read_pdf(pdf_file, workers=None):
+    """
+    Text of every PDF page as `[{"page": n, "text": ...}, ...]`.
+
+    Documents with at least PHASE2_PDF_PARALLEL_MIN_PAGES pages are split
+    into contiguous page ranges that the long-lived worker pool extracts in
+    parallel; the ranges are reassembled in order, so the result is the
+    same as the serial path. Workers open the PDF by path, so an uploaded
+    stream is written to a temporary file once rather than sent to every
+    shard. Smaller documents, a single worker, or a failing pool fall back
+    to serial extraction.
+    """
     pdf_reader = PyPDF2.PdfReader(pdf_file)
     total_pages = len(pdf_reader.pages)
+    workers = PDF_READ_WORKERS if workers is None else workers
+    workers = min(workers or os.cpu_count() or 1, total_pages)
+
+    if workers > 1 and total_pages >= PDF_PARALLEL_MIN_PAGES:
+        temp_path = None
+        if hasattr(pdf_file, "read"):
+            pdf_file.seek(0)
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                tmp.write(pdf_file.read())
+                temp_path = tmp.name
+        pdf_path = temp_path or os.fspath(pdf_file)
+        # A few shards per worker keeps the pool busy when pages vary in cost
+        ranges = _page_ranges(total_pages, workers * 4)
+        pool = _get_pool(workers)
+        try:
+            shards = pool.map(extract_page_range, [pdf_path] * len(ranges),
+                              [start for start, _ in ranges], [stop for _, stop in ranges])
+            return [page for shard in shards for page in shard]
+        except Exception as e:
+            print(f"⚠️ Parallel PDF extraction failed ({e}), extracting serially")
+            _discard_pool(pool)
+        finally:
+            if temp_path:
+                os.remove(temp_path)
 
     page_contents = []
 
@@ -21,50 +117,53 @@ def read_pdf(pdf_file):
     return page_contents
 
 
+def _formatted(page_contents, style, build):
+    """Build a prompt string, cached on the corpus when given a PageCorpus."""
+    if hasattr(page_contents, "formatted"):
+        return page_contents.formatted(style, build)
+    return build(page_contents)
+
+
+def _page_blocks(page_contents):
+    """The "=====PAGE n=====" block of every page, built once per document."""
+    def build(pages):
+        return [f"=====PAGE {page['page']}=====\n{page['text']}" for page in pages]
+
+    if hasattr(page_contents, "formatted"):
+        blocks = page_contents.root.formatted("page_blocks", build)
+        return [blocks[position] for position in page_contents.positions]
+    return build(page_contents)
+
+
 def format_content_for_toc_check(page_contents):
     """Format PDF content for checking Table of Contents"""
     # Extract the first 3 pages of text content
-    first_pages_text = " ".join([page["text"] for page in page_contents[:5]])
-    return first_pages_text
+    return _formatted(page_contents[:5], "toc_check", lambda pages: " ".join(
+        [page["text"] for page in pages]))
 
 
 def format_content_for_toc_endpage_extraction(page_contents):
     """Format PDF content for extracting Table of Contents end page"""
 
     # Extract the first 3 pages of text content
-    content = "\n".join(
-        [f"=====PAGE {page['page']}=====\n{page['text']}\n"
-         for page in page_contents[:4]]
-    )
-    return content
+    return _formatted(page_contents[:4], "non_toc", lambda pages: "\n".join(
+        [f"{block}\n" for block in _page_blocks(pages)]))
 
 
 def format_toc_page_for_extraction(page_contents, toc_end_page):
 
     # Get TOC content for section extraction
-    toc_text = "\n".join(
-        [f"\n{page['text']}\n" for page in page_contents[:toc_end_page + 1]]
-    )
-
-    return toc_text
+    return _formatted(page_contents[:toc_end_page + 1], "toc_page", lambda pages: "\n".join(
+        [f"\n{page['text']}\n" for page in pages]))
 
 
 def format_non_toc_page_for_extraction(page_contents):
 
-    document_text = "\n".join(
-        [f"=====PAGE {page['page']}=====\n{page['text']}\n" for page in page_contents]
-    )
-
-    return document_text
+    return _formatted(page_contents, "non_toc", lambda pages: "\n".join(
+        [f"{block}\n" for block in _page_blocks(pages)]))
 
 
 def format_toccontent_for_tocpage(page_contents, toc_end_page):
 
-    toc_text = "\n".join(
-        [
-            f"=====PAGE {page['page']}=====\n{page['text']}"
-            for page in page_contents[toc_end_page + 1:]
-        ]
-    )
-
-    return toc_text
+    return _formatted(page_contents[toc_end_page + 1:], "toc_content", lambda pages: "\n".join(
+        _page_blocks(pages)))
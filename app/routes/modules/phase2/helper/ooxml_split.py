@@ -0,0 +1,435 @@
+"""
+Split a DOCX into sections by editing its OOXML directly.
+
+The COM splitter in `split_by_page.py` needs Word. This one cuts the body of
+`word/document.xml` between block elements (paragraphs, tables, content
+controls), prepends a generated title page and TOC page, and writes a new
+package holding only the parts the slice still references: media, headers,
+footers, charts and hyperlinks of the rest of the document are dropped,
+styles, numbering, settings, fonts and theme are kept. It runs anywhere
+`lxml` does and takes milliseconds per section.
+"""
+import copy
+import posixpath
+import re
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import etree
+from rapidfuzz import fuzz
+
+from ...common.ooxml import W_BODY, W_P, W_TBL, W_VAL, main_document_part, paragraph_text, qn
+from .config import SPLIT_WORKERS
+from .docx_outline import SKIPPED_STYLE
+from .page_corpus import normalize_whitespace
+
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+VML_O_NS = "urn:schemas-microsoft-com:office:office"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+W_SDT = qn("w:sdt")
+W_SECT_PR = qn("w:sectPr")
+W_PPR = qn("w:pPr")
+W_PSTYLE = qn("w:pStyle")
+W_PG_SZ = qn("w:pgSz")
+W_PG_MAR = qn("w:pgMar")
+W_STYLE = qn("w:style")
+W_STYLE_ID = qn("w:styleId")
+W_DOC_DEFAULTS = qn("w:docDefaults")
+W_NAME = qn("w:name")
+W_W = qn("w:w")
+W_LEFT = qn("w:left")
+W_RIGHT = qn("w:right")
+
+BLOCK_TAGS = (W_P, W_TBL, W_SDT)
+# A4 with 1" margins, used when the document has no page size
+DEFAULT_TEXT_WIDTH = 9026
+# A section title found in a paragraph much longer than the title is body text
+TITLE_MATCH_THRESHOLD = 90
+# Relationship types that belong to the whole document rather than to
+# content in the body; they are kept whatever slice is written
+DOCUMENT_REL_TYPES = re.compile(
+    r"/(?:styles|stylesWithEffects|numbering|settings|webSettings|fontTable|theme|"
+    r"footnotes|endnotes|comments|commentsExtended|commentsIds|people|customXml|glossaryDocument)$")
+
+
+def _is_content_rel(rel_type):
+    return DOCUMENT_REL_TYPES.search(rel_type or "") is None
+
+
+def _relationship_ids(elements):
+    """Relationship ids referenced from `elements` (r:id, r:embed, o:relid, …)."""
+    ids = set()
+    for element in elements:
+        for node in element.iter():
+            for name, value in node.attrib.items():
+                if name.startswith(f"{{{R_NS}}}") or name == f"{{{VML_O_NS}}}relid":
+                    ids.add(value)
+    return ids
+
+
+def _rels_path(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def _resolve(part, target):
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part), target)).lstrip("/")
+
+
+def _text_width(sect_pr):
+    """Width between the margins, in twips, for the right-aligned TOC tab."""
+    if sect_pr is None:
+        return DEFAULT_TEXT_WIDTH
+    pg_sz = sect_pr.find(W_PG_SZ)
+    pg_mar = sect_pr.find(W_PG_MAR)
+    try:
+        return int(pg_sz.get(W_W)) - int(pg_mar.get(W_LEFT)) - int(pg_mar.get(W_RIGHT))
+    except (AttributeError, TypeError, ValueError):
+        return DEFAULT_TEXT_WIDTH
+
+
+def _paragraph(text="", bold=False, red=False, size=None, center=False, right_tab=None, page_break=False):
+    p = etree.Element(W_P)
+    if center or right_tab:
+        ppr = etree.SubElement(p, W_PPR)
+        if right_tab:
+            tabs = etree.SubElement(ppr, qn("w:tabs"))
+            etree.SubElement(tabs, qn("w:tab"), {W_VAL: "right", qn("w:pos"): str(right_tab)})
+        if center:
+            etree.SubElement(ppr, qn("w:jc"), {W_VAL: "center"})
+    if text:
+        for i, part in enumerate(text.split("\t")):
+            r = etree.SubElement(p, qn("w:r"))
+            if bold or red or size:
+                rpr = etree.SubElement(r, qn("w:rPr"))
+                if bold:
+                    etree.SubElement(rpr, qn("w:b"))
+                if red:
+                    etree.SubElement(rpr, qn("w:color"), {W_VAL: "FF0000"})
+                if size:
+                    etree.SubElement(rpr, qn("w:sz"), {W_VAL: str(size * 2)})
+            if i:
+                etree.SubElement(r, qn("w:tab"))
+            t = etree.SubElement(r, qn("w:t"))
+            t.text = part
+            t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+    if page_break:
+        r = etree.SubElement(p, qn("w:r"))
+        etree.SubElement(r, qn("w:br"), {qn("w:type"): "page"})
+    return p
+
+
+def front_matter(title, toc_entries, section_start_page, text_width):
+    """
+    Title page and TOC page, laid out like the COM splitter's: a large,
+    bold, red, centred title, then "Table of Contents" with one
+    "Section<TAB>page" line per entry, the page numbers right-aligned and
+    counted from the title page (the section's first page is page 3).
+    """
+    blocks = [_paragraph(title, bold=True, red=True, size=36, center=True),
+              _paragraph(page_break=True),
+              _paragraph("Table of Contents", bold=True, red=True, right_tab=text_width),
+              _paragraph(right_tab=text_width)]
+    for entry in toc_entries:
+        page_number = (entry.get("start_page") or section_start_page) - section_start_page + 3
+        blocks.append(_paragraph(f"{entry.get('section', '')}\t{page_number}", right_tab=text_width))
+    blocks.append(_paragraph(page_break=True))
+    return blocks
+
+
+def merge_template_styles(styles_xml, dotx_path):
+    """
+    Styles of the document with the .dotx template's styles and defaults
+    taking precedence, as attaching the template and updating styles in
+    Word does.
+    """
+    with zipfile.ZipFile(dotx_path) as template:
+        try:
+            template_styles = etree.fromstring(template.read("word/styles.xml"))
+        except KeyError:
+            return styles_xml
+    styles = etree.fromstring(styles_xml)
+
+    by_id = {style.get(W_STYLE_ID): style for style in styles.iter(W_STYLE)}
+    for template_style in template_styles.iter(W_STYLE):
+        replacement = copy.deepcopy(template_style)
+        existing = by_id.get(template_style.get(W_STYLE_ID))
+        if existing is not None:
+            existing.getparent().replace(existing, replacement)
+        else:
+            styles.append(replacement)
+
+    template_defaults = template_styles.find(W_DOC_DEFAULTS)
+    if template_defaults is not None:
+        defaults = styles.find(W_DOC_DEFAULTS)
+        if defaults is not None:
+            styles.replace(defaults, copy.deepcopy(template_defaults))
+        else:
+            styles.insert(0, copy.deepcopy(template_defaults))
+    return etree.tostring(styles, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _body_blocks(body):
+    return [child for child in body if child.tag in BLOCK_TAGS]
+
+
+def _section_properties(blocks, body, end_block):
+    """Section properties in force at `end_block`: the next section break, or the body's."""
+    for block in blocks[end_block:]:
+        if block.tag == W_P:
+            ppr = block.find(W_PPR)
+            sect_pr = ppr.find(W_SECT_PR) if ppr is not None else None
+            if sect_pr is not None:
+                return sect_pr
+    return body.find(W_SECT_PR)
+
+
+def _block_texts(blocks, styles_xml):
+    """
+    Normalised text of every body block, with "" for TOC-styled paragraphs
+    so section titles are never matched in the document's own TOC.
+    """
+    skipped = set()
+    if styles_xml is not None:
+        for style in etree.fromstring(styles_xml).iter(W_STYLE):
+            name = style.find(W_NAME)
+            if name is not None and SKIPPED_STYLE.match(name.get(W_VAL, "")):
+                skipped.add(style.get(W_STYLE_ID))
+
+    texts = []
+    for block in blocks:
+        if block.tag == W_TBL:
+            texts.append("")
+            continue
+        paragraphs = [block] if block.tag == W_P else list(block.iter(W_P))
+        parts = []
+        for p in paragraphs:
+            pstyle = p.find(f"{W_PPR}/{W_PSTYLE}")
+            if pstyle is None or pstyle.get(W_VAL) not in skipped:
+                parts.append(paragraph_text(p))
+        texts.append(normalize_whitespace(" ".join(parts)))
+    return texts
+
+
+def _title_matches(norm_title, text, exact):
+    if not text or len(text) > 2 * len(norm_title) + 20:
+        return False
+    if exact:
+        return text.startswith(norm_title) or norm_title in text
+    return fuzz.ratio(norm_title, text) >= TITLE_MATCH_THRESHOLD
+
+
+def _find_title(block_texts, norm_title, first, last=None):
+    # "Schedule 2" is a fuzzy match for "Schedule 1", so only fall back to
+    # fuzzy matching when the title is nowhere verbatim
+    if not norm_title:
+        return None
+    last = len(block_texts) - 1 if last is None else min(last, len(block_texts) - 1)
+    for exact in (True, False):
+        block = next((i for i in range(first, last + 1)
+                      if _title_matches(norm_title, block_texts[i], exact)), None)
+        if block is not None:
+            return block
+    return None
+
+
+def section_block_ranges(block_texts, toc_entries, anchors=None):
+    """
+    `(start_block, end_block)` of every TOC entry, end inclusive.
+
+    Entries from the heading outline carry their `block`. With `anchors`
+    (a `PageAnchors`), other entries are looked for on the blocks of their
+    start page and otherwise start with that page's first block; without,
+    they are found as the first short block after the previous section's
+    start that holds the title. Entries still unplaced go between their
+    neighbours in proportion to their start pages. Each section ends where
+    the next one starts; the last runs to the end of the body.
+    """
+    starts = []
+    previous = -1
+    for entry in toc_entries:
+        block = entry.get("block")
+        norm_title = normalize_whitespace(entry.get("section", "") or "")
+        page = entry.get("start_page")
+        if block is None and anchors is not None and isinstance(page, int):
+            first, last = anchors.first_block(page), anchors.last_block(page)
+            block = _find_title(block_texts, norm_title, max(first, previous + 1), last + 1)
+            if block is None and first > previous:
+                block = first
+        if block is None:
+            block = _find_title(block_texts, norm_title, previous + 1)
+        if block is not None and block <= previous:
+            block = None
+        starts.append(block)
+        if block is not None:
+            previous = block
+
+    for i, block in enumerate(starts):
+        if block is not None:
+            continue
+        low = next((j for j in range(i - 1, -1, -1) if starts[j] is not None), None)
+        high = next((j for j in range(i + 1, len(starts)) if starts[j] is not None), None)
+        low_block = starts[low] if low is not None else -1
+        high_block = starts[high] if high is not None else len(block_texts)
+        pages = (toc_entries[low].get("start_page") if low is not None else None,
+                 toc_entries[i].get("start_page"),
+                 toc_entries[high].get("start_page") if high is not None else None)
+        fraction = 0.0
+        if None not in pages and pages[2] > pages[0]:
+            fraction = min(1.0, max(0.0, (pages[1] - pages[0]) / (pages[2] - pages[0])))
+        block = low_block + 1 + int(fraction * max(0, high_block - low_block - 1))
+        starts[i] = max(0, min(block, len(block_texts) - 1))
+
+    ranges = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] - 1 if i + 1 < len(starts) else len(block_texts) - 1
+        ranges.append((start, max(start, end)))
+    return ranges
+
+
+# Media that is already compressed is stored as is rather than deflated again
+STORED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".tif", ".tiff")
+
+
+def _xml_bytes(element):
+    return etree.tostring(element, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+class SourcePackage:
+    """
+    A DOCX read once for writing any number of sections from it.
+
+    Every part's bytes are read a single time and written unchanged into
+    each section that still references the part; the document is parsed
+    once and the .dotx styles are merged once. `block_texts` holds the
+    normalised text of every body block for `section_block_ranges`.
+    """
+
+    def __init__(self, input_path, dotx_path=None):
+        with zipfile.ZipFile(input_path) as zf:
+            self.names = zf.namelist()
+            self.parts = {name: zf.read(name) for name in self.names}
+            self.document_part = main_document_part(zf)
+        self.document = etree.fromstring(self.parts[self.document_part])
+        self.body = self.document.find(W_BODY)
+        self.blocks = _body_blocks(self.body)
+        self.rels_name = _rels_path(self.document_part)
+        self._rels = {}
+        self._rels_lock = threading.Lock()
+
+        self.styles_part = next((_resolve(self.document_part, rel.get("Target"))
+                                 for rel in self.rels(self.document_part)
+                                 if rel.get("Type", "").endswith("/styles")), None)
+        self.block_texts = _block_texts(self.blocks, self.parts.get(self.styles_part))
+        if dotx_path and self.styles_part in self.parts:
+            self.parts[self.styles_part] = merge_template_styles(self.parts[self.styles_part], dotx_path)
+
+    def rels(self, part):
+        """Parsed relationships of `part` ("" for the package), or an empty list."""
+        with self._rels_lock:
+            if part not in self._rels:
+                rels_name = "_rels/.rels" if part == "" else _rels_path(part)
+                data = self.parts.get(rels_name)
+                self._rels[part] = etree.fromstring(data) if data is not None else []
+            return self._rels[part]
+
+    def reachable_parts(self, document_rels):
+        """Parts reachable from the package root, with the document's rels filtered."""
+        seen = set()
+        pending = ["", self.document_part]
+        while pending:
+            part = pending.pop()
+            if part in seen:
+                continue
+            seen.add(part)
+            rels = document_rels if part == self.document_part else self.rels(part)
+            if part != self.document_part and len(rels):
+                seen.add("_rels/.rels" if part == "" else _rels_path(part))
+            for rel in rels:
+                if rel.get("TargetMode") == "External":
+                    continue
+                target = _resolve(part, rel.get("Target"))
+                if target in self.parts:
+                    pending.append(target)
+        seen.discard("")
+        seen.add(self.rels_name)
+        return seen
+
+    def write_section(self, start_block, end_block, output_path, title, toc_entries, section_start_page=0):
+        """
+        Write body blocks `start_block..end_block` to `output_path` behind a
+        title page and TOC page.
+
+        `section_start_page` is the section's first page (0-based, like the
+        TOC entries' `start_page`) for the page numbers on the TOC page.
+        """
+        sect_pr = _section_properties(self.blocks, self.body, end_block)
+        sect_pr = copy.deepcopy(sect_pr) if sect_pr is not None else None
+
+        body = etree.Element(W_BODY)
+        for block in front_matter(title, toc_entries, section_start_page, _text_width(sect_pr)):
+            body.append(block)
+        for block in self.blocks[start_block:end_block + 1]:
+            body.append(copy.deepcopy(block))
+        if sect_pr is not None:
+            body.append(sect_pr)
+        document = etree.Element(self.document.tag, attrib=dict(self.document.attrib), nsmap=self.document.nsmap)
+        for child in self.document:
+            document.append(body if child is self.body else copy.deepcopy(child))
+
+        # Only relationships the slice (or its headers/footers via sectPr)
+        # uses, plus the document-level ones (styles, numbering, …)
+        # A document without relationships gets an empty part for them
+        rels_xml = self.parts.get(self.rels_name)
+        rels = (etree.fromstring(rels_xml) if rels_xml is not None
+                else etree.Element(f"{{{PKG_REL_NS}}}Relationships", nsmap={None: PKG_REL_NS}))
+        used = _relationship_ids([body])
+        for rel in list(rels):
+            if rel.get("Id") not in used and _is_content_rel(rel.get("Type")):
+                rels.remove(rel)
+        parts = self.reachable_parts(rels)
+
+        content_types = etree.fromstring(self.parts["[Content_Types].xml"])
+        for override in list(content_types.iter(f"{{{CT_NS}}}Override")):
+            if override.get("PartName").lstrip("/") not in parts:
+                content_types.remove(override)
+
+        replaced = {
+            self.document_part: _xml_bytes(document),
+            self.rels_name: _xml_bytes(rels),
+        }
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as out:
+            out.writestr("[Content_Types].xml", _xml_bytes(content_types))
+            for name in self.names:
+                if name == "[Content_Types].xml" or name not in parts:
+                    continue
+                stored = name.lower().endswith(STORED_EXTENSIONS)
+                out.writestr(name, replaced.get(name) or self.parts[name],
+                             compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+
+    def write_sections(self, sections, progress=None, workers=None):
+        """
+        Write every section from the one loaded source.
+
+        Each section is a dict with `start_block`, `end_block`,
+        `output_path`, `title`, `toc_entries` and `section_start_page` (see
+        `write_section`). Sections are written by `workers` threads
+        (PHASE2_SPLIT_WORKERS by default): most of the time goes to zlib
+        compressing the parts, which runs outside the GIL, and the source
+        tree is only read. `progress(i)` is called for each section in
+        order once it is written.
+        """
+        workers = SPLIT_WORKERS if workers is None else workers
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sections) or 1))) as pool:
+            futures = [pool.submit(self.write_section, section["start_block"], section["end_block"],
+                                   section["output_path"], section["title"], section["toc_entries"],
+                                   section.get("section_start_page", 0))
+                       for section in sections]
+            for i, future in enumerate(futures):
+                future.result()
+                if progress:
+                    progress(i)
+
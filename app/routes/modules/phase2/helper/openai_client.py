@@ -1,7 +1,15 @@
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from .config import LLM_MEMO_SIZE, LLM_CONCURRENCY, LLM_REQUESTS_PER_MINUTE
+
 # Load environment variables
 load_dotenv(override=True)
 
@@ -17,3 +25,100 @@ def get_openai_client():
             raise ValueError("OPENAI_API_KEY environment variable is not set")
         client = OpenAI(api_key=api_key)
     return client
+
+
+class RateLimiter:
+    """Spaces call starts at least 60/requests_per_minute seconds apart."""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# Shared cap on in-flight model calls and their start rate, across sections
+# and concurrent uploads
+llm_slots = threading.BoundedSemaphore(max(1, LLM_CONCURRENCY))
+rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE)
+
+
+# Results of model calls, keyed by everything that was sent. Phase 2 asks the
+# same questions about the same text more than once per run (and again on a
+# retry of the same document), so identical requests are answered from here.
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _memo_key(kind, **request):
+    payload = json.dumps([kind, request], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _memoized(key, call):
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            print("♻️ Reusing an earlier OpenAI response")
+            return _memo[key]
+
+    with llm_slots:
+        rate_limiter.wait()
+        result = call()
+
+    with _memo_lock:
+        _memo[key] = result
+        _memo.move_to_end(key)
+        while len(_memo) > LLM_MEMO_SIZE:
+            _memo.popitem(last=False)
+    return result
+
+
+def cached_parse(instructions, content, text_format, model="gpt-4o-mini", **kwargs):
+    """
+    `client.responses.parse` for one user message, memoised on the model,
+    instructions, content, output schema and any extra arguments.
+
+    Returns a copy of `response.output_parsed`, so callers may modify it.
+    """
+    key = _memo_key("parse", model=model, instructions=instructions, content=content,
+                    text_format=text_format.__name__, kwargs=kwargs)
+
+    def call():
+        response = get_openai_client().responses.parse(
+            model=model,
+            instructions=instructions,
+            input=[{"role": "user", "content": content}],
+            text_format=text_format,
+            **kwargs,
+        )
+        return response.output_parsed
+
+    return _memoized(key, call).model_copy(deep=True)
+
+
+def cached_chat(prompt, model="gpt-4o-mini", **kwargs):
+    """
+    `client.chat.completions.create` for one user prompt, memoised on the
+    model, prompt and extra arguments. Returns the stripped message text.
+    """
+    key = _memo_key("chat", model=model, prompt=prompt, kwargs=kwargs)
+
+    def call():
+        response = get_openai_client().chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            **kwargs,
+        )
+        return response.choices[0].message.content.strip()
+
+    return _memoized(key, call)
@@ -0,0 +1,162 @@
+import re
+
+from .page_corpus import normalize_whitespace
+from .page_index import PageIndex
+
+EXACT_SCORE = 100
+# Taken off an entry that starts on the same page as the entry before it,
+# so sections only share a page when nothing better fits
+SAME_PAGE_PENALTY = 5
+# A page listing this many titles, packed closer than LISTING_MAX_GAP
+# characters apart, is a TOC or list of schedules rather than section starts
+LISTING_MIN_TITLES = 4
+LISTING_MAX_GAP = 40
+
+
+def _listing_ranks(page_index, positions, titles, exact):
+    """Ranks of pages that list the titles (TOC-like) instead of starting sections."""
+    on_page = {}
+    for i, ranks in enumerate(exact):
+        for rank in ranks:
+            on_page.setdefault(rank, []).append(titles[i][0])
+
+    listing = set()
+    for rank, page_titles in on_page.items():
+        if len(page_titles) < LISTING_MIN_TITLES:
+            continue
+        norm_page = page_index.pages[positions[rank]]["norm"]
+        spans = sorted((norm_page.find(title), norm_page.find(title) + len(title)) for title in page_titles)
+        gaps = sorted(max(0, start - previous_end)
+                      for (_, previous_end), (start, _) in zip(spans, spans[1:]))
+        if gaps[len(gaps) // 2] <= LISTING_MAX_GAP:
+            listing.add(rank)
+    return listing
+
+
+def align_section_start_pages(document_pages, toc_entries, threshold=90, page_index=None):
+    """
+    Find start pages for all `toc_entries` at once, keeping them in document order.
+
+    TOC entries are listed in the order the sections appear, so their start
+    pages can never decrease. Entries are aligned to pages by dynamic
+    programming over entries × candidate pages, ignoring pages that list
+    many titles close together (a TOC):
+      1. pages containing each title exactly are aligned first;
+      2. entries left unmatched are fuzzy-scored (same window scoring and
+         `threshold` as `find_section_start_pages`) only on the pages between
+         their matched neighbours, and the alignment is redone;
+      3. entries still unmatched keep their existing `start_page` clamped
+         between their neighbours, or take the previous entry's page.
+
+    Every entry gets an int `start_page` and a `match` of "exact", "fuzzy"
+    or "fallback". Returns the same toc_entries list.
+    """
+    if page_index is None and hasattr(document_pages, "page_index"):
+        page_index = document_pages.page_index
+    if page_index is None or page_index.view(document_pages) is None:
+        page_index = PageIndex(document_pages)
+    positions = page_index.view(document_pages)
+    if not positions:
+        return toc_entries
+    order = {position: rank for rank, position in enumerate(positions)}
+
+    titles = []
+    for entry in toc_entries:
+        norm_title = normalize_whitespace(entry.get("section", "") or "")
+        n_words = len(re.findall(r"\w+", norm_title))
+        titles.append((norm_title, n_words) if n_words else None)
+
+    exact = []
+    fuzzy = []
+    for title in titles:
+        if title is None:
+            exact.append([])
+            fuzzy.append([])
+            continue
+        exact_positions, fuzzy_positions = page_index.candidates(title[0], positions, threshold)
+        exact.append([order[p] for p in exact_positions])
+        fuzzy.append([order[p] for p in fuzzy_positions])
+
+    # Titles on a TOC-like page are listings, not section starts
+    listing = _listing_ranks(page_index, positions, titles, exact)
+    if listing:
+        exact = [[rank for rank in ranks if rank not in listing] for ranks in exact]
+        fuzzy = [[rank for rank in ranks if rank not in listing] for ranks in fuzzy]
+
+    # 1. exact matches only
+    assigned = _align([[(rank, EXACT_SCORE) for rank in ranks] for ranks in exact])
+
+    # 2. fuzzy candidates for the gaps, limited to the neighbours' window
+    candidates = [[(rank, EXACT_SCORE) for rank in ranks] for ranks in exact]
+    windows = {}
+    for i, title in enumerate(titles):
+        if title is None or assigned[i] is not None:
+            continue
+        low = next((assigned[j] for j in range(i - 1, -1, -1) if assigned[j] is not None), 0)
+        high = next((assigned[j] for j in range(i + 1, len(assigned)) if assigned[j] is not None),
+                    len(positions) - 1)
+        windows[i] = [rank for rank in fuzzy[i] if low <= rank <= high]
+    scores = page_index.window_scores(
+        ((positions[rank], titles[i][0], titles[i][1]) for i, ranks in windows.items() for rank in ranks),
+        threshold)
+    for i, ranks in windows.items():
+        for rank in ranks:
+            score = scores[(positions[rank], titles[i][0], titles[i][1])]
+            if score >= threshold:
+                candidates[i].append((rank, score))
+    assigned = _align(candidates)
+
+    # 3. fallback for entries nothing matched
+    for i, entry in enumerate(toc_entries):
+        if assigned[i] is not None:
+            entry["start_page"] = page_index.pages[positions[assigned[i]]]["page"]
+            entry["match"] = "exact" if assigned[i] in exact[i] else "fuzzy"
+
+    first_page = page_index.pages[positions[0]]["page"]
+    last_page = page_index.pages[positions[-1]]["page"]
+    previous_page = first_page
+    for i, entry in enumerate(toc_entries):
+        if assigned[i] is not None:
+            previous_page = entry["start_page"]
+            continue
+        next_page = next((entry_after["start_page"] for j, entry_after in enumerate(toc_entries[i + 1:], start=i + 1)
+                          if assigned[j] is not None), last_page)
+        existing = entry.get("start_page")
+        if isinstance(existing, int):
+            entry["start_page"] = min(max(existing, previous_page), next_page)
+        else:
+            entry["start_page"] = previous_page
+        entry["match"] = "fallback"
+        previous_page = entry["start_page"]
+
+    return toc_entries
+
+
+def _align(candidates):
+    """
+    Highest-scoring choice of at most one candidate per entry with
+    non-decreasing ranks.
+
+    `candidates[i]` lists `(rank, score)` for entry i. Alignments are compared
+    by total score, less SAME_PAGE_PENALTY for every entry on the same page
+    as the previous matched entry, then by the earliest pages. Returns one
+    rank or None per entry.
+    """
+    # last matched rank -> (key, chosen ranks); key = (score, -sum of ranks)
+    states = {-1: ((0, 0), [])}
+    for entry_candidates in candidates:
+        new_states = {last: (key, path + [None]) for last, (key, path) in states.items()}
+        ordered = sorted(states.items())
+        for rank, score in entry_candidates:
+            best = None
+            for last, (key, path) in ordered:
+                if last > rank:
+                    break
+                gain = score - (SAME_PAGE_PENALTY if last == rank else 0)
+                candidate_key = (key[0] + gain, key[1] - rank)
+                if best is None or candidate_key > best[0]:
+                    best = (candidate_key, path)
+            if best is not None and (rank not in new_states or best[0] > new_states[rank][0]):
+                new_states[rank] = (best[0], best[1] + [rank])
+        states = new_states
+    return max(states.values(), key=lambda state: state[0])[1]
@@ -0,0 +1,135 @@
+"""
+Map PDF pages to DOCX body blocks.
+
+Section boundaries are found as PDF pages, but the OOXML splitter cuts the
+DOCX between body blocks. Both hold the same text in the same order, so
+after dropping everything but letters and digits ("compact" text) each
+page's opening text can be found in the compact text of the block stream,
+walking forward from where the previous page started. That gives every
+page the block it starts in and the block it ends in, with no layout
+engine involved.
+"""
+import re
+from bisect import bisect_right
+
+from ...common.ooxml import W_T
+
+# Length of a probe taken from a page's text, and how many to try before
+# giving up on a page (its first lines may be a running header or a page
+# number that is not in the body)
+PROBE_LENGTH = 40
+MAX_PROBES = 12
+# How far past the previous page a page's text is looked for, relative to
+# the page's own compact length, plus a fixed allowance
+SEARCH_FACTOR = 4
+SEARCH_SLACK = 2000
+
+
+def compact(text):
+    """Lowercase letters and digits only, so PDF and DOCX text compare equal."""
+    return re.sub(r"[\W_]+", "", (text or "").lower())
+
+
+def block_text(block):
+    """Visible text of a body block (field codes and deleted text left out)."""
+    return "".join(t.text or "" for t in block.iter(W_T))
+
+
+class PageAnchors:
+    """
+    `page -> (first_block, last_block)` for every page of a document.
+
+    `pages[i]` holds the blocks page i starts and ends in (a block spanning
+    a page break counts for both pages). Build it with `build` from the
+    page corpus and the body blocks, or restore a cached `pages` list.
+    """
+
+    def __init__(self, pages):
+        self.pages = [tuple(page) for page in pages]
+
+    def __len__(self):
+        return len(self.pages)
+
+    def first_block(self, page):
+        return self.pages[min(max(page, 0), len(self.pages) - 1)][0]
+
+    def last_block(self, page):
+        return self.pages[min(max(page, 0), len(self.pages) - 1)][1]
+
+    def blocks_for(self, start_page, end_page):
+        """First block of `start_page` and last block of `end_page`, inclusive."""
+        return self.first_block(start_page), max(self.first_block(start_page), self.last_block(end_page))
+
+    @classmethod
+    def build(cls, page_contents, blocks):
+        """
+        Align the pages of `page_contents` (the whole document, in order)
+        with the body `blocks` (`SourcePackage.blocks`).
+        """
+        block_starts = []
+        stream = []
+        length = 0
+        for block in blocks:
+            block_starts.append(length)
+            text = compact(block_text(block))
+            stream.append(text)
+            length += len(text)
+        stream = "".join(stream)
+        if not block_starts:
+            return cls([(0, 0)] * len(page_contents))
+
+        page_texts = [compact(page["text"]) for page in page_contents]
+        starts = [None] * len(page_texts)
+        cursor = 0
+        for i, text in enumerate(page_texts):
+            found = _locate(stream, text, cursor, cursor + SEARCH_FACTOR * len(text) + SEARCH_SLACK)
+            if found is not None:
+                starts[i] = cursor = found
+
+        _interpolate(starts, page_texts, len(stream))
+
+        def block_at(offset):
+            return max(0, bisect_right(block_starts, offset) - 1)
+
+        pages = []
+        for i, start in enumerate(starts):
+            first = block_at(start)
+            end = starts[i + 1] - 1 if i + 1 < len(starts) else len(stream) - 1
+            pages.append((first, max(first, block_at(end))))
+        return cls(pages)
+
+
+def _locate(stream, text, low, high):
+    """Offset in `stream` where `text` starts, probing from its beginning."""
+    for offset in range(0, min(len(text), PROBE_LENGTH * MAX_PROBES), PROBE_LENGTH):
+        probe = text[offset:offset + PROBE_LENGTH]
+        if len(probe) < PROBE_LENGTH // 2:
+            break
+        position = stream.find(probe, low, high + len(probe))
+        if position >= 0:
+            # Walk back over the text before the probe while it still agrees,
+            # stopping at whatever (a header, a page number) isn't in the body
+            back = 0
+            while (back < offset and position - back > low
+                   and text[offset - back - 1] == stream[position - back - 1]):
+                back += 1
+            return position - back
+    return None
+
+
+def _interpolate(starts, page_texts, stream_length):
+    """Place pages nothing matched between their neighbours by text length."""
+    for i, start in enumerate(starts):
+        if start is not None:
+            continue
+        low = next((j for j in range(i - 1, -1, -1) if starts[j] is not None), None)
+        high = next((j for j in range(i + 1, len(starts)) if starts[j] is not None), None)
+        low_offset = starts[low] if low is not None else 0
+        high_offset = starts[high] if high is not None else stream_length
+        first = low if low is not None else -1
+        last = high if high is not None else len(starts)
+        # Share the gap by the compact length of the pages in it
+        before = sum(len(page_texts[j]) for j in range(max(first, 0), i))
+        total = sum(len(page_texts[j]) for j in range(max(first, 0), last))
+        fraction = before / total if total else (i - first) / (last - first)
+        starts[i] = low_offset + int(fraction * max(0, high_offset - low_offset))
@@ -0,0 +1,91 @@
+import re
+from collections.abc import Sequence
+
+
+def normalize_whitespace(s: str) -> str:
+    # Remove newlines, collapse multiple whitespace into a single space, lowercase
+    return re.sub(r"\s+", " ", s.replace("\n", " ")).strip().lower()
+
+
+class PageCorpus(Sequence):
+    """
+    The pages of one PDF, read once and shared by every phase 2 helper.
+
+    Behaves like the `[{"page", "text"}, …]` list `read_pdf` returns, so
+    existing code can index, slice and iterate it, but slicing gives a view
+    onto the same document instead of a copy. Alongside the raw pages it
+    keeps each page's normalised text and word list, the document's page
+    count, formatted prompt strings (cached per view and style, see
+    `normalize.py`) and a lazily built `PageIndex`.
+    """
+
+    def __init__(self, pages, _root=None, _start=0, _stop=None):
+        if _root is None:
+            self._pages = list(pages)
+            self._norm = [normalize_whitespace(pg.get("text", "") or "") for pg in self._pages]
+            self._words = [norm_page.split(" ") for norm_page in self._norm]
+            self._formatted = {}
+            self._page_index = None
+            _root = self
+        self._root = _root
+        self._start = _start
+        self._stop = len(_root._pages) if _stop is None else _stop
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def page_count(self):
+        """Number of pages in the whole document, whatever this view covers."""
+        return len(self._root._pages)
+
+    @property
+    def positions(self):
+        """Positions of this view's pages in the whole document."""
+        return range(self._start, self._stop)
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            stop = max(start, stop)
+            return PageCorpus(None, _root=self._root, _start=self._start + start, _stop=self._start + stop)
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("page index out of range")
+        return self._root._pages[self._start + item]
+
+    def normalized(self, i):
+        """Normalised text of the i-th page of this view."""
+        return self._root._norm[self._start + i]
+
+    def words(self, i):
+        """Normalised words of the i-th page of this view."""
+        return self._root._words[self._start + i]
+
+    def formatted(self, style, build):
+        """
+        `build(self)` for this view, computed once per (style, view) and
+        reused by every later caller asking for the same prompt text.
+        """
+        key = (style, self._start, self._stop)
+        cache = self._root._formatted
+        if key not in cache:
+            cache[key] = build(self)
+        return cache[key]
+
+    @property
+    def page_index(self):
+        """`PageIndex` over the whole document, built on first use."""
+        from .page_index import PageIndex
+
+        root = self._root
+        if root._page_index is None:
+            root._page_index = PageIndex(root)
+        return root._page_index
@@ -0,0 +1,215 @@
+import math
+from collections import Counter
+
+import numpy as np
+from rapidfuzz import fuzz as rapid_fuzz
+from rapidfuzz.process import cdist
+from thefuzz import fuzz
+
+from .config import FUZZY_WORKERS
+from .page_corpus import PageCorpus
+
+
+def trigrams(text):
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def best_window_score(page_words, norm_title, n_words):
+    """
+    Highest fuzz.ratio between `norm_title` and any window of `n_words`
+    consecutive page words, stopping early on a perfect 100.
+    """
+    best_page_score = 0
+    word_count = len(page_words)
+
+    # Only slide if page has at least n_words
+    if word_count >= n_words:
+        for i in range(word_count - n_words + 1):
+            window_text = " ".join(page_words[i: i + n_words])
+            score = fuzz.ratio(window_text, norm_title)
+            if score > best_page_score:
+                best_page_score = score
+
+            # If we hit a perfect 100, no need to scan further windows
+            if best_page_score == 100:
+                break
+
+    return best_page_score
+
+
+def min_shared_trigrams(title_length, threshold):
+    """
+    Fewest title trigrams a page must contain for some window on it to reach
+    `threshold` with fuzz.ratio.
+
+    fuzz.ratio rounds 200·LCS/(|a|+|b|), so reaching `threshold` needs a
+    similarity r ≥ (threshold - 0.5)/100. That bounds the window length by
+    |title|·(2-r)/r and the indel distance, which is never below the edit
+    distance, by k = 2·|title|·(1-r)/r. By the q-gram lemma a window within
+    edit distance k shares at least |title| - 2 - 3k trigrams with the title,
+    and the page holding the window shares at least as many.
+    """
+    r = (threshold - 0.5) / 100
+    if r <= 0:
+        return 0
+    k = math.floor(2 * title_length * (1 - r) / r + 1e-9)
+    return max(0, title_length - 2 - 3 * k)
+
+
+def page_windows(page_words, n_words):
+    """Every window of `n_words` consecutive page words, as scored by `best_window_score`."""
+    return [" ".join(page_words[i: i + n_words]) for i in range(len(page_words) - n_words + 1)]
+
+
+def best_window_scores(page_words, norm_titles, n_words, score_cutoff=0):
+    """
+    `best_window_score` for several titles with the same word count at once.
+
+    The page's windows are built once and every title is scored against all
+    of them in a single `rapidfuzz.process.cdist` matrix call. Scores are the
+    same integers fuzz.ratio gives (rounded from float64 similarities); a
+    best score below `score_cutoff` may come back as 0, which never changes
+    a threshold decision as long as the cutoff is at most threshold - 0.5.
+    """
+    if len(page_words) < n_words:
+        return [0] * len(norm_titles)
+
+    windows = page_windows(page_words, n_words)
+    matrix = cdist(norm_titles, windows, scorer=rapid_fuzz.ratio, dtype=np.float64,
+                   workers=FUZZY_WORKERS, score_cutoff=score_cutoff)
+    return [int(round(float(best))) for best in matrix.max(axis=1)]
+
+
+class PageIndex:
+    """
+    Normalised text, word lists and a character-trigram inverted index for
+    the pages of one document, built once and shared by every
+    `find_section_start_pages` call on that document.
+
+    A title is only compared against the pages whose trigram counts allow a
+    match: an exact substring needs every title trigram on the page, and a
+    fuzzy match needs at least `min_shared_trigrams`. Every other page is
+    skipped without normalising or scanning it, and the pages that are
+    scanned use the same window scoring as the unindexed search, so the
+    results are identical.
+    """
+
+    def __init__(self, page_contents):
+        # Normalised text and words come from the corpus, computed once
+        corpus = page_contents.root if isinstance(page_contents, PageCorpus) else PageCorpus(page_contents)
+        self.corpus = corpus
+        self.pages = []
+        self.postings = {}  # trigram -> {position: count}
+        self.positions = {}  # page number -> position
+        for position, pg in enumerate(corpus):
+            norm_page = corpus.normalized(position)
+            self.pages.append({
+                "page": pg["page"],
+                "text": pg.get("text", ""),
+                "norm": norm_page,
+                "words": corpus.words(position),
+            })
+            self.positions[pg["page"]] = position
+            for gram, count in trigrams(norm_page).items():
+                self.postings.setdefault(gram, {})[position] = count
+
+    def view(self, document_pages):
+        """
+        Positions of `document_pages` in this index, in their order, or None
+        if any page is not indexed with the same text (e.g. a different
+        document), in which case the caller should search without the index.
+        """
+        if isinstance(document_pages, PageCorpus) and document_pages.root is self.corpus:
+            return list(document_pages.positions)
+
+        positions = []
+        for pg in document_pages:
+            position = self.positions.get(pg.get("page"))
+            if position is None or self.pages[position]["text"] != pg.get("text", ""):
+                return None
+            positions.append(position)
+        return positions
+
+    def shared_trigrams(self, title_grams, positions):
+        """Title trigram occurrences found on each page, counted as a multiset."""
+        allowed = set(positions)
+        shared = dict.fromkeys(positions, 0)
+        for gram, title_count in title_grams.items():
+            for position, page_count in self.postings.get(gram, {}).items():
+                if position in allowed:
+                    shared[position] += min(title_count, page_count)
+        return shared
+
+    def candidates(self, norm_title, positions, threshold):
+        """
+        `(exact, fuzzy)` positions for `norm_title` among `positions`, in order.
+
+        `exact` pages contain the title as a substring; `fuzzy` pages do not,
+        but hold enough of its trigrams for a window to reach `threshold`.
+        """
+        title_grams = trigrams(norm_title)
+        total = sum(title_grams.values())
+        shared = self.shared_trigrams(title_grams, positions)
+        required = min_shared_trigrams(len(norm_title), threshold)
+
+        exact = []
+        fuzzy = []
+        for position in positions:
+            if shared[position] == total and norm_title in self.pages[position]["norm"]:
+                exact.append(position)
+            elif shared[position] >= required:
+                fuzzy.append(position)
+        return exact, fuzzy
+
+    def window_scores(self, requests, threshold=0):
+        """
+        Best window score for every `(position, norm_title, n_words)` request.
+
+        Requests are grouped by page and word count so each page's windows are
+        built once and scored against all of its titles in one matrix call.
+        Scores below `threshold` may be reported as 0.
+        """
+        grouped = {}
+        for position, norm_title, n_words in requests:
+            grouped.setdefault((position, n_words), set()).add(norm_title)
+
+        cutoff = max(0, threshold - 0.5)
+        scores = {}
+        for (position, n_words), norm_titles in sorted(grouped.items()):
+            norm_titles = sorted(norm_titles)
+            best = best_window_scores(self.pages[position]["words"], norm_titles, n_words, cutoff)
+            for norm_title, score in zip(norm_titles, best):
+                scores[(position, norm_title, n_words)] = score
+        return scores
+
+    def find_start_pages(self, titles, positions, threshold):
+        """
+        `(matched, page number)` for each `(norm_title, n_words)` title
+        among `positions`.
+
+        The first page containing the title wins; otherwise the page with the
+        best window score (earliest on ties), if it reaches `threshold`. The
+        fuzzy window scoring of all the titles is batched per page.
+        """
+        results = [None] * len(titles)
+        pending = []
+        for i, (norm_title, n_words) in enumerate(titles):
+            exact, fuzzy = self.candidates(norm_title, positions, threshold)
+            if exact:
+                results[i] = (True, self.pages[exact[0]]["page"])
+            else:
+                pending.append((i, fuzzy))
+
+        scores = self.window_scores(
+            ((position, titles[i][0], titles[i][1]) for i, fuzzy in pending for position in fuzzy),
+            threshold)
+        for i, fuzzy in pending:
+            best_overall_score = 0
+            best_overall_page = None
+            for position in fuzzy:
+                best_page_score = scores[(position, titles[i][0], titles[i][1])]
+                if best_page_score > best_overall_score:
+                    best_overall_score = best_page_score
+                    best_overall_page = self.pages[position]["page"]
+            results[i] = (best_overall_score >= threshold, best_overall_page)
+        return results
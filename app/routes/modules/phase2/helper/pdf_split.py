@@ -0,0 +1,39 @@
+from PyPDF2 import PdfReader, PdfWriter
+
+
+def split_pdf_sections(pdf_file, sections, bookmarks=True, progress=None):
+    """
+    Write every section of `pdf_file` to its own PDF by copying its pages.
+
+    Each section is a dict with `start_page`, `end_page` (0-based,
+    inclusive, as `add_end_page_in_toc_entries` sets them), `output_path`,
+    `title` and `toc_entries`. Pages are copied as they are, nothing is
+    re-rendered, and the source is read once for all sections. With
+    `bookmarks`, each file gets a bookmark for the section and one below it
+    for every entry of its TOC. `progress(i)` is called after section i is
+    written.
+    """
+    reader = PdfReader(pdf_file)
+    page_count = len(reader.pages)
+
+    for i, section in enumerate(sections):
+        start_page = min(max(section["start_page"], 0), page_count - 1)
+        end_page = min(max(section["end_page"], start_page), page_count - 1)
+
+        writer = PdfWriter()
+        for page_number in range(start_page, end_page + 1):
+            writer.add_page(reader.pages[page_number])
+
+        if bookmarks:
+            parent = writer.add_outline_item(section["title"], 0)
+            for entry in section["toc_entries"]:
+                entry_page = entry.get("start_page")
+                if not isinstance(entry_page, int):
+                    continue
+                offset = min(max(entry_page - start_page, 0), end_page - start_page)
+                writer.add_outline_item(entry.get("section", ""), offset, parent=parent)
+
+        with open(section["output_path"], "wb") as f:
+            writer.write(f)
+        if progress:
+            progress(i)
@@ -0,0 +1,14 @@
+"""
+Page-range text extraction for the PDF read pool.
+
+Runs in the pool's worker processes, which import it as part of the app
+package once, when the pool starts. Keep it free of module-level state.
+"""
+import PyPDF2
+
+
+def extract_page_range(pdf_path, start, stop):
+    """Text of pages [start, stop) of the PDF at `pdf_path`."""
+    pdf_reader = PyPDF2.PdfReader(pdf_path)
+    return [{"page": page_number, "text": pdf_reader.pages[page_number].extract_text()}
+            for page_number in range(start, stop)]
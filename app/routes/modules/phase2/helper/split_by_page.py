@@ -25,6 +25,29 @@ def create_docx_start_endpage(input_path: str,
       • Page 2 = a manual TOC (right‐aligned numbers) per toc_entries
       • Pages 3+ = the copied pages from source
 
+    Single-section form of `create_docx_sections`.
+    """
+    create_docx_sections(input_path, [{
+        "start_page": start_page,
+        "end_page": end_page,
+        "output_path": output_path,
+        "title": title,
+        "toc_entries": toc_entries,
+    }], dotx_path)
+
+
+def create_docx_sections(input_path: str,
+                         sections: list[dict],
+                         dotx_path: str | None,
+                         progress=None) -> None:
+    """
+    Writes every section of input_path to its own DOCX with one Word instance.
+
+    Each section is a dict with `start_page`, `end_page` (1-based,
+    inclusive), `output_path`, `title` and `toc_entries`, laid out as in
+    `create_docx_start_endpage`. The source is opened and paginated once
+    for all of them; `progress(i)` is called after section i is saved.
+
     This implementation:
       - Converts paths to absolute.
       - Uses DispatchEx to spawn a fresh Word instance.
@@ -35,15 +58,18 @@ def create_docx_start_endpage(input_path: str,
         print("⚠️ Windows COM not available, skipping document splitting")
         # Just copy the input file to output as a fallback
         import shutil
-        shutil.copy2(input_path, output_path)
+        for i, section in enumerate(sections):
+            shutil.copy2(input_path, section["output_path"])
+            if progress:
+                progress(i)
         return
-    
+
     # 1) Convert to absolute paths
     input_path = os.path.abspath(input_path)
-    output_path = os.path.abspath(output_path)
+    output_paths = [os.path.abspath(section["output_path"]) for section in sections]
 
     # 2) Remove any stale lock‐files (~$...) next to input/output
-    for path in (input_path, output_path):
+    for path in [input_path] + output_paths:
         lock = os.path.join(os.path.dirname(
             path), "~$" + os.path.basename(path))
         if os.path.exists(lock):
@@ -52,12 +78,13 @@ def create_docx_start_endpage(input_path: str,
             except:
                 pass
 
-    # 3) Delete old output file so SaveAs won’t complain
-    if os.path.exists(output_path):
-        try:
-            os.remove(output_path)
-        except PermissionError:
-            os.replace(output_path, output_path + ".old")
+    # 3) Delete old output files so SaveAs won’t complain
+    for output_path in output_paths:
+        if os.path.exists(output_path):
+            try:
+                os.remove(output_path)
+            except PermissionError:
+                os.replace(output_path, output_path + ".old")
 
     # 4) Initialize COM and start Word
     # set up COM for this thread                    :contentReference[oaicite:11]{index=11}
@@ -68,9 +95,9 @@ def create_docx_start_endpage(input_path: str,
     word.DisplayAlerts = 0
     word.Visible = False
 
-    src = out = None
+    src = None
     try:
-        # 5) Open source document read-only
+        # 5) Open source document read-only, once for every section
         src = word.Documents.Open(
             input_path,
             ReadOnly=True,
@@ -81,21 +108,49 @@ def create_docx_start_endpage(input_path: str,
         # 6) Determine total pages using numeric WdStatisticPages = 2
         # WdStatisticPages = 2      :contentReference[oaicite:14]{index=14}
         total_pages = src.ComputeStatistics(2)
-        if not (1 <= start_page <= total_pages):
-            raise ValueError(f"start_page must be between 1 and {total_pages}")
-        end_page = min(end_page, total_pages)
-
-        # 7) Copy the requested slice from start_page to end_page
-        #    Use numeric WdGoToPage = 1, WdGoToAbsolute = 1
-        # position at start_page :contentReference[oaicite:15]{index=15}
-        go1 = src.GoTo(What=1, Which=1, Count=start_page)
-        if end_page < total_pages:
-            go2 = src.GoTo(What=1, Which=1, Count=end_page + 1)
-            slice_end = go2.Start - 1
-        else:
-            slice_end = src.Content.End
-
-        src.Range(Start=go1.Start, End=slice_end).Copy()
+
+        # 7) Cut points of every section up front, while the layout is fresh
+        cuts = []
+        for section in sections:
+            start_page = section["start_page"]
+            if not (1 <= start_page <= total_pages):
+                raise ValueError(f"start_page must be between 1 and {total_pages}")
+            end_page = min(section["end_page"], total_pages)
+            #    Use numeric WdGoToPage = 1, WdGoToAbsolute = 1
+            # position at start_page :contentReference[oaicite:15]{index=15}
+            slice_start = src.GoTo(What=1, Which=1, Count=start_page).Start
+            if end_page < total_pages:
+                slice_end = src.GoTo(What=1, Which=1, Count=end_page + 1).Start - 1
+            else:
+                slice_end = src.Content.End
+            cuts.append((slice_start, slice_end))
+
+        for i, (section, output_path, (slice_start, slice_end)) in enumerate(zip(sections, output_paths, cuts)):
+            _write_section(word, src, slice_start, slice_end, output_path,
+                           section["title"], section["toc_entries"], section["start_page"], dotx_path)
+            if progress:
+                progress(i)
+
+    finally:
+        # 10) Ensure the source is closed, no dialogs
+        if src:
+            try:
+                src.Close(False)
+            except:
+                pass
+        # 11) Quit Word and uninitialize COM
+        try:
+            word.Quit()
+        except:
+            pass
+        pythoncom.CoUninitialize()
+
+
+def _write_section(word, src, slice_start, slice_end, output_path, title, toc_entries, start_page, dotx_path):
+    """Copy src[slice_start:slice_end] behind a title and TOC page into a new document."""
+    out = None
+    try:
+        src.Range(Start=slice_start, End=slice_end).Copy()
 
         # 8) Build a new document to paste into
         out = word.Documents.Add()
@@ -169,20 +224,9 @@ def create_docx_start_endpage(input_path: str,
         time.sleep(0.5)
 
     finally:
-        # 10) Ensure both docs are closed, no dialogs
+        # Close the section document, no dialogs
         if out:
             try:
                 out.Close(False)
             except:
                 pass
-        if src:
-            try:
-                src.Close(False)
-            except:
-                pass
-        # 11) Quit Word and uninitialize COM
-        try:
-            word.Quit()
-        except:
-            pass
-        pythoncom.CoUninitialize()
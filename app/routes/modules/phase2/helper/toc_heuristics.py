@@ -0,0 +1,145 @@
+import re
+
+# "Contents", "Table of Contents", "Index", "CONTENTS PAGE" on a line of their own
+TOC_HEADING = re.compile(r"^\s*(?:table\s+of\s+contents?|contents?(?:\s+page)?|index)\s*:?\s*$", re.I)
+# "Title ........ 12" / "Title …… 12" / "Title . . . . 12"
+LEADER_LINE = re.compile(r"^\s*(?P<title>.*?[^\s.…])\s*(?:(?:\.\s*){3,}|…+\s*|_{3,}\s*)(?P<page>\d{1,4}|[ivxlcdm]{1,7})\s*$", re.I)
+# "Title 12" or "Title<TAB>12" with no leader, only trusted next to leader lines
+TRAILING_NUMBER_LINE = re.compile(r"^\s*(?P<title>[^\d\s].*?[A-Za-z].*?\S)(?:\s{2,}|\t|\s)(?P<page>\d{1,4})\s*$")
+
+# Pages from the start of the document that can hold the TOC
+MAX_TOC_PAGES = 5
+# Lines at the top of a page searched for the TOC heading
+HEADING_LINES = 8
+# Highest page score that still counts as clearly not a TOC: a single
+# leader line (0.13) or a quarter of the lines ending in numbers (0.1) is
+# already enough to be a plain "Title 12" TOC, which only the model can tell
+NO_TOC_MAX_SCORE = 0.1
+
+
+def _lines(text):
+    return [line.strip() for line in (text or "").splitlines() if line.strip()]
+
+
+def score_toc_page(text):
+    """
+    How much a page looks like a table of contents, from 0 to 1, and
+    whether it has a TOC heading near the top.
+
+    A heading counts 0.4, three or more dot-leader lines 0.4, and the share
+    of lines ending in a page number up to 0.2.
+    """
+    lines = _lines(text)
+    if not lines:
+        return 0.0, False
+    heading = any(TOC_HEADING.match(line) for line in lines[:HEADING_LINES])
+    leaders = sum(1 for line in lines if LEADER_LINE.match(line))
+    numbered = sum(1 for line in lines if LEADER_LINE.match(line) or TRAILING_NUMBER_LINE.match(line))
+
+    score = 0.4 if heading else 0.0
+    score += 0.4 if leaders >= 3 else 0.4 * leaders / 3
+    score += 0.2 * min(1.0, numbered / len(lines) / 0.5)
+    return round(score, 2), heading
+
+
+def detect_toc(page_contents):
+    """
+    Decide locally whether the first pages hold a table of contents.
+
+    Returns `{"has_toc", "confidence", "toc_pages", "end_page"}`. A TOC
+    starts on the first page scoring 0.6 or more (a heading plus leaders,
+    or a long run of leader lines) and continues over the following pages
+    that still score 0.4 or more. No TOC is only reported with confidence
+    when none of the pages has a TOC heading, a leader line or many lines
+    ending in numbers (every page scoring under NO_TOC_MAX_SCORE); anything
+    between that and a TOC gets confidence 0. `confidence` below the
+    caller's threshold means the answer should come from the model instead.
+    """
+    scores = []
+    for page in list(page_contents[:MAX_TOC_PAGES]):
+        score, heading = score_toc_page(page["text"])
+        scores.append((page["page"], score, heading))
+
+    start = next((i for i, (_, score, _) in enumerate(scores) if score >= 0.6), None)
+    if start is not None:
+        toc_pages = [scores[start][0]]
+        for page, score, _ in scores[start + 1:]:
+            if score < 0.4:
+                break
+            toc_pages.append(page)
+        return {
+            "has_toc": True,
+            "confidence": scores[start][1],
+            "toc_pages": toc_pages,
+            "end_page": toc_pages[-1],
+        }
+
+    best = max((score for _, score, _ in scores), default=0.0)
+    any_heading = any(heading for _, _, heading in scores)
+    clear = not any_heading and best < NO_TOC_MAX_SCORE
+    return {
+        "has_toc": False,
+        "confidence": round(1.0 - best, 2) if clear else 0.0,
+        "toc_pages": [],
+        "end_page": -1,
+    }
+
+
+def toc_pages(page_contents, toc_end_page):
+    """Pages up to `toc_end_page` that look like part of the TOC."""
+    return [page for page in list(page_contents[:toc_end_page + 1])
+            if score_toc_page(page["text"])[0] >= 0.4]
+
+
+def _continues(first, second):
+    # "Schedule 4: Pricing and" + "delivery ..... 12", or a lowercase
+    # second half, reads as one wrapped title
+    return second[:1].islower() or re.search(r"(?:\b(?:and|of|for|to|the|in|&)|[-,:–])$", first, re.I) is not None
+
+
+def parse_toc_lines(pages):
+    """
+    Parse "Title ....... 12" lines from the TOC pages.
+
+    Returns `(entries, confidence)` where entries are `{"section",
+    "start_page"}` dicts like `extract_toc_from_toc_page` gives (the printed
+    page number, not yet a PDF page). Confidence is the share of
+    non-heading lines that parsed, halved when the page numbers go
+    backwards more than once. A title wrapped over two lines is joined with
+    the line that carries the page number.
+    """
+    entries = []
+    pending = None
+    counted = 0
+    unparsed = 0
+    for line in (line for page in pages for line in _lines(page["text"])):
+        if TOC_HEADING.match(line) or re.fullmatch(r"(?:page\s*)?\d{1,4}", line, re.I):
+            continue  # the heading itself, a "Page" column label or a page footer
+        counted += 1
+        match = LEADER_LINE.match(line) or TRAILING_NUMBER_LINE.match(line)
+        if match is None:
+            if pending is not None:
+                unparsed += 1
+            pending = line
+            continue
+        title = match.group("title")
+        if pending is not None:
+            if _continues(pending, title):
+                title = f"{pending} {title}"
+                counted -= 1
+            else:
+                unparsed += 1
+            pending = None
+        if not match.group("page").isdigit():
+            continue  # roman-numbered front matter is not a section
+        entries.append({"section": re.sub(r"\s+", " ", title).strip(), "start_page": int(match.group("page"))})
+    if pending is not None:
+        unparsed += 1
+
+    if not counted:
+        return entries, 0.0
+    confidence = 1.0 - unparsed / counted
+    backwards = sum(1 for prev, curr in zip(entries, entries[1:]) if curr["start_page"] < prev["start_page"])
+    if backwards > 1:
+        confidence /= 2
+    return entries, round(confidence, 2)
@@ -3,89 +3,222 @@ from PyPDF2 import PdfReader
 from .helper.extractions.extract_toc_endpage import extract_toc_endpage
 from .helper.extractions.extract_page_from_content import extract_page_from_content, find_section_start_pages
 from .helper.converter.docx_to_pdf import convert_docx_to_pdf
-from .helper.split_by_page import create_docx_start_endpage
+from .helper.split_by_page import create_docx_sections, WINDOWS_AVAILABLE
+from .helper.ooxml_split import SourcePackage, section_block_ranges
+from .helper.page_anchors import PageAnchors
+from .helper.pdf_split import split_pdf_sections
 from .helper.extractions.toc_extraction import extract_toc_from_nontoc_content, extract_toc_from_toc_page
 from .helper.check_toc import check_toc_in_pdf
 from .helper.normalize import read_pdf
+from .helper.page_corpus import PageCorpus
+from .helper.page_alignment import align_section_start_pages
+from .helper.artifact_cache import ArtifactCache
+from .helper.docx_outline import read_docx_outline, outline_toc
+from .helper.toc_heuristics import detect_toc
+from .helper.config import PAGE_MATCHER, CACHE_DIR, CACHE_MAX_BYTES, TOC_SOURCE, LLM_CONCURRENCY, SPLITTER, OUTPUT_FORMAT, PDF_BOOKMARKS
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from lxml import etree
 import os
+import zipfile
 
+# Both take (document_pages, toc_entries, threshold, page_index)
+match_section_start_pages = (
+    align_section_start_pages if PAGE_MATCHER == "aligned" else find_section_start_pages)
 
-def process_document(input_docx, upload_id, dotx_path):
-    """Main function to process the document."""
+artifact_cache = ArtifactCache(CACHE_DIR, CACHE_MAX_BYTES)
+
+
+def load_page_corpus(input_docx, cache_key=None):
+    """
+    Convert the DOCX to PDF and read its pages, reusing cached artifacts.
+
+    Returns `(pdf_file, page_contents)` with the pages as a PageCorpus.
+    """
+    pdf_file = artifact_cache.get_pdf(cache_key) if cache_key else None
+    if pdf_file is None:
+        pdf_file = convert_docx_to_pdf(input_docx)
+        if cache_key:
+            artifact_cache.put_pdf(cache_key, pdf_file)
+    else:
+        print("♻️ Using cached PDF")
+
+    pages = artifact_cache.get_pages(cache_key) if cache_key else None
+    if pages is None:
+        pages = read_pdf(pdf_file)
+        if cache_key:
+            artifact_cache.put_pages(cache_key, pages)
+    else:
+        print("♻️ Using cached page text")
+
+    # Read once; every helper below shares the corpus and its page index
+    return pdf_file, PageCorpus(pages)
+
+
+def load_page_anchors(source, page_contents, cache_key=None):
+    """
+    PDF page -> DOCX block anchors for the OOXML splitter, from the artifact
+    cache or built from the page corpus. None when neither is available
+    (a cached TOC skips reading the PDF); the splitter then goes by titles.
+    """
+    pages = artifact_cache.get_anchors(cache_key) if cache_key else None
+    if pages is not None:
+        print("♻️ Using cached page anchors")
+        return PageAnchors(pages)
+    if page_contents is None:
+        return None
+    anchors = PageAnchors.build(page_contents.root, source.blocks)
+    if cache_key:
+        artifact_cache.put_anchors(cache_key, anchors.pages)
+    return anchors
+
+
+def fill_missing_start_pages(toc_entries, first_page):
+    """Entries no page was found for start where the entry before them does."""
+    previous_page = first_page
+    for entry in toc_entries:
+        if entry.get("start_page") is None:
+            entry["start_page"] = previous_page
+        previous_page = entry["start_page"]
+
+
+def outline_tocs(input_docx, page_contents, upload_id):
+    """
+    Top-level and per-section TOCs from the DOCX heading styles, with
+    start and end pages matched against the PDF text.
+
+    Returns `(toc_entries, section_tocs)`, or None when the document has no
+    usable heading outline and the TOC has to come from the PDF instead.
+    """
     from app import socketio
+
     try:
+        outline = read_docx_outline(input_docx)
+    except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+        print(f"⚠️ Could not read the heading outline: {e}")
+        return None
+    toc_entries, section_tocs = outline_toc(outline)
+    if not toc_entries:
+        print("No heading outline found in the document.")
+        return None
+
+    print(f"📑 Table of Contents read from {len(outline)} document headings")
+    socketio.emit(
+        'message', {'msg': 'Table of Content read from the document headings', "progress": '40%'}, room=upload_id, namespace='/phase2')
+
+    # Section titles are also listed on the document's own TOC pages, if any
+    detection = detect_toc(page_contents)
+    toc_end_page = detection["end_page"] if detection["has_toc"] else -1
+    toc_entries = match_section_start_pages(
+        document_pages=page_contents[toc_end_page+1:], toc_entries=toc_entries,
+        page_index=page_contents.page_index)
+    fill_missing_start_pages(toc_entries, toc_end_page + 1)
+    add_end_page_in_toc_entries(toc_entries, page_count=page_contents.page_count)
+
+    for toc_entry, curr_tocs in zip(toc_entries, section_tocs):
+        start_page = toc_entry['start_page']
+        end_page = toc_entry['end_page']
+        match_section_start_pages(
+            document_pages=page_contents[start_page:end_page+1], toc_entries=curr_tocs,
+            page_index=page_contents.page_index)
+        fill_missing_start_pages(curr_tocs, start_page)
+        print(f"Updated TOC with start pages for section from headings: {toc_entry['section']}")
+        printTocEntries(curr_tocs)
+
+    socketio.emit(
+        'message', {'msg': 'Fetched the Toc Entries', "progress": '60%'}, room=upload_id, namespace='/phase2')
+    return toc_entries, section_tocs
+
+
+def detect_toc_entries(page_contents, upload_id):
+    """Top-level TOC entries of the document, with start and end pages."""
+    from app import socketio
 
-        if input_docx is None:
-            return
+    # list of dict containing section and start page [ {"section": "section_name", "start_page": 1} ..]
+    socketio.emit(
+        'message', {'msg': 'Getting Table of Content...', "progress": '10%'}, room=upload_id, namespace='/phase2')
 
+    toc_entries = []
+    toc_end_page = -1
+    if not check_toc_in_pdf(page_contents):
+        print("No Table of Contents found in the document.")
         socketio.emit(
-            'message', {'msg': 'Reading word file...', 'progress': '8%'}, room=upload_id, namespace='/phase2')
+            'message', {'msg': 'No Table of Content Section found in the document..\ntrying to create one', "progress": '20%'}, room=upload_id, namespace='/phase2')
 
-        pdf_file = convert_docx_to_pdf(input_docx)
-        page_contents = read_pdf(pdf_file)
-        print("path for pdf file is : ", pdf_file)
+        toc_entries = extract_toc_from_nontoc_content(
+            page_contents)
 
-        # list of dict containing section and start page [ {"section": "section_name", "start_page": 1} ..]
         socketio.emit(
-            'message', {'msg': 'Getting Table of Content...', "progress": '10%'}, room=upload_id, namespace='/phase2')
-
-        toc_entries = []
-        toc_end_page = -1
-        if not check_toc_in_pdf(page_contents):
-            print("No Table of Contents found in the document.")
-            socketio.emit(
-                'message', {'msg': 'No Table of Content Section found in the document..\ntrying to create one', "progress": '20%'}, room=upload_id, namespace='/phase2')
+            'message', {'msg': 'Table of Content created!', "progress": '30%'}, room=upload_id, namespace='/phase2')
+    else:
+        print("Table of Contents found in the document.")
+        socketio.emit(
+            'message', {'msg': 'Table of Content found in the document \n trying to fetch details...', "progress": '40%'}, room=upload_id, namespace='/phase2')
+        toc_end_page = extract_toc_endpage(page_contents)
+        sections = extract_toc_from_toc_page(page_contents, toc_end_page)
+        toc_entries = extract_page_from_content(
+            page_contents, sections, toc_end_page)
+        socketio.emit(
+            'message', {'msg': 'Fetched the Toc Entries', "progress": '50%'}, room=upload_id, namespace='/phase2')
 
-            toc_entries = extract_toc_from_nontoc_content(
-                page_contents)
+    print("Extracted TOC Entries by My functions :")
+    toc_entries = match_section_start_pages(
+        document_pages=page_contents[toc_end_page+1:], toc_entries=toc_entries,
+        page_index=page_contents.page_index)
+    add_end_page_in_toc_entries(toc_entries, page_count=page_contents.page_count)
+    return toc_entries
 
-            socketio.emit(
-                'message', {'msg': 'Table of Content created!', "progress": '30%'}, room=upload_id, namespace='/phase2')
-        else:
-            print("Table of Contents found in the document.")
-            socketio.emit(
-                'message', {'msg': 'Table of Content found in the document \n trying to fetch details...', "progress": '40%'}, room=upload_id, namespace='/phase2')
-            toc_end_page = extract_toc_endpage(page_contents)
-            sections = extract_toc_from_toc_page(page_contents)
-            toc_entries = extract_page_from_content(
-                page_contents, sections, toc_end_page)
-            socketio.emit(
-                'message', {'msg': 'Fetched the Toc Entries', "progress": '50%'}, room=upload_id, namespace='/phase2')
 
-        print("Extracted TOC Entries by My functions :")
-        toc_entries = find_section_start_pages(
-            document_pages=page_contents[toc_end_page+1:], toc_entries=toc_entries)
-        add_end_page_in_toc_entries(toc_entries, pdf_file=pdf_file)
-        printTocEntries(toc_entries)
-        socketio.emit(
-            'message', {'msg': tocEntriesToString(toc_entries=toc_entries)}, room=upload_id, namespace='/phase2')
-        print("-----------------------")
-        print("-----------------------")
+def detect_section_toc(page_contents, toc_entry):
+    """TOC of one section, with start pages matched within the section."""
+    start_page = toc_entry['start_page']
+    end_page = toc_entry['end_page']
 
-        output_dir = os.path.join(os.path.dirname(
-            pdf_file), 'truncated_schedules')
-        print(f"output folder is{output_dir}")
+    curr_tocs = extract_toc_from_nontoc_content(
+        page_contents=page_contents[start_page:end_page+1])
 
-        if not os.path.exists(output_dir):
-            print(f"Folder does not exist. Creating: {output_dir}")
-            os.makedirs(output_dir)
+    return match_section_start_pages(
+        document_pages=page_contents[start_page:end_page+1], toc_entries=curr_tocs,
+        page_index=page_contents.page_index)
 
-        socketio.emit(
-            'message', {'msg': 'Creating Table of Content for Each Section ...', "progress": '60%'}, room=upload_id, namespace='/phase2')
-        output_paths = []
-        for toc_entry in toc_entries:
-            start_page = toc_entry['start_page']
-            end_page = toc_entry['end_page']
-            title = toc_entry['section']
 
-            curr_tocs = extract_toc_from_nontoc_content(
-                page_contents=page_contents[start_page:end_page+1])
+def detect_section_tocs(page_contents, toc_entries, upload_id):
+    """
+    The TOC of every section, in the order of `toc_entries`.
 
-            curr_tocs = find_section_start_pages(
-                document_pages=page_contents[start_page:end_page+1], toc_entries=curr_tocs)
+    Sections are extracted concurrently, up to PHASE2_LLM_CONCURRENCY at a
+    time (model calls are also rate limited in `openai_client`), and
+    progress is reported as each one finishes.
+    """
+    from app import socketio
 
+    socketio.emit(
+        'message', {'msg': 'Creating Table of Content for Each Section ...', "progress": '60%'}, room=upload_id, namespace='/phase2')
+    if not toc_entries:
+        return []
+
+    # Build the shared page index before the workers need it
+    page_contents.page_index
+
+    section_tocs = [None] * len(toc_entries)
+    workers = max(1, min(LLM_CONCURRENCY, len(toc_entries)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(detect_section_toc, page_contents, toc_entry): i
+                   for i, toc_entry in enumerate(toc_entries)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                curr_tocs = future.result()
+            except Exception:
+                # One failed section fails the document; don't start the rest
+                for pending in futures:
+                    pending.cancel()
+                raise
+            section_tocs[i] = curr_tocs
+            title = toc_entries[i]['section']
+
+            progress = 60 + 15 * done // len(toc_entries)
             socketio.emit(
-                'message', {'msg': f'Created Table of Content for {title}', "progress": '70%'}, room=upload_id, namespace='/phase2')
+                'message', {'msg': f'Created Table of Content for {title} ({done}/{len(toc_entries)})', "progress": f'{progress}%'}, room=upload_id, namespace='/phase2')
             socketio.emit(
                 'message', {'msg': tocEntriesToString(toc_entries=curr_tocs)}, room=upload_id, namespace='/phase2')
 
@@ -94,26 +227,121 @@ def process_document(input_docx, upload_id, dotx_path):
             printTocEntries(curr_tocs)
 
             print("-----------------------")
+    return section_tocs
+
+
+def process_document(input_docx, upload_id, dotx_path, output_format=None):
+    """
+    Main function to process the document.
+
+    `output_format` is "docx" (split the Word document) or "pdf" (copy each
+    section's pages out of the converted PDF); PHASE2_OUTPUT_FORMAT when
+    not given.
+    """
+    from app import socketio
+    try:
+
+        if input_docx is None:
+            return
 
-            import re
-            safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
+        output_format = (output_format or OUTPUT_FORMAT).lower()
+        if output_format not in ("docx", "pdf"):
+            raise ValueError(f"Unknown output format: {output_format}")
 
-            output_path = os.path.join(
-                output_dir, f"{safe_title}.docx")
+        socketio.emit(
+            'message', {'msg': 'Reading word file...', 'progress': '8%'}, room=upload_id, namespace='/phase2')
 
+        # The same DOCX (e.g. re-sent with another .dotx, or retried) skips
+        # conversion, text extraction and TOC detection entirely
+        cache_key = artifact_cache.key_for(input_docx) if artifact_cache.enabled else None
+        cached_toc = artifact_cache.get_toc(cache_key) if cache_key else None
+        page_contents = None
+        pdf_file = None
+
+        if cached_toc is not None:
+            print("♻️ Using cached table of contents")
+            toc_entries = cached_toc["toc_entries"]
+            section_tocs = cached_toc["section_tocs"]
             socketio.emit(
-                'message', {'msg': f'splitting {title} from {start_page} to {end_page}', "progress": '80%'}, room=upload_id, namespace='/phase2')
+                'message', {'msg': 'Table of Content found in cache', "progress": '50%'}, room=upload_id, namespace='/phase2')
+        else:
+            pdf_file, page_contents = load_page_corpus(input_docx, cache_key)
+            print("path for pdf file is : ", pdf_file)
+            # Well-styled documents carry their structure in the heading
+            # styles; only documents without it need the model
+            outline = outline_tocs(input_docx, page_contents, upload_id) if TOC_SOURCE == "auto" else None
+            if outline is not None:
+                toc_entries, section_tocs = outline
+            else:
+                toc_entries = detect_toc_entries(page_contents, upload_id)
+                section_tocs = None
+
+        printTocEntries(toc_entries)
+        socketio.emit(
+            'message', {'msg': tocEntriesToString(toc_entries=toc_entries)}, room=upload_id, namespace='/phase2')
+        print("-----------------------")
+        print("-----------------------")
+
+        if cached_toc is None:
+            if section_tocs is None:
+                section_tocs = detect_section_tocs(page_contents, toc_entries, upload_id)
+            if cache_key:
+                artifact_cache.put_toc(cache_key, {"toc_entries": toc_entries, "section_tocs": section_tocs})
+
+        output_dir = os.path.join(os.path.dirname(
+            input_docx), 'truncated_schedules')
+        print(f"output folder is{output_dir}")
+
+        if not os.path.exists(output_dir):
+            print(f"Folder does not exist. Creating: {output_dir}")
+            os.makedirs(output_dir)
+
+        import re
+        sections = []
+        for toc_entry, curr_tocs in zip(toc_entries, section_tocs):
+            safe_title = re.sub(r'[<>:"/\\|?*]', '_', toc_entry['section'])
+            sections.append({
+                "start_page": toc_entry['start_page'],
+                "end_page": toc_entry['end_page'],
+                "output_path": os.path.join(output_dir, f"{safe_title}.{output_format}"),
+                "title": toc_entry['section'],
+                "toc_entries": curr_tocs,
+            })
 
-            create_docx_start_endpage(
-                input_path=input_docx,
-                start_page=start_page+1,
-                end_page=end_page+1,
-                output_path=output_path,
-                title=title,
-                toc_entries=curr_tocs,
-                dotx_path=dotx_path)
+        socketio.emit(
+            'message', {'msg': f'splitting {len(sections)} sections', "progress": '80%'}, room=upload_id, namespace='/phase2')
+
+        def section_written(i):
+            section = sections[i]
+            progress = 80 + 15 * (i + 1) // len(sections)
+            socketio.emit(
+                'message', {'msg': f'split {section["title"]} from {section["start_page"]} to {section["end_page"]}', "progress": f'{progress}%'}, room=upload_id, namespace='/phase2')
+
+        if output_format == "pdf":
+            # Page copies out of the converted PDF; no Word, no DOCX splitter
+            if pdf_file is None:
+                pdf_file = artifact_cache.get_pdf(cache_key) if cache_key else None
+            if pdf_file is None:
+                pdf_file = convert_docx_to_pdf(input_docx)
+            split_pdf_sections(pdf_file, sections, bookmarks=PDF_BOOKMARKS, progress=section_written)
+        elif SPLITTER == "ooxml" or (SPLITTER == "auto" and not WINDOWS_AVAILABLE):
+            # Every section is cut from one load of the source document
+            source = SourcePackage(input_docx, dotx_path)
+            anchors = load_page_anchors(source, page_contents, cache_key)
+            block_ranges = section_block_ranges(source.block_texts, toc_entries, anchors)
+            for section, (start_block, end_block) in zip(sections, block_ranges):
+                section.update(start_block=start_block, end_block=end_block,
+                               section_start_page=section["start_page"])
+            source.write_sections(sections, progress=section_written)
+        else:
+            create_docx_sections(
+                input_docx,
+                [dict(section, start_page=section["start_page"]+1, end_page=section["end_page"]+1)
+                 for section in sections],
+                dotx_path,
+                progress=section_written)
 
-            output_paths.append(output_path)
+        output_paths = [section["output_path"] for section in sections]
 
         socketio.emit(
             'message', {'msg': '🎉 All sections have been successfully processed and saved!', "progress": '100%'}, room=upload_id, namespace='/phase2')
@@ -125,9 +353,10 @@ def process_document(input_docx, upload_id, dotx_path):
         raise Exception({e})
 
 
-def add_end_page_in_toc_entries(toc_entries, pdf_file):
-    pdf_reader = PdfReader(pdf_file)
-    total_pages = len(pdf_reader.pages)
+def add_end_page_in_toc_entries(toc_entries, pdf_file=None, page_count=None):
+    if page_count is None:
+        page_count = len(PdfReader(pdf_file).pages)
+    total_pages = page_count
     for i in range(len(toc_entries)):
         # Calculate end page
         if i < len(toc_entries) - 1:
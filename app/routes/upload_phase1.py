@@ -1,11 +1,11 @@
 from flask import request, jsonify, send_file, redirect, url_for
 import io
+import json
 import zipfile
 
-from .modules.phase1.openai_processing import extract_content_with_openai2, add_excel_with_sections, add_excel_with_tables, extract_tables_with_headings_and_context
-from flask_jwt_extended import verify_jwt_in_request
-import os
-import tempfile
+from .modules.phase1.fingerprints import document_key
+from .modules.phase1.pipeline import process_phase1
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 
 
 def upload_phase1():
@@ -23,6 +23,10 @@ def upload_phase1():
     if not zip_file:
         return jsonify({'error': 'Missing zip file!'}), 400
 
+    requested_key = request.form.get('document_key')
+    if requested_key and ('/' in requested_key or '\\' in requested_key or '..' in requested_key):
+        return jsonify({'error': 'Invalid document key!'}), 400
+
     try:
         # Create an in-memory buffer to hold the zip file contents
         zip_buffer = io.BytesIO(zip_file.read())
@@ -30,12 +34,14 @@ def upload_phase1():
         # Open the zip file and extract its contents
         with zipfile.ZipFile(zip_buffer, 'r') as z:
             word_file = None
+            word_name = None
             excel_file = None
 
             # Loop through the files inside the zip and find the Word and Excel files
             for file_name in z.namelist():
                 if file_name.endswith('.docx') or file_name.endswith('.doc'):
                     word_file = io.BytesIO(z.read(file_name))
+                    word_name = file_name
                 elif file_name.endswith('.xlsx') or file_name.endswith('.xls'):
                     excel_file = io.BytesIO(z.read(file_name))
 
@@ -47,63 +53,47 @@ def upload_phase1():
             socketio.emit(
                 'message', {'msg': 'Both Word file and Excel Sheets Recieved', "progress": '10%'}, room=upload_id, namespace='/phase1')
 
-            excel_path = None
-            try:
-                # Create a temporary file
-                with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
-                    tmp.write(excel_file.read())
-                    excel_path = tmp.name
-
-                sections = extract_content_with_openai2(word_file)
-                socketio.emit(
-                    'message', {'msg': 'Extract Content from the word Document..', "progress": '40%'}, room=upload_id, namespace='/phase1')
-                print('extracted section/contents')
-
-                excel_path = add_excel_with_sections(
-                    sections, excel_file=excel_path)
-                print(excel_path)
-                print('added contents in excel')
+            def emit_progress(msg, progress):
                 socketio.emit(
-                    'message', {'msg': 'Add Fetched details to the Excel Sheet..', "progress": '70%'}, room=upload_id, namespace='/phase1')
-
-                print("going to the table extraction function ....")
-                tables = extract_tables_with_headings_and_context(word_file)
-                print('extracted tables from wordfile')
+                    'message', {'msg': msg, "progress": progress}, room=upload_id, namespace='/phase1')
+
+            # Revised uploads (addenda) of the same tender by the same user
+            # share a key, so only the header blocks that changed are sent to
+            # OpenAI again
+            doc_key = document_key(requested_key or word_name, owner=get_jwt_identity())
+
+            # Create an in-memory zip archive and write the processed workbook
+            # straight into it; section and table extraction run concurrently
+            zip_output = io.BytesIO()
+            with zipfile.ZipFile(zip_output, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                with zipf.open('processed_result.xlsx', 'w') as xlsx_entry:
+                    _, extraction_report = process_phase1(
+                        word_file, excel_file, xlsx_entry, progress=emit_progress, document_key=doc_key)
+                if extraction_report:
+                    zipf.writestr('extraction_report.json', json.dumps(extraction_report, indent=2))
+
+            if extraction_report:
+                reextracted = extraction_report['reextracted']
                 socketio.emit(
-                    'message', {'msg': 'Extract Tables from the Docx file..', "progress": '80%'}, room=upload_id, namespace='/phase1')
-
-                print("going to adding tables in excel sheet ....")
-                excel_path = add_excel_with_tables(
-                    tables, excel_file=excel_path)
-                print(excel_path)
+                    'message', {'msg': f"Re-extracted {len(reextracted)} changed section(s): "
+                                       f"{', '.join(reextracted) or 'none'}", "progress": '95%'},
+                    room=upload_id, namespace='/phase1')
 
-                print('added tables in excel ')
-                socketio.emit(
-                    'message', {'msg': 'Added Tables to the Excel file..', "progress": '90%'}, room=upload_id, namespace='/phase1')
-
-            finally:
-                # Create an in-memory zip archive and add the processed Excel file to it
-                zip_output = io.BytesIO()
-                with zipfile.ZipFile(zip_output, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    zipf.write(excel_path, 'processed_result.xlsx')
-
-                # Reset the pointer to the start of the buffer
-                zip_output.seek(0)
-                print('completed !')
-                socketio.emit(
-                    'message', {'msg': 'Process Completed!', "progress": '100%'}, room=upload_id, namespace='/phase1')
-
-                if excel_path and os.path.exists(excel_path):
-                    os.remove(excel_path)
-                import time
-                time.sleep(1)
-                # Send the zip file back to the client
-                return send_file(
-                    zip_output,
-                    as_attachment=True,
-                    download_name='processed_files.zip',
-                    mimetype='application/zip'
-                )
+            # Reset the pointer to the start of the buffer
+            zip_output.seek(0)
+            print('completed !')
+            socketio.emit(
+                'message', {'msg': 'Process Completed!', "progress": '100%'}, room=upload_id, namespace='/phase1')
+
+            import time
+            time.sleep(1)
+            # Send the zip file back to the client
+            return send_file(
+                zip_output,
+                as_attachment=True,
+                download_name='processed_files.zip',
+                mimetype='application/zip'
+            )
 
     except Exception as e:
         print(e)
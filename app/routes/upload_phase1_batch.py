@@ -0,0 +1,74 @@
+from flask import request, jsonify, send_file, redirect, url_for
+import io
+import json
+import zipfile
+
+from .modules.phase1.batch import process_phase1_batch
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+
+def upload_phase1_batch():
+    from app import socketio
+    try:
+        verify_jwt_in_request()
+    except:
+        print("User is not authenticated")
+        return redirect(url_for('login'))
+
+    # Expecting a .zip file with several Word documents and either one
+    # workbook per document (same file name) or one shared template workbook
+    zip_file = request.files.get('zip_file')
+    upload_id = request.form['upload_id']
+
+    if not zip_file:
+        return jsonify({'error': 'Missing zip file!'}), 400
+
+    try:
+        with zipfile.ZipFile(io.BytesIO(zip_file.read()), 'r') as z:
+            files = {name: z.read(name) for name in z.namelist()
+                     if name.lower().endswith(('.docx', '.xlsx'))}
+
+        if not any(name.lower().endswith('.docx') for name in files):
+            return jsonify({'error': 'No Word documents found inside the zip.'}), 400
+        if not any(name.lower().endswith('.xlsx') for name in files):
+            return jsonify({'error': 'At least one Excel workbook is required inside the zip.'}), 400
+
+        print('batch files recieved !')
+        socketio.emit(
+            'message', {'msg': 'Batch of Word files and Excel Sheets Recieved', "progress": '10%'},
+            room=upload_id, namespace='/phase1')
+
+        def emit_progress(msg, done, total):
+            socketio.emit(
+                'message', {'msg': f"{msg} ({done}/{total})", "progress": f"{10 + 80 * done // total}%"},
+                room=upload_id, namespace='/phase1')
+
+        outputs, report = process_phase1_batch(files, progress=emit_progress, owner=get_jwt_identity())
+
+        if not outputs:
+            return jsonify({'error': 'No document in the batch could be processed.', 'documents': report}), 500
+
+        zip_output = io.BytesIO()
+        with zipfile.ZipFile(zip_output, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for entry in report:
+                if entry['output'] in outputs:
+                    zipf.writestr(entry['output'], outputs[entry['output']])
+            zipf.writestr('batch_report.json', json.dumps(report, indent=2))
+
+        zip_output.seek(0)
+        failed = sum(1 for entry in report if entry['status'] != 'ok')
+        print('batch completed !')
+        socketio.emit(
+            'message', {'msg': f"Process Completed! {len(outputs)} processed, {failed} failed", "progress": '100%'},
+            room=upload_id, namespace='/phase1')
+
+        return send_file(
+            zip_output,
+            as_attachment=True,
+            download_name='processed_files.zip',
+            mimetype='application/zip'
+        )
+
+    except Exception as e:
+        print(e)
+        return jsonify({'error': f'An error occurred during processing: {str(e)}'}), 500
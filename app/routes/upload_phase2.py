@@ -25,6 +25,8 @@ def upload_phase2():
     # Expecting a .zip file
     zip_file = request.files.get('zip_file')
     upload_id = request.form['upload_id']
+    # "docx" (default) or "pdf" sections
+    output_format = request.form.get('output_format')
     print('upload id is :', upload_id)
 
     if not zip_file:
@@ -84,7 +86,7 @@ def upload_phase2():
 
             # Process the document
             document_paths = process_document(
-                docx_path, upload_id=upload_id, dotx_path=odt_path)
+                docx_path, upload_id=upload_id, dotx_path=odt_path, output_format=output_format)
 
             socketio.emit(
                 'message', {'msg': 'Send outputs file', 'progress': '100%'}, room=upload_id, namespace='/phase2')
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Phase 1 table extractors.
+
+Compares the original python-docx extractor (reading `row.cells` cell by
+cell, kept below as `docx_tables` since the app's own extractor now builds a
+`TableGrid`) with the streaming lxml extractor
+(`stream_tables_with_headings_and_context`) on synthetic compliance-matrix
+documents, and checks both return the same headings, context and cell text.
+
+Usage:
+    python bench_phase1_tables.py [rows ...]
+"""
+import io
+import sys
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from app.routes.modules.phase1.document import ParsedDocument
+from app.routes.modules.phase1.table_stream import stream_tables_with_headings_and_context
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+COLUMNS = 8
+
+
+def _paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def _cell(text, span=1, vmerge=None):
+    props = ""
+    if span > 1:
+        props += f'<w:gridSpan w:val="{span}"/>'
+    if vmerge == "restart":
+        props += '<w:vMerge w:val="restart"/>'
+    elif vmerge == "continue":
+        props += '<w:vMerge/>'
+    tc_pr = f"<w:tcPr>{props}</w:tcPr>" if props else ""
+    return f"<w:tc>{tc_pr}{_paragraph(text)}</w:tc>"
+
+
+def _table(rows):
+    parts = ["<w:tbl><w:tblGrid>", '<w:gridCol w:w="1000"/>' * COLUMNS, "</w:tblGrid>"]
+    for r in range(rows):
+        cells = []
+        if r % 10 == 0:
+            # Section row spanning the whole matrix
+            cells.append(_cell(f"Criterion group {r // 10}", span=COLUMNS))
+        else:
+            # First column merged vertically across each group of rows
+            cells.append(_cell(f"Group {r // 10}", vmerge="restart" if r % 10 == 1 else "continue"))
+            cells.append(_cell(f"Requirement {r}.1 must be addressed in full", span=2))
+            for c in range(3, COLUMNS):
+                cells.append(_cell(f"r{r}c{c}"))
+        parts.append("<w:tr>" + "".join(cells) + "</w:tr>")
+    parts.append("</w:tbl>")
+    return "".join(parts)
+
+
+def build_document(rows, tables=4):
+    """Return DOCX bytes holding `tables` matrices of `rows` rows each."""
+    body = [_paragraph("Returnable Schedule 1 - Compliance")]
+    for t in range(tables):
+        body.append(_paragraph(f"Context paragraph {t} describing the matrix below."))
+        body.append(_paragraph(f"Table {t + 1}-A: Evaluation matrix"))
+        body.append(_table(rows))
+    document_xml = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{W_NS}"><w:body>{"".join(body)}<w:sectPr/></w:body></w:document>'
+    )
+
+    template = io.BytesIO()
+    Document().save(template)
+    template.seek(0)
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(template) as src, zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "word/document.xml":
+                data = document_xml.encode("utf-8")
+            dst.writestr(item, data)
+    return output.getvalue()
+
+
+def docx_tables(doc):
+    """The python-docx extractor as it was before `TableGrid`."""
+    tables_data = []
+    unknown_idx = 1
+    all_elements = doc.blocks
+    for idx, element in enumerate(all_elements):
+        if not isinstance(element, Table):
+            continue
+        table_content = []
+        for row in element.rows:
+            row_data = []
+            for cell in row.cells:
+                text = cell.text.strip()
+                row_data.append({"text": text, "column_header": bool(text), "row_header": bool(text)})
+            table_content.append(row_data)
+
+        before_context = []
+        i = idx - 1
+        while i >= 0 and len(before_context) < 4:
+            if isinstance(all_elements[i], Paragraph):
+                before_context.insert(0, all_elements[i].text.strip())
+            i -= 1
+
+        pred_heading = all_elements[idx - 1].text.strip()
+        if len(pred_heading) > 45 or len(pred_heading) == 0:
+            curr_heading = f"Unknown {unknown_idx}"
+            unknown_idx += 1
+        else:
+            curr_heading = pred_heading
+        tables_data.append({"heading": curr_heading, "table": table_content, "before_context": before_context})
+    return tables_data
+
+
+def _visible(tables):
+    """What both extractors must agree on: headings, context and cell text."""
+    return [(t["heading"], t["before_context"], [[cell["text"] for cell in row] for row in t["table"]])
+            for t in tables]
+
+
+def measure(fn):
+    """Time `fn` on its own, then re-run it under tracemalloc for peak memory."""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(rows):
+    data = build_document(rows)
+
+    docx_result, docx_time, docx_peak = measure(
+        lambda: docx_tables(ParsedDocument(io.BytesIO(data))))
+    stream_result, stream_time, stream_peak = measure(
+        lambda: stream_tables_with_headings_and_context(io.BytesIO(data)))
+
+    same = _visible(docx_result) == _visible(stream_result)
+    print(f"{rows:>6} rows x 4 tables | python-docx {docx_time:7.3f}s {docx_peak / 2**20:7.1f} MiB"
+          f" | stream {stream_time:7.3f}s {stream_peak / 2**20:7.1f} MiB"
+          f" | x{docx_time / stream_time:5.1f} | identical: {'✓' if same else '✗'}")
+    return same
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [250, 1000, 4000]
+    print("🚀 Phase 1 table extraction benchmark")
+    print("=" * 50)
+    results = [run(rows) for rows in sizes]
+    sys.exit(0 if all(results) else 1)
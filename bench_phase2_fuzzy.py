@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched fuzzy scoring of section titles against page windows.
+
+Compares the per-window `fuzz.ratio` loop (`best_window_score`) with the
+batched `rapidfuzz.process.cdist` path (`best_window_scores`) on synthetic
+tender pages, and checks both give the same scores.
+
+Usage:
+    python bench_phase2_fuzzy.py [words_per_page ...]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.routes.modules.phase2.helper.page_index import (
+    best_window_score, best_window_scores, normalize_whitespace
+)
+
+PAGES = 40
+TITLES = 60
+
+
+def build_corpus(words_per_page, seed=7):
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10)))
+             for _ in range(4000)]
+    titles = [normalize_whitespace(f"Returnable Schedule {i}: " + " ".join(rng.choices(vocab, k=rng.randint(2, 6))))
+              for i in range(TITLES)]
+    pages = []
+    for p in range(PAGES):
+        words = rng.choices(vocab, k=words_per_page)
+        # Drop a slightly altered title into some pages so there are real matches
+        title = titles[p % TITLES]
+        words[words_per_page // 2:words_per_page // 2] = (title[:-1] + "x").split(" ")
+        pages.append(words)
+    return pages, titles
+
+
+def run(words_per_page):
+    pages, titles = build_corpus(words_per_page)
+    by_size = {}
+    for title in titles:
+        by_size.setdefault(len(title.split(" ")), []).append(title)
+
+    start = time.perf_counter()
+    loop_scores = [{title: best_window_score(words, title, len(title.split(" "))) for title in titles}
+                   for words in pages]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_scores = []
+    for words in pages:
+        scores = {}
+        for n_words, group in by_size.items():
+            scores.update(zip(group, best_window_scores(words, group, n_words)))
+        batch_scores.append(scores)
+    batch_time = time.perf_counter() - start
+
+    same = loop_scores == batch_scores
+    print(f"{words_per_page:>6} words/page x {PAGES} pages x {TITLES} titles | loop {loop_time:7.3f}s"
+          f" | cdist {batch_time:7.3f}s | x{loop_time / batch_time:5.1f} | identical: {'✓' if same else '✗'}")
+    return same
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [300, 600, 1200]
+    print("🚀 Phase 2 fuzzy title scoring benchmark")
+    print("=" * 50)
+    results = [run(words) for words in sizes]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark Phase 2 PDF text extraction against worker count.
+
+Writes a synthetic text-only PDF, extracts it with `read_pdf` serially and
+with 2, 4, … worker processes (at least up to 4, more on bigger machines),
+and checks every run returns the same pages as the serial one. Each worker
+count is timed twice: the first call includes starting the pool's
+processes, the second reuses the warm pool as later documents do. The
+parallel threshold is disabled so every size goes through the pool.
+
+Usage:
+    python bench_phase2_read_pdf.py [pages ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# The app is imported in main only: spawned workers re-import this script
+# and then import the app package themselves, as they do under the server
+
+LINES_PER_PAGE = 45
+
+
+def _content_stream(page_number, rng):
+    words = ["tender", "schedule", "requirement", "respondent", "must", "provide",
+             "evidence", "capability", "contract", "pricing", "within", "days"]
+    lines = [f"Returnable Schedule {page_number // 10 + 1}: Page {page_number}"]
+    lines += [" ".join(rng.choice(words) for _ in range(12)) for _ in range(LINES_PER_PAGE - 1)]
+    ops = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+    for line in lines:
+        ops.append(f"({line}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def build_pdf(pages, seed=11):
+    """A minimal PDF with `pages` pages of Helvetica text."""
+    rng = random.Random(seed)
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for page_number in range(pages):
+        page_id = 4 + page_number * 2
+        content_id = page_id + 1
+        stream = _content_stream(page_number, rng)
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(b"%d 0 R" % page_id)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (obj_id, objects[obj_id])
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for obj_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
+
+
+def run(pages):
+    from app.routes.modules.phase2.helper.normalize import read_pdf, shutdown_pdf_pool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        with open(path, "wb") as f:
+            f.write(build_pdf(pages))
+
+        cores = os.cpu_count() or 1
+        counts = [1]
+        while counts[-1] * 2 <= max(cores, 4):
+            counts.append(counts[-1] * 2)
+        if cores > counts[-1]:
+            counts.append(cores)
+
+        baseline = None
+        ok = True
+        for workers in counts:
+            shutdown_pdf_pool()
+            timings = []
+            for _ in range(2):
+                start = time.perf_counter()
+                result = read_pdf(path, workers=workers)
+                timings.append(time.perf_counter() - start)
+                if baseline is None:
+                    baseline = (result, timings[0])
+                ok = ok and result == baseline[0]
+            cold, warm = timings
+            print(f"{pages:>6} pages | {workers:>2} worker(s) | first {cold:7.3f}s | warm {warm:7.3f}s"
+                  f" | {pages / warm:8.1f} pages/s | x{baseline[1] / warm:4.1f}"
+                  f" | identical: {'✓' if ok else '✗'}")
+        return ok
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    from app.routes.modules.phase2.helper import normalize
+    normalize.PDF_PARALLEL_MIN_PAGES = 0
+    sizes = [int(arg) for arg in args] or [50, 200, 800]
+    print(f"🚀 Phase 2 PDF extraction benchmark ({os.cpu_count()} cores, "
+          f"spawned workers)")
+    print("=" * 50)
+    results = [run(pages) for pages in sizes]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Phase 2 OOXML section splitter.
+
+Builds a synthetic tender with N sections (heading, body paragraphs, an
+image each), then splits it once per section from a fresh load of the
+source, as `create_docx_start_endpage` did, and in one pass with
+`SourcePackage.write_sections`. Checks both produce the same section files.
+
+Usage:
+    python bench_phase2_split.py [sections ...]
+"""
+import io
+import os
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from docx import Document
+from docx.shared import Inches
+
+from app.routes.modules.phase2.helper.ooxml_split import SourcePackage, section_block_ranges
+
+PARAGRAPHS_PER_SECTION = 40
+
+
+def _png(seed, size=64):
+    """An uncompressible-ish RGB PNG, so media weighs something."""
+    rows = b"".join(b"\x00" + bytes((seed * 7 + x * y) % 256 for x in range(size * 3)) for y in range(size))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return io.BytesIO(b"\x89PNG\r\n\x1a\n"
+                      + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+                      + chunk(b"IDAT", zlib.compress(rows))
+                      + chunk(b"IEND", b""))
+
+
+def build_document(path, sections):
+    doc = Document()
+    doc.add_paragraph("Request for Tender")
+    for s in range(sections):
+        doc.add_heading(f"Returnable Schedule {s + 1}", 1)
+        for p in range(PARAGRAPHS_PER_SECTION):
+            doc.add_paragraph(f"Schedule {s + 1} requirement {p}: the respondent must describe its approach in full.")
+        doc.add_picture(_png(s), width=Inches(1))
+    doc.save(path)
+
+
+def _contents(path):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def run(n_sections):
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = os.path.join(tmp, "tender.docx")
+        build_document(source_path, n_sections)
+
+        toc_entries = [{"section": f"Returnable Schedule {s + 1}", "start_page": s} for s in range(n_sections)]
+        ranges = section_block_ranges(SourcePackage(source_path).block_texts, toc_entries)
+
+        def sections(folder):
+            os.makedirs(folder, exist_ok=True)
+            return [{"start_block": start, "end_block": end, "title": entry["section"], "toc_entries": [],
+                     "section_start_page": entry["start_page"],
+                     "output_path": os.path.join(folder, f"{i}.docx")}
+                    for i, (entry, (start, end)) in enumerate(zip(toc_entries, ranges))]
+
+        per_section = sections(os.path.join(tmp, "per_section"))
+        start = time.perf_counter()
+        for section in per_section:
+            SourcePackage(source_path).write_sections([section])
+        per_section_time = time.perf_counter() - start
+
+        one_pass = sections(os.path.join(tmp, "one_pass"))
+        start = time.perf_counter()
+        SourcePackage(source_path).write_sections(one_pass)
+        one_pass_time = time.perf_counter() - start
+
+        same = all(_contents(a["output_path"]) == _contents(b["output_path"])
+                   for a, b in zip(per_section, one_pass))
+        print(f"{n_sections:>4} sections | {os.path.getsize(source_path) / 2**10:7.0f} KiB"
+              f" | per section {per_section_time:7.3f}s | one pass {one_pass_time:7.3f}s"
+              f" | x{per_section_time / one_pass_time:5.1f} | identical: {'✓' if same else '✗'}")
+        return same
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [5, 15, 40]
+    print("🚀 Phase 2 section split benchmark")
+    print("=" * 50)
+    results = [run(n) for n in sizes]
+    sys.exit(0 if all(results) else 1)
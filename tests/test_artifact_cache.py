@@ -0,0 +1,41 @@
+import os
+
+from app.routes.modules.phase2.helper.artifact_cache import ArtifactCache
+
+
+def _docx(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_same_bytes_hit_and_different_bytes_miss(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), 10 * 2**20)
+    key = cache.key_for(_docx(tmp_path, "a.docx", b"document one"))
+    pages = [{"page": 0, "text": "Schedule 1"}]
+    cache.put_pages(key, pages)
+    cache.put_toc(key, {"toc_entries": [{"section": "Schedule 1", "start_page": 0}]})
+
+    # A renamed copy of the same bytes shares the entry
+    again = cache.key_for(_docx(tmp_path, "copy.docx", b"document one"))
+    assert cache.get_pages(again) == pages
+    assert cache.get_toc(again)["toc_entries"][0]["section"] == "Schedule 1"
+
+    other = cache.key_for(_docx(tmp_path, "b.docx", b"document two"))
+    assert cache.get_pages(other) is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), 2500)
+    cache.put_pages("old", [{"page": 0, "text": "x" * 1000}])
+    cache.put_pages("recent", [{"page": 0, "text": "y" * 1000}])
+    os.utime(os.path.join(cache.root, "old", ArtifactCache.LAST_USED), (1, 1))
+    cache.put_pages("new", [{"page": 0, "text": "z" * 1000}])
+    assert cache.get_pages("old") is None
+    assert cache.get_pages("recent") is not None and cache.get_pages("new") is not None
+
+
+def test_disabled_cache_never_hits(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), 0)
+    cache.put_pages("key", [{"page": 0, "text": "x"}])
+    assert cache.get_pages("key") is None
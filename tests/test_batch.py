@@ -0,0 +1,41 @@
+import io
+
+from docx import Document
+from openpyxl import Workbook
+
+from app.routes.modules.phase1 import openai_processing
+from app.routes.modules.phase1.batch import process_phase1_batch
+
+
+def _docx(text):
+    doc = Document()
+    doc.add_heading("Returnable Schedule 1", 1)
+    doc.add_paragraph(text)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _xlsx():
+    buffer = io.BytesIO()
+    Workbook().save(buffer)
+    return buffer.getvalue()
+
+
+def test_failed_model_call_marks_the_document_failed(monkeypatch):
+    def parse(text, instructions=None):
+        if "broken" in text:
+            raise RuntimeError("model unavailable")
+        return [{"header": "Returnable Schedule 1", "subheader": None,
+                 "requirements": [text], "page_limit": "0"}]
+
+    monkeypatch.setattr(openai_processing, "parse_sections_with_openai", parse)
+    files = {"good.docx": _docx("Describe the approach"), "bad.docx": _docx("broken document"),
+             "template.xlsx": _xlsx()}
+
+    outputs, report = process_phase1_batch(files)
+
+    status = {entry["document"]: entry["status"] for entry in report}
+    assert status == {"good.docx": "ok", "bad.docx": "failed"}
+    assert list(outputs) == ["good.xlsx"]
+    assert "model unavailable" in next(e["error"] for e in report if e["document"] == "bad.docx")
@@ -0,0 +1,61 @@
+from app.routes.modules.phase1.compaction import compact_lines
+
+
+def _removed(texts):
+    result = compact_lines([(text, "Normal") for text in texts])
+    return [entry["text"] for entry in result["removed"]]
+
+
+def test_lettered_items_are_not_copyright_notices():
+    texts = [
+        "(a) Describe your methodology",
+        "(b) Provide a project schedule",
+        "(c) Identify key risks and mitigations",
+        "(c) Identify key risks and mitigations",
+    ]
+    assert _removed(texts) == []
+
+
+def test_numbered_items_are_never_removed():
+    item = "1. The respondent must provide evidence of current public liability insurance."
+    texts = [item, "Some context in between.", item, "2) Confidential information must be marked"]
+    assert _removed(texts) == []
+
+
+def test_sentences_starting_with_notice_words_are_kept():
+    texts = [
+        "Copyright 2024 Department of Finance. All rights reserved.",
+        "Copyright in all material submitted remains with the respondent.",
+        "Confidential",
+        "Confidential information supplied by the respondent will be protected.",
+    ]
+    assert _removed(texts) == []
+
+
+def test_repeated_whole_line_notices_are_removed():
+    texts = [
+        "© 2024 Department of Finance",
+        "Commercial in Confidence",
+        "Requirement text",
+        "© 2024 Department of Finance",
+        "Commercial-in-Confidence",
+        "Page 3 of 10",
+    ]
+    assert _removed(texts) == ["© 2024 Department of Finance", "Commercial-in-Confidence", "Page 3 of 10"]
+
+
+def test_requirement_repeated_under_two_schedules_is_kept():
+    requirement = "The respondent must provide evidence of current public liability insurance."
+    lines = [("Returnable Schedule 1", "Heading 1"), (requirement, "Normal"),
+             ("Returnable Schedule 2", "Heading 1"), (requirement, "Normal")]
+    result = compact_lines(lines)
+    assert result["removed"] == []
+    assert result["lines"] == lines
+
+
+def test_duplicate_inside_one_schedule_is_removed():
+    paragraph = "Responses must be submitted through the tender portal before the closing time."
+    lines = [("Returnable Schedule 1", "Heading 1"), (paragraph, "Normal"), (paragraph, "Normal"),
+             ("Returnable Schedule 2", "Heading 1"), (paragraph, "Normal")]
+    result = compact_lines(lines)
+    assert [(entry["index"], entry["kept_as"]) for entry in result["removed"]] == [(2, 1)]
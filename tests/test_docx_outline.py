@@ -0,0 +1,60 @@
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from app.routes.modules.phase2.helper.docx_outline import outline_toc, read_docx_outline
+
+
+def _document(tmp_path):
+    doc = Document()
+    doc.add_heading("Request for Tender", level=0)
+    doc.add_heading("Schedule 1 Company Profile", level=1)
+    doc.add_paragraph("Describe your organisation.")
+    doc.add_heading("1.1 Directors", level=2)
+    doc.add_heading("1.2 Referees", level=2)
+    doc.add_heading("Schedule 2 Pricing", level=1)
+    doc.add_table(rows=1, cols=1).rows[0].cells[0].text = "Price"
+    doc.add_heading("", level=1)
+    path = tmp_path / "outline.docx"
+    doc.save(path)
+    return path
+
+
+def test_outline_reads_heading_levels_and_blocks(tmp_path):
+    outline = read_docx_outline(_document(tmp_path))
+    assert [(h["level"], h["text"], h["block"]) for h in outline] == [
+        (1, "Schedule 1 Company Profile", 1),
+        (2, "1.1 Directors", 3),
+        (2, "1.2 Referees", 4),
+        (1, "Schedule 2 Pricing", 5),
+    ]
+
+
+def test_outline_toc_splits_top_level_and_section_tocs(tmp_path):
+    toc_entries, section_tocs = outline_toc(read_docx_outline(_document(tmp_path)))
+    assert [(e["section"], e["block"], e["start_page"]) for e in toc_entries] == [
+        ("Schedule 1 Company Profile", 1, None), ("Schedule 2 Pricing", 5, None)]
+    assert [[e["section"] for e in toc] for toc in section_tocs] == [["1.1 Directors", "1.2 Referees"], []]
+
+
+def test_outline_toc_needs_enough_headings():
+    assert outline_toc([{"level": 1, "text": "Only", "block": 0}]) == ([], [])
+
+
+def test_malformed_outline_levels_are_ignored(tmp_path):
+    doc = Document()
+    broken = doc.styles.add_style("Broken", WD_STYLE_TYPE.PARAGRAPH)
+    broken.element.get_or_add_pPr().append(OxmlElement("w:outlineLvl"))
+    doc.add_paragraph("Styled with a broken level", style="Broken")
+    for value in ("x", None, "12"):
+        p = doc.add_heading(f"Schedule {value}", level=1)
+        outline = OxmlElement("w:outlineLvl")
+        if value is not None:
+            outline.set(qn("w:val"), value)
+        p._p.get_or_add_pPr().append(outline)
+    path = tmp_path / "malformed.docx"
+    doc.save(path)
+    # The heading style's level still applies when the paragraph's own is unreadable
+    assert [(h["level"], h["text"]) for h in read_docx_outline(path)] == [
+        (1, "Schedule x"), (1, "Schedule None"), (1, "Schedule 12")]
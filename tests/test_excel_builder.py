@@ -0,0 +1,51 @@
+import io
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+
+from app.routes.modules.phase1.excel_builder import build_phase1_workbook
+
+
+def _template():
+    wb = Workbook()
+    header = wb.active["A1"]
+    header.font = Font(bold=True, color="FFFF0000")
+    header.fill = PatternFill("solid", fgColor="FF00FF00")
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer
+
+
+def _cell(text, row, col, row_span=1, col_span=1):
+    return {"text": text, "column_header": False, "row_header": False,
+            "row": row, "col": col, "row_span": row_span, "col_span": col_span}
+
+
+def _build(tables, sections=()):
+    output = io.BytesIO()
+    build_phase1_workbook(_template(), list(sections), tables, output)
+    output.seek(0)
+    return load_workbook(output)
+
+
+def test_section_cells_keep_template_header_formatting():
+    wb = _build([], [{"header": "Schedule 1", "requirements": ["(a) Item"]}])
+    header = wb.active["A1"]
+    assert header.value == "Header"
+    assert header.font.b and header.font.color.rgb == "FFFF0000"
+    assert header.fill.fgColor.rgb == "FF00FF00"
+    assert header.alignment.wrap_text
+
+
+def test_spanning_cells_are_merged():
+    cells = [_cell("Group", 0, 0, row_span=2), _cell("Wide", 0, 1, col_span=2),
+             _cell("b", 1, 1), _cell("c", 1, 2)]
+    ws = _build([{"heading": "Matrix", "table": [], "cells": cells}])["Matrix"]
+    assert sorted(str(r) for r in ws.merged_cells.ranges) == ["A1:A2", "B1:C1"]
+    assert [ws["A1"].value, ws["B1"].value, ws["B2"].value, ws["C2"].value] == ["Group", "Wide", "b", "c"]
+
+
+def test_overlapping_spans_are_not_merged():
+    cells = [_cell("Tall", 0, 0, row_span=2), _cell("Wide", 1, 0, col_span=2)]
+    ws = _build([{"heading": "Broken", "table": [], "cells": cells}])["Broken"]
+    assert [str(r) for r in ws.merged_cells.ranges] == ["A1:A2"]
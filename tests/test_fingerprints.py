@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from app.routes.modules.phase1.fingerprints import FingerprintStore, document_key
+
+
+def test_revisions_share_a_key():
+    assert document_key("Tender_rev2.docx") == document_key("uploads/Tender v3.docx") == "tender"
+
+
+def test_keys_are_scoped_per_owner():
+    assert document_key("Tender.docx", owner="alice") == "alice--tender"
+    assert document_key("Tender.docx", owner="alice") != document_key("Tender.docx", owner="bob")
+
+
+def test_document_key_never_keeps_separators():
+    assert document_key("../../etc/passwd", owner="alice") == "alice--passwd"
+    assert document_key("tender.docx", owner="../a/b") == "a-b--tender"
+
+
+@pytest.mark.parametrize("key", ["../outside", "a/b", "a\\b", "", "Tender"])
+def test_store_rejects_keys_not_from_document_key(tmp_path, key):
+    store = FingerprintStore(tmp_path)
+    with pytest.raises(ValueError):
+        store.load(key)
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = FingerprintStore(tmp_path, max_documents=2)
+    store.save("a--one", {"x": {"hash": "1"}})
+    store.save("a--two", {"x": {"hash": "2"}})
+    os.utime(tmp_path / "a--one.json", (1, 1))
+    os.utime(tmp_path / "a--two.json", (2, 2))
+    assert store.load("a--one") == {"x": {"hash": "1"}}  # now the most recent
+
+    store.save("a--three", {"x": {"hash": "3"}})
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["a--one.json", "a--three.json"]
+
+
+def test_copy_suffixes_are_different_documents():
+    assert document_key("Schedule (1).docx") != document_key("Schedule (2).docx")
+
+
+def test_store_lock_is_shared_per_key(tmp_path):
+    store = FingerprintStore(tmp_path)
+    assert store.lock("a--one") is store.lock("a--one")
+    assert store.lock("a--one") is not store.lock("a--two")
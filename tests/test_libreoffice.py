@@ -0,0 +1,65 @@
+import os
+import time
+
+import pytest
+
+from app.routes.modules.phase2.helper.converter import libreoffice
+from app.routes.modules.phase2.helper.converter.libreoffice import LibreOfficePool
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="the stand-in soffice is a shell script")
+
+# Stands in for soffice --convert-to: writes <name>.pdf to --outdir after
+# sleeping for the seconds in $FAKE_SOFFICE_DELAY, from a child process the
+# way soffice runs soffice.bin, and then touches $FAKE_SOFFICE_DONE
+FAKE_SOFFICE = """#!/bin/sh
+outdir=""
+while [ $# -gt 1 ]; do
+    [ "$1" = "--outdir" ] && outdir="$2"
+    shift
+done
+name=$(basename "$1" .docx)
+sh -c "sleep ${FAKE_SOFFICE_DELAY:-0}; echo %PDF > '$outdir/$name.pdf'; touch '${FAKE_SOFFICE_DONE:-/dev/null}'"
+"""
+
+
+@pytest.fixture
+def soffice(tmp_path, monkeypatch):
+    monkeypatch.setattr(libreoffice, "UNO_AVAILABLE", False)
+    path = tmp_path / "soffice"
+    path.write_text(FAKE_SOFFICE)
+    path.chmod(0o755)
+    return str(path)
+
+
+def _pool(soffice, timeout):
+    return LibreOfficePool(soffice, size=1, timeout=timeout, max_conversions=100, start_timeout=1)
+
+
+def test_without_uno_every_conversion_is_a_cold_run(tmp_path, soffice, capsys):
+    pool = _pool(soffice, timeout=10)
+    docx = tmp_path / "tender.docx"
+    docx.write_bytes(b"")
+    try:
+        pdf = pool.convert(str(docx), str(tmp_path / "tender.pdf"))
+    finally:
+        pool.close()
+    assert open(pdf, "rb").read().startswith(b"%PDF")
+    assert all(worker.process is None for worker in pool._workers)
+    assert "cold soffice --convert-to run" in capsys.readouterr().out
+
+
+def test_timeout_stops_the_conversion(tmp_path, soffice, monkeypatch):
+    done = tmp_path / "done"
+    monkeypatch.setenv("FAKE_SOFFICE_DELAY", "2")
+    monkeypatch.setenv("FAKE_SOFFICE_DONE", str(done))
+    pool = _pool(soffice, timeout=0.5)
+    docx = tmp_path / "slow.docx"
+    docx.write_bytes(b"")
+    try:
+        with pytest.raises(TimeoutError):
+            pool.convert(str(docx), str(tmp_path / "slow.pdf"))
+    finally:
+        pool.close()
+    # The child doing the work was killed with the run, so it never finishes
+    time.sleep(2.5)
+    assert not done.exists()
@@ -0,0 +1,22 @@
+import io
+
+from app.routes.modules.phase2.helper import normalize
+from bench_phase2_read_pdf import build_pdf
+
+
+def test_parallel_read_of_a_stream_matches_serial(monkeypatch, capsys):
+    monkeypatch.setattr(normalize, "PDF_PARALLEL_MIN_PAGES", 0)
+    pdf = build_pdf(12)
+    serial = normalize.read_pdf(io.BytesIO(pdf), workers=1)
+    try:
+        parallel = normalize.read_pdf(io.BytesIO(pdf), workers=2)
+    finally:
+        normalize.shutdown_pdf_pool()
+    assert [page["page"] for page in serial] == list(range(12))
+    assert parallel == serial
+    assert "extracting serially" not in capsys.readouterr().out
+
+
+def test_page_ranges_cover_every_page_once():
+    assert normalize._page_ranges(10, 4) == [(0, 3), (3, 6), (6, 8), (8, 10)]
+    assert normalize._page_ranges(2, 8) == [(0, 1), (1, 2)]
@@ -0,0 +1,76 @@
+import zipfile
+
+from docx import Document
+
+from app.routes.modules.phase2.helper.ooxml_split import SourcePackage, section_block_ranges
+
+SECTIONS = {
+    "Schedule 1 Company Profile": ["Describe your organisation.", "List your directors."],
+    "Schedule 2 Technical Capability": ["Describe your approach."],
+    "Schedule 3 Pricing": ["Complete the pricing table.", "Prices exclude GST."],
+}
+
+
+def _source(tmp_path):
+    doc = Document()
+    doc.add_paragraph("Request for Tender")
+    for title, paragraphs in SECTIONS.items():
+        doc.add_heading(title, level=1)
+        for text in paragraphs:
+            doc.add_paragraph(text)
+    doc.add_table(rows=1, cols=2).rows[0].cells[0].text = "Item"
+    path = tmp_path / "source.docx"
+    doc.save(path)
+    return path
+
+
+def _sections(tmp_path, name):
+    source = SourcePackage(str(_source(tmp_path)))
+    toc = [{"section": title, "start_page": i + 1} for i, title in enumerate(SECTIONS)]
+    sections = []
+    for i, (start, end) in enumerate(section_block_ranges(source.block_texts, toc)):
+        sections.append({"start_block": start, "end_block": end, "title": toc[i]["section"],
+                         "toc_entries": [], "section_start_page": toc[i]["start_page"],
+                         "output_path": str(tmp_path / f"{name}_{i}.docx")})
+    return source, sections
+
+
+def test_each_section_holds_its_own_heading_and_paragraphs(tmp_path):
+    # The COM splitter (split_by_page) needs Word, so the output is checked
+    # against its layout: title page, TOC page, then the section's content
+    source, sections = _sections(tmp_path, "section")
+    source.write_sections(sections)
+    for section, (title, paragraphs) in zip(sections, SECTIONS.items()):
+        texts = [p.text for p in Document(section["output_path"]).paragraphs]
+        assert texts[0] == title
+        assert "Table of Contents" in texts
+        body = texts[texts.index(title, 1):]
+        assert body == [title] + paragraphs
+    assert len(Document(sections[-1]["output_path"]).tables) == 1
+    assert not Document(sections[0]["output_path"]).tables
+
+
+def test_one_pass_matches_section_by_section(tmp_path):
+    source, sections = _sections(tmp_path, "one_pass")
+    source.write_sections(sections)
+    for section in sections:
+        single = str(tmp_path / "single.docx")
+        source.write_section(section["start_block"], section["end_block"], single,
+                             section["title"], section["toc_entries"], section["section_start_page"])
+        assert ([p.text for p in Document(single).paragraphs]
+                == [p.text for p in Document(section["output_path"]).paragraphs])
+
+
+def test_document_without_relationships_is_split(tmp_path):
+    source_path = _source(tmp_path)
+    stripped = tmp_path / "no_rels.docx"
+    with zipfile.ZipFile(source_path) as src, zipfile.ZipFile(stripped, "w") as out:
+        for name in src.namelist():
+            if name != "word/_rels/document.xml.rels":
+                out.writestr(name, src.read(name))
+    source = SourcePackage(str(stripped))
+    output = tmp_path / "section.docx"
+    source.write_section(1, 3, str(output), "Schedule 1 Company Profile", [])
+    with zipfile.ZipFile(output) as zf:
+        document = zf.read("word/document.xml").decode()
+    assert "List your directors." in document and "Schedule 2" not in document
@@ -0,0 +1,49 @@
+from app.routes.modules.phase2.helper.page_alignment import align_section_start_pages
+
+FILLER = " ".join(["The respondent should read this part carefully before preparing a response."] * 6)
+
+
+def _pages(*texts):
+    return [{"page": i, "text": f"{text}\n{FILLER}"} for i, text in enumerate(texts)]
+
+
+def _entries(*titles):
+    return [{"section": title, "start_page": None} for title in titles]
+
+
+def test_titles_are_matched_in_document_order():
+    pages = _pages(
+        "Request for Tender",
+        "Schedule 1 Company Profile",
+        "See Schedule 3 Pricing for rates. Schedule 2 Capability",
+        "Body text",
+        "Schedule 3 Pricing",
+    )
+    entries = align_section_start_pages(
+        pages, _entries("Schedule 1 Company Profile", "Schedule 2 Capability", "Schedule 3 Pricing"))
+    assert [entry["start_page"] for entry in entries] == [1, 2, 4]
+    assert [entry["match"] for entry in entries] == ["exact", "exact", "exact"]
+
+
+def test_toc_page_listing_every_title_is_skipped():
+    titles = ["Schedule 1 Company Profile", "Schedule 2 Capability", "Schedule 3 Pricing", "Schedule 4 Referees"]
+    pages = [{"page": 0, "text": "Contents\n" + "\n".join(titles)}] + [
+        {"page": i + 1, "text": f"{title}\n{FILLER}"} for i, title in enumerate(titles)]
+    entries = align_section_start_pages(pages, _entries(*titles))
+    assert [entry["start_page"] for entry in entries] == [1, 2, 3, 4]
+
+
+def test_missing_title_falls_back_between_its_neighbours():
+    pages = _pages("Cover", "Schedule 1 Company Profile", "Body text", "Schedule 3 Pricing")
+    entries = align_section_start_pages(
+        pages, _entries("Schedule 1 Company Profile", "Schedule 2 Nowhere To Be Found", "Schedule 3 Pricing"))
+    assert [entry["start_page"] for entry in entries] == [1, 1, 3]
+    assert entries[1]["match"] == "fallback"
+
+
+def test_near_miss_title_is_matched_fuzzily():
+    pages = _pages("Cover", "Schedule 1 Company Profile", "Schedule 2 Technical Capabilty Statement")
+    entries = align_section_start_pages(
+        pages, _entries("Schedule 1 Company Profile", "Schedule 2 Technical Capability Statement"))
+    assert entries[1]["start_page"] == 2
+    assert entries[1]["match"] == "fuzzy"
@@ -0,0 +1,45 @@
+from docx import Document
+
+from app.routes.modules.phase2.helper.ooxml_split import SourcePackage
+from app.routes.modules.phase2.helper.page_anchors import PageAnchors, compact
+
+
+def _blocks(tmp_path, paragraphs):
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    path = tmp_path / "source.docx"
+    doc.save(path)
+    return SourcePackage(str(path)).blocks
+
+
+PARAGRAPHS = [
+    "Schedule 1 Company Profile",
+    "Describe your organisation, its history and the services it offers to government clients.",
+    "Schedule 2 Technical Capability",
+    "Describe your approach to delivering the services, including staffing and quality assurance.",
+    "Schedule 3 Pricing",
+    "Complete the pricing table for every deliverable listed in the statement of requirements.",
+]
+
+
+def test_compact_ignores_case_punctuation_and_spacing():
+    assert compact("Schedule 1 - Company\nProfile.") == compact("schedule1companyprofile")
+
+
+def test_pages_map_to_the_blocks_they_hold(tmp_path):
+    pages = [{"page": i, "text": f"Page {i + 1}\n" + "\n".join(PARAGRAPHS[2 * i:2 * i + 2])}
+             for i in range(3)]
+    anchors = PageAnchors.build(pages, _blocks(tmp_path, PARAGRAPHS))
+    assert anchors.pages == [(0, 1), (2, 3), (4, 5)]
+    assert anchors.blocks_for(1, 2) == (2, 5)
+
+
+def test_unmatched_pages_fall_between_their_neighbours(tmp_path):
+    pages = [{"page": 0, "text": "\n".join(PARAGRAPHS[:2])},
+             {"page": 1, "text": "scanned page with no text layer"},
+             {"page": 2, "text": "\n".join(PARAGRAPHS[4:])}]
+    anchors = PageAnchors.build(pages, _blocks(tmp_path, PARAGRAPHS))
+    assert anchors.first_block(0) == 0
+    assert 1 <= anchors.first_block(1) <= 4
+    assert anchors.first_block(2) == 4
@@ -0,0 +1,48 @@
+import re
+
+from app.routes.modules.phase2.helper.page_corpus import normalize_whitespace
+from app.routes.modules.phase2.helper.page_index import PageIndex, best_window_score
+
+PAGES = [
+    {"page": 0, "text": "Request for Tender\nContents"},
+    {"page": 1, "text": "Schedule 1 Company Profile\nDescribe your organisation."},
+    {"page": 2, "text": "Schedule 2 Technical Capabilty Statement\nDescribe your approach."},
+    {"page": 3, "text": "Schedule 3 Pricing\nComplete the pricing table."},
+]
+TITLES = ["Schedule 1 Company Profile", "Schedule 2 Technical Capability Statement",
+          "Schedule 3 Pricing", "Schedule 9 Something Else Entirely"]
+
+
+def _title(title):
+    norm_title = normalize_whitespace(title)
+    return norm_title, len(re.findall(r"\w+", norm_title))
+
+
+def _scan(norm_title, n_words, threshold):
+    """The unindexed search: first exact page, else the best window score."""
+    for pg in PAGES:
+        if norm_title in normalize_whitespace(pg["text"]):
+            return True, pg["page"]
+    best, best_page = 0, None
+    for pg in PAGES:
+        score = best_window_score(normalize_whitespace(pg["text"]).split(), norm_title, n_words)
+        if score > best:
+            best, best_page = score, pg["page"]
+    return best >= threshold, best_page
+
+
+def test_find_start_pages_matches_the_unindexed_scan():
+    index = PageIndex(PAGES)
+    titles = [_title(title) for title in TITLES]
+    results = index.find_start_pages(titles, index.view(PAGES), 90)
+    assert results[:3] == [(True, 1), (True, 2), (True, 3)]
+    for (norm_title, n_words), (matched, page) in zip(titles, results):
+        if matched:
+            assert (matched, page) == _scan(norm_title, n_words, 90)
+    assert results[3][0] is False
+
+
+def test_view_rejects_pages_of_another_document():
+    index = PageIndex(PAGES)
+    assert index.view(PAGES[1:3]) == [1, 2]
+    assert index.view([{"page": 1, "text": "different text"}]) is None
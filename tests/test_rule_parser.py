@@ -0,0 +1,18 @@
+from app.routes.modules.phase1.rule_parser import parse_page_limit
+
+
+def test_bracketed_number_with_page_unit():
+    assert parse_page_limit("Page limit: Maximum total of five (5) A4 pages") == 5
+
+
+def test_bracketed_number_after_limit_word():
+    assert parse_page_limit("Page limit (3)") == 3
+
+
+def test_list_marker_is_not_a_page_limit():
+    assert parse_page_limit("(2) Page limit: Maximum total of five (5) A4 pages") == 5
+    assert parse_page_limit("(12) Maximum of 3 pages") == 3
+
+
+def test_list_marker_alone_gives_no_limit():
+    assert parse_page_limit("(4) Describe the maximum staffing level") is None
@@ -0,0 +1,30 @@
+import io
+
+from docx import Document
+
+from app.routes.modules.phase1.openai_processing import extract_tables_with_headings_and_context
+from app.routes.modules.phase1.table_stream import stream_tables_with_headings_and_context
+
+
+def _document():
+    doc = Document()
+    doc.add_paragraph("Pricing")
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "Item and unit"
+    table.cell(0, 2).text = "Price"
+    for r, row in enumerate([["Widget", "each", "10"], ["Gadget", "box", "25"]], start=1):
+        for c, text in enumerate(row):
+            table.cell(r, c).text = text
+    doc.add_paragraph("Some very long introductory paragraph that is far too long to be a heading.")
+    doc.add_table(rows=1, cols=2).rows[0].cells[1].text = "Only cell"
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer
+
+
+def test_stream_matches_python_docx_extractor():
+    streamed = stream_tables_with_headings_and_context(_document())
+    parsed = extract_tables_with_headings_and_context(_document())
+    assert streamed == parsed
+    assert [t["heading"] for t in streamed] == ["Pricing", "Unknown 1"]
+    assert [cell["text"] for cell in streamed[0]["table"][1]] == ["Widget", "each", "10"]
@@ -0,0 +1,36 @@
+from app.routes.modules.phase2.helper.config import TOC_HEURISTIC_MIN_CONFIDENCE
+from app.routes.modules.phase2.helper.toc_heuristics import detect_toc
+
+PROSE = "\n".join(
+    f"The respondent must describe how requirement {n} is met, with evidence from past contracts."
+    for n in range(30))
+
+
+def _pages(*texts):
+    return [{"page": i, "text": text} for i, text in enumerate(texts)]
+
+
+def test_leader_toc_with_heading_is_found():
+    toc = "Table of Contents\n" + "\n".join(f"Schedule {n} ........ {n * 4}" for n in range(1, 8))
+    detection = detect_toc(_pages("Request for Tender", toc, PROSE))
+    assert detection["has_toc"] and detection["toc_pages"] == [1]
+    assert detection["confidence"] >= TOC_HEURISTIC_MIN_CONFIDENCE
+
+
+def test_prose_is_confidently_not_a_toc():
+    detection = detect_toc(_pages("Request for Tender", PROSE, PROSE))
+    assert not detection["has_toc"]
+    assert detection["confidence"] >= TOC_HEURISTIC_MIN_CONFIDENCE
+
+
+def test_plain_title_number_toc_without_heading_goes_to_the_model():
+    toc = "\n".join(f"Returnable Schedule {n} Pricing {n * 3 + 2}" for n in range(1, 12))
+    detection = detect_toc(_pages("Request for Tender", toc, PROSE))
+    assert not detection["has_toc"]
+    assert detection["confidence"] < TOC_HEURISTIC_MIN_CONFIDENCE
+
+
+def test_a_few_numbered_lines_go_to_the_model():
+    page = PROSE + "\n" + "\n".join(f"Attachment {n} 1{n}" for n in range(10))
+    detection = detect_toc(_pages(page))
+    assert detection["confidence"] < TOC_HEURISTIC_MIN_CONFIDENCE